@@ -7,6 +7,8 @@ Mejoras incluidas:
   dentro de _program_init, y 'main' lo invoca al iniciar.
 - Epílogo especial para 'main' (syscall 10).
 - Redirección de builtins: toString/printString/printInteger.
+- Strings: StrCat / IntToStr (los elige el generador por tipo) van a
+  __strcat_new / __int_to_str del runtime; 'Add' es siempre suma entera.
 - Blindaje de labels cuando el TAC define builtins (renombramos defs a $user).
 - Manejo de strings: soporta correctamente "\n" y "\t" sin doble-escapar.
 - Fallback: si no hay función 'main' pero sí top-level, se genera un 'main'
@@ -26,7 +28,6 @@ class MIPSEmitter:
         "color":  8,   # ptr (string)
         "grado":  12,  # int
     }
-    _STRING_FIELDS = {"nombre", "color"}
 
     # Builtins del runtime
     BUILTIN_REDIRECTS = {
@@ -51,7 +52,6 @@ class MIPSEmitter:
         self._func_seen = {}
         self._func_mangle = {}
         self._seen_locals = set()
-        self._stringish = set()
 
         # Control de boot/top-level
         self._have_boot = False
@@ -91,8 +91,9 @@ class MIPSEmitter:
         return out
 
     # ---------- funciones ----------
-    def begin_function(self, name, local_bytes=0):
-        orig = name
+    def register_function(self, orig):
+        """Nombre real (label) de la siguiente definición de 'orig'."""
+        name = orig
 
         # Si el TAC define un builtin, renombramos su definición del usuario
         if orig in self.BUILTIN_NAMES:
@@ -107,6 +108,11 @@ class MIPSEmitter:
 
         # mapa lógico -> label real
         self._func_mangle[orig] = name
+        return name
+
+    def begin_function(self, name, local_bytes=0):
+        orig = name
+        name = self.register_function(orig)
 
         if orig == "main":
             self._saw_main = True
@@ -115,7 +121,6 @@ class MIPSEmitter:
         self._loaded.clear()
         self._pending_args = []
         self._seen_locals = set()
-        self._stringish = set()
 
         spill_hint = self.regs.start_function(spill_bytes_hint=256)
         real_locals = local_bytes + spill_hint
@@ -171,12 +176,6 @@ class MIPSEmitter:
         self.emit("  li   " + r + ", " + str(val))
         return r
 
-    def _mark_stringish_if(self, dst, src_token):
-        if isinstance(src_token, str):
-            s = src_token.strip()
-            if len(s) >= 2 and s[0] == '"' and s[-1] == '"':
-                self._stringish.add(dst)
-
     def _mat(self, x):
         if isinstance(x, int):
             return self._imm(int(x))
@@ -208,8 +207,6 @@ class MIPSEmitter:
                     off = self._FIELD_OFFSETS[field_name]
                     r = self.regs.temp_acquire()
                     self.emit("  lw   " + r + ", " + str(off) + "($a0)")
-                    if field_name in self._STRING_FIELDS:
-                        self._stringish.add(r)
                     return r
                 else:
                     reg_obj = self.regs.get(obj_name)
@@ -219,8 +216,6 @@ class MIPSEmitter:
                     off = self._FIELD_OFFSETS[field_name]
                     r = self.regs.temp_acquire()
                     self.emit("  lw   " + r + ", " + str(off) + "(" + reg_obj + ")")
-                    if field_name in self._STRING_FIELDS:
-                        self._stringish.add(r)
                     return r
 
             # variable normal
@@ -245,7 +240,6 @@ class MIPSEmitter:
         rd = self.regs.get(dst, for_write=True)
         self.emit("  addu " + rd + ", " + rs + ", $zero")
         self._release_if_temp(rs)
-        self._mark_stringish_if(dst, src)
 
     def _emit_cmp(self, op, rd, ra, rb):
         if op == "<":
@@ -269,22 +263,16 @@ class MIPSEmitter:
             self.emit("  slt   " + rd + ", " + ra + ", " + rb)
             self.emit("  xori  " + rd + ", " + rd + ", 1")
 
-    def _is_string_add(self, a, b):
-        def is_lit(s):
-            return isinstance(s, str) and len(s) >= 2 and s[0] == '"' and s[-1] == '"'
-        if is_lit(a) or is_lit(b): return True
-        if isinstance(a, str) and a in self._stringish: return True
-        if isinstance(b, str) and b in self._stringish: return True
-        return False
+    def emit_strcat(self, dst, a, b):
+        self.emit_param(a)
+        self.emit_param(b)
+        self.emit_call(dst, "__strcat_new", 2)
 
-    def emit_binary(self, op, dst, a, b):
-        if op == "+" and self._is_string_add(a, b):
-            self.emit_param(a)
-            self.emit_param(b)
-            self.emit_call(dst, "__strcat_new", 2)
-            if isinstance(dst, str): self._stringish.add(dst)
-            return
+    def emit_int_to_str(self, dst, src):
+        self.emit_param(src)
+        self.emit_call(dst, "__int_to_str", 1)
 
+    def emit_binary(self, op, dst, a, b):
         ra = self._mat(a); rb = self._mat(b)
         rd = self.regs.get(dst, for_write=True)
         if op == "+":   self.emit("  addu " + rd + ", " + ra + ", " + rb)
@@ -446,7 +434,6 @@ class MIPSEmitter:
             off = self._FIELD_OFFSETS.get(field, 0)
             rd = self.regs.get(dst, for_write=True)
             self.emit("  lw   " + rd + ", " + str(off) + "(" + ro + ")")
-        if field in self._STRING_FIELDS: self._stringish.add(dst)
 
     def emit_setprop(self, obj, field, src):
         rs = self._mat(src)
@@ -466,7 +453,10 @@ class MIPSEmitter:
 
     # ---------- driver ----------
     def _emit_quads_sequence(self, quads):
-        """Emite una secuencia suponiendo que YA estamos dentro de una función."""
+        """
+        Emite una secuencia suponiendo que YA estamos dentro de una función.
+        Los quads vienen de program/ir.py (directo del generador o de un .cgt).
+        """
         for q in quads:
             op = q[0]
             if op == "BeginFunc":
@@ -497,6 +487,9 @@ class MIPSEmitter:
                 continue
             if op == "Call":
                 _, d, f, n = q; self.emit_call(d, f, n); continue
+            if op == "CallMethod":
+                # el receptor (último param) va en $a0
+                _, d, f, n = q; self.emit_call(d, "method " + f, n); continue
             if op == "LoadParam":
                 _, d, i = q; self.emit_loadparam(d, i); continue
             if op == "GetProp":
@@ -505,14 +498,19 @@ class MIPSEmitter:
                 _, dst, cname = q; self.emit_new(dst, cname); continue
             if op == "SetProp":
                 _, o, f, s = q; self.emit_setprop(o, f, s); continue
+            if op == "StrCat":
+                _, d, a, b = q; self.emit_strcat(d, a, b); continue
+            if op == "IntToStr":
+                _, d, s = q; self.emit_int_to_str(d, s); continue
             if op == "Raw":
                 self.c(q[1]); continue
             self.c("opcode TAC no soportado: " + str(q))
 
-    def from_quads(self, quads):
+    @staticmethod
+    def split_quads(quads):
         """
-        Recolecta todos los quads fuera de funciones (antes/entre/después)
-        y los emite como _program_init; luego emite cada función.
+        Separa (top, functions): los quads fuera de funciones (antes/entre/
+        después) y cada función desde su BeginFunc hasta el siguiente.
         """
         top = []
         functions = []
@@ -549,35 +547,54 @@ class MIPSEmitter:
         # si terminó dentro de una función sin EndFunc (defensivo)
         if inside and current:
             functions.append(current)
+        return top, functions
+
+    def emit_boot(self, top):
+        """Emite el TAC top-level como la función _program_init."""
+        self._have_boot = True
+        self.emit("\n# --- Función " + self._boot_label + " ---")
+        self.emit(".text")
+        self.emit(self._boot_label + ":")
+
+        # Frame de _program_init
+        spill_hint = self.regs.start_function(spill_bytes_hint=256)
+        self.stack_size = self._align(spill_hint + 8)
+        self.emit("  addiu $sp, $sp, -" + str(self.stack_size))
+        self.emit("  sw   $ra, " + str(self.stack_size - 4) + "($sp)")
+        self.emit("  sw   $fp, " + str(self.stack_size - 8) + "($sp)")
+        self.emit("  addu $fp, $sp, $zero")
+
+        # Emitir el código del top-level
+        self.current_func = self._boot_label
+        self._emit_quads_sequence(top)
+
+        # Epilogo de _program_init
+        self.emit("  lw   $ra, " + str(self.stack_size - 4) + "($sp)")
+        self.emit("  lw   $fp, " + str(self.stack_size - 8) + "($sp)")
+        self.emit("  addiu $sp, $sp, " + str(self.stack_size))
+        self.emit("  jr   $ra")
+        self.emit("  nop")
+
+        self.current_func = None
+        self.regs.end_function()
+
+    def emit_fallback_main(self):
+        """Si hubo top-level pero no hubo 'main', genera un main mínimo."""
+        self.begin_function("main", 0)
+        self.emit("  # main generado (fallback) -> invoca _program_init y sale")
+        self.emit("  jal " + self._boot_label); self.emit("  nop")
+        self.emit_return(None)  # esto agregará syscall 10 por ser 'main'
+
+    def from_quads(self, quads):
+        """
+        Recolecta todos los quads fuera de funciones (antes/entre/después)
+        y los emite como _program_init; luego emite cada función.
+        """
+        top, functions = self.split_quads(quads)
 
         # Emite el boot si hay TAC top-level
         if top:
-            self._have_boot = True
-            self.emit("\n# --- Función " + self._boot_label + " ---")
-            self.emit(".text")
-            self.emit(self._boot_label + ":")
-            
-            # Frame de _program_init
-            spill_hint = self.regs.start_function(spill_bytes_hint=256)
-            self.stack_size = self._align(spill_hint + 8)
-            self.emit("  addiu $sp, $sp, -" + str(self.stack_size))
-            self.emit("  sw   $ra, " + str(self.stack_size - 4) + "($sp)")
-            self.emit("  sw   $fp, " + str(self.stack_size - 8) + "($sp)")
-            self.emit("  addu $fp, $sp, $zero")
-            
-            # Emitir el código del top-level
-            self.current_func = self._boot_label
-            self._emit_quads_sequence(top)
-            
-            # Epilogo de _program_init
-            self.emit("  lw   $ra, " + str(self.stack_size - 4) + "($sp)")
-            self.emit("  lw   $fp, " + str(self.stack_size - 8) + "($sp)")
-            self.emit("  addiu $sp, $sp, " + str(self.stack_size))
-            self.emit("  jr   $ra")
-            self.emit("  nop")
-            
-            self.current_func = None
-            self.regs.end_function()
+            self.emit_boot(top)
 
         # Emite todas las funciones en orden
         for fn_chunk in functions:
@@ -585,10 +602,7 @@ class MIPSEmitter:
 
         # Fallback: si hubo top-level pero no hubo 'main', genera un main mínimo
         if self._have_boot and not self._saw_main:
-            self.begin_function("main", 0)
-            self.emit("  # main generado (fallback) -> invoca _program_init y sale")
-            self.emit("  jal " + self._boot_label); self.emit("  nop")
-            self.emit_return(None)  # esto agregará syscall 10 por ser 'main'
+            self.emit_fallback_main()
 
     def build(self):
         out = []
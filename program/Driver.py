@@ -1,322 +1,521 @@
 # program/Driver.py
 from __future__ import annotations
-import sys, time, re, json
+import sys, time, json
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, TYPE_CHECKING
 
-# --- Rutas robustas ---
+# --- Rutas ---
 HERE    = Path(__file__).resolve().parent          # .../program
 ROOT    = HERE.parent                               # repo raíz
-SCRIPTS = ROOT / "scripts"                          # .../scripts
-for p in (ROOT, SCRIPTS, HERE):
-    sp = str(p)
-    if sp not in sys.path:
-        sys.path.insert(0, sp)
-
-# --- Import seguro de ANTLR/gramática ---
-def _import_antlr_modules():
-    try:
-        from scripts.CompiscriptLexer import CompiscriptLexer
-        from scripts.CompiscriptParser import CompiscriptParser
-        try:
-            from scripts.CompiscriptVisitor import CompiscriptVisitor  # opcional
-        except Exception:
-            class CompiscriptVisitor: pass
-        return CompiscriptLexer, CompiscriptParser, CompiscriptVisitor
-    except Exception as e:
-        msg = (
-            "No se encontró CompiscriptLexer/Parser en /scripts.\n"
-            "Genera los archivos con:\n\n"
-            "  java -jar antlr-4.13.1-complete.jar "
-            "-Dlanguage=Python3 -visitor -o scripts grammar/Compiscript.g4\n"
-        )
-        raise ImportError(msg + f"\nDetalle: {e}")
-
-CompiscriptLexer, CompiscriptParser, _ = _import_antlr_modules()
+if not __package__:
+    # ejecutado como script (python program/Driver.py): sys.path[0] es program/
+    sys.path.insert(0, str(ROOT))
 
 from antlr4 import InputStream, CommonTokenStream
+from antlr4.atn.PredictionMode import PredictionMode
 from antlr4.error.ErrorListener import ErrorListener
-
-# --- Núcleo semántico/TAC (nuestros) ---
-from program.symbol_table import SymbolTable
-from program.type_check_visitor import TypeCheckVisitor
-from program.TACGeneratorVisitor import TACGeneratorVisitor
-
-# --- Backend MIPS ---
-try:
-    from backend.mips.tac_parser import parse_tac_text
-    from backend.mips.emitter import MIPSEmitter
-except Exception:
-    parse_tac_text = None
-    MIPSEmitter = None
+from antlr4.error.ErrorStrategy import BailErrorStrategy, DefaultErrorStrategy
+from antlr4.error.Errors import ParseCancellationException
+
+from program.diagnostics import Diagnostic, from_json, render, to_json
+from program.ir import format_ir
+from program.parse_tree_view import LazyParseTree
+from program.session import CompilationSession, Progress
+
+if TYPE_CHECKING:
+    from program.compile_cache import CompileCache
+    from program.function_cache import FunctionCache
+
+# --- Imports perezosos ---
+# Cada etapa importa sus módulos la primera vez que corre: la gramática al
+# parsear; semántico, TAC y backend solo si se llega a esas etapas; las
+# cachés solo si se usan. Un --syntax-only no carga nada de TAC ni MIPS
+# (ver test/test_import_time.py).
+_grammar_modules = None
+
+def _grammar():
+    """(CompiscriptLexer, CompiscriptParser), importados la primera vez."""
+    global _grammar_modules
+    if _grammar_modules is None:
+        try:
+            from scripts.CompiscriptLexer import CompiscriptLexer
+            from scripts.CompiscriptParser import CompiscriptParser
+        except Exception as e:
+            msg = (
+                "No se encontró CompiscriptLexer/Parser en /scripts.\n"
+                "Genera los archivos con:\n\n"
+                "  java -jar antlr-4.13.1-complete.jar "
+                "-Dlanguage=Python3 -visitor -o scripts grammar/Compiscript.g4\n"
+            )
+            raise ImportError(msg + f"\nDetalle: {e}")
+        _grammar_modules = (CompiscriptLexer, CompiscriptParser)
+    return _grammar_modules
+
+def _backend():
+    """(parse_tac_text, MIPSEmitter), o (None, None) si falta backend/mips."""
+    try:
+        from backend.mips.tac_parser import parse_tac_text
+        from backend.mips.emitter import MIPSEmitter
+    except Exception:
+        return None, None
+    return parse_tac_text, MIPSEmitter
+
+def _type_check_visitor():
+    from program.type_check_visitor import TypeCheckVisitor
+    return TypeCheckVisitor
+
+def _lower():
+    from program.typed_ast import lower
+    return lower
+
+def _tac_generator_visitor():
+    from program.TACGeneratorVisitor import TACGeneratorVisitor
+    return TACGeneratorVisitor
+
+# Nombres que otros módulos siguen importando desde el Driver
+_LAZY_NAMES = {
+    "CompiscriptLexer":    lambda: _grammar()[0],
+    "CompiscriptParser":   lambda: _grammar()[1],
+    "TypeCheckVisitor":    _type_check_visitor,
+    "TACGeneratorVisitor": _tac_generator_visitor,
+    "parse_tac_text":      lambda: _backend()[0],
+    "MIPSEmitter":         lambda: _backend()[1],
+}
+
+def __getattr__(name):
+    loader = _LAZY_NAMES.get(name)
+    if loader is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return loader()
 
 
 # ---------- Listener de errores sintácticos ----------
 class CollectingErrorListener(ErrorListener):
     def __init__(self):
         super().__init__()
-        self.errors: List[Dict[str, Any]] = []
+        self.errors: List[Diagnostic] = []
     def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
-        self.errors.append({"sev":"error","line":int(line),"col":int(column),"msg":str(msg)})
+        text = getattr(offendingSymbol, "text", None)
+        end_col = int(column) + len(text) if text and text != "<EOF>" else None
+        self.errors.append(Diagnostic("syntax", int(line), int(column), int(line) if end_col else None,
+                                      end_col, text=str(msg)))
+
+# ---------- Caché en disco del DFA de ANTLR ----------
+_dfa_cache_checked = False
+
+def _ensure_dfa_cache() -> bool:
+    """Carga una sola vez por proceso el DFA entrenado (ver program/dfa_cache.py)."""
+    global _dfa_cache_checked
+    if _dfa_cache_checked:
+        return False
+    _dfa_cache_checked = True
+    try:
+        from program.dfa_cache import load_dfa_cache
+        return load_dfa_cache()
+    except Exception:
+        return False
+
+# ---------- Estrategia de parseo ----------
+#  "ll"      -> una sola pasada LL completa (comportamiento original).
+#  "sll-ll"  -> primero SLL con BailErrorStrategy; solo si falla se
+#               re-parsea en LL con CollectingErrorListener.
+PARSE_MODE_LL = "ll"
+PARSE_MODE_TWO_STAGE = "sll-ll"
+PARSE_MODES = (PARSE_MODE_LL, PARSE_MODE_TWO_STAGE)
+
+def _parse_program(tokens: CommonTokenStream, parse_mode: str = PARSE_MODE_TWO_STAGE):
+    """
+    Parsea la regla inicial 'program' y devuelve (parser, tree, syn, stage),
+    donde stage indica qué pasada produjo el árbol: "sll" o "ll".
+    """
+    if parse_mode not in PARSE_MODES:
+        raise ValueError(f"parse_mode desconocido: {parse_mode!r} (usa uno de {PARSE_MODES})")
+
+    parser = _grammar()[1](tokens)
+    syn = CollectingErrorListener()
+    parser.removeErrorListeners()
 
-# ---------- Utilidades ----------
-_ERR_PAT = [
-    re.compile(r".*?\b(linea|línea|line)\b\s+(\d+)\s*[: ,]\s*(\d+)\s*[:\-]?\s*(.+)", re.IGNORECASE),
-]
-
-def _semantic_str_to_struct(errs: List[str]) -> List[Dict[str, Any]]:
-    out: List[Dict[str, Any]] = []
-    for s in errs or []:
-        s = s.strip()
-        m = None
-        for p in _ERR_PAT:
-            m = p.match(s)
-            if m: break
-        if m:
-            out.append({"sev":"error","line":int(m.group(2)),"col":int(m.group(3)),"msg":m.group(4).strip()})
-        else:
-            out.append({"sev":"error","line":None,"col":None,"msg":s})
-    return out
+    if parse_mode == PARSE_MODE_TWO_STAGE:
+        # 1) SLL: rápido; ante el primer error aborta sin recuperación
+        parser._interp.predictionMode = PredictionMode.SLL
+        parser._errHandler = BailErrorStrategy()
+        try:
+            return parser, parser.program(), syn, "sll"
+        except ParseCancellationException:
+            tokens.seek(0)
+            parser.reset()
+        # 2) LL completo con recuperación y recolección de errores
+        parser._interp.predictionMode = PredictionMode.LL
+        parser._errHandler = DefaultErrorStrategy()
 
+    parser.addErrorListener(syn)
+    tree = parser.program()  # regla inicial
+    return parser, tree, syn, "ll"
+
+# ---------- Front end ----------
+#  "antlr" -> lexer/parser generados (según parse_mode).
+#  "rd"    -> lexer/parser escritos a mano (program/rd_parser.py); ante un
+#             error de sintaxis se re-parsea con ANTLR para los diagnósticos.
+FRONTEND_ANTLR = "antlr"
+FRONTEND_RD = "rd"
+FRONTENDS = (FRONTEND_ANTLR, FRONTEND_RD)
+
+def _parse_rd(source: str):
+    """Árbol del parser escrito a mano, o None si hay que recurrir a ANTLR."""
+    from program.rd_parser import parse as rd_parse, RDSyntaxError
+    try:
+        return rd_parse(source)
+    except RDSyntaxError:
+        return None
+
+# ---------- Utilidades ----------
 def _format_timing_line(timings: Dict[str, int], ok: bool) -> str:
     tag = "OK" if ok else "ERR"
-    return (f"{tag}Parse {timings.get('parse_ms',0)} ms | "
+    line = (f"{tag}Parse {timings.get('parse_ms',0)} ms | "
             f"Semántica {timings.get('semantic_ms',0)} ms | "
             f"IR {timings.get('ir_ms',0)} ms | ASM {timings.get('asm_ms',0)} ms")
+    if "cache" in timings:
+        line += f" | Caché {timings['cache']}"
+    if "functions" in timings:
+        line += f" | Funciones {timings['functions_reused']}/{timings['functions']} reutilizadas"
+    return line
 
-def _format_messages(errors: List[Dict[str, Any]], timings: Dict[str, int], tac_ok: bool) -> str:
+def _format_messages(errors: List[Diagnostic], timings: Dict[str, int], tac_ok: bool) -> str:
     head = _format_timing_line(timings, ok=(len(errors) == 0 and tac_ok))
     if not errors:
         suf = "🔹 TAC generado correctamente." if tac_ok else ""
         return (head + ("\n" if suf else "") + suf + ("\n✅ Compilación sin errores." if tac_ok else "")).strip()
-    body = "\n".join(f"line {e.get('line','-')}:{e.get('col','-')} {e.get('msg','')}" for e in errors)
-    return (head + "\n" + body).strip()
-
-
-# ============================================================
-#            P O S T - P A S S   D E   T A C
-#  (1) Reescribe sumas de strings: x = a + b
-#      --> Param a ; Param b ; x = call __strcat_new, 2
-#  (2) Reescribe 'call toString, 1' por '__int_to_str' si el arg es int
-#      (no toca 'call method toString, N').
-# ============================================================
-
-_STR_FIELDS = {"nombre", "color"}        # campos string más comunes en tu modelo
-_INTISH_HINT = {"edad", "grado", "prom"} # campos/temps usualmente int
-
-def _is_quoted_string(tok: str) -> bool:
-    tok = tok.strip()
-    return len(tok) >= 2 and tok[0] == '"' and tok[-1] == '"'
-
-def _token_name(tok: str) -> str:
-    return tok.strip()
-
-def _rewrite_tac_text(ir: str) -> str:
-    lines = [ln.rstrip() for ln in (ir or "").splitlines()]
-    if not lines:
-        return ir
-
-    # --- 1) Análisis de "stringish" variables (muy conservador) ---
-    stringish: set[str] = set()
-
-    # Marca por asignación desde literal y por getprop de campos string
-    assign_re = re.compile(r'^([A-Za-z_]\w*)\s*=\s*(.+)$')
-    getprop_re = re.compile(r'^([A-Za-z_]\w*)\s*=\s*getprop\s+([A-Za-z_]\w*)\s*,\s*([A-Za-z_]\w*)$', re.IGNORECASE)
-    call_strcat_new_re = re.compile(r'^([A-Za-z_]\w*)\s*=\s*call\s+__strcat_new\s*,\s*2$', re.IGNORECASE)
-
-    for ln in lines:
-        m = assign_re.match(ln)
-        if m:
-            dst, rhs = m.group(1), m.group(2).strip()
-            if _is_quoted_string(rhs):
-                stringish.add(dst)
-            # x = this.campo
-            m2 = re.match(r'^this\.([A-Za-z_]\w*)$', rhs)
-            if m2 and (m2.group(1) in _STR_FIELDS):
-                stringish.add(dst)
-            continue
-        m = getprop_re.match(ln)
-        if m and (m.group(3) in _STR_FIELDS):
-            stringish.add(m.group(1)); continue
-        m = call_strcat_new_re.match(ln)
-        if m:
-            stringish.add(m.group(1)); continue
-
-    # --- 2) Reescritura de x = a + b cuando hay strings ---
-    plus_re = re.compile(r'^([A-Za-z_]\w*)\s*=\s*(.+)\s*\+\s*(.+)$')
-    out: list[str] = []
-    for ln in lines:
-        m = plus_re.match(ln)
-        if not m:
-            out.append(ln)
-            continue
-
-        dst = _token_name(m.group(1))
-        a   = _token_name(m.group(2))
-        b   = _token_name(m.group(3))
-
-        a_is_str = _is_quoted_string(a) or (a in stringish) or (a in _STR_FIELDS)
-        b_is_str = _is_quoted_string(b) or (b in stringish) or (b in _STR_FIELDS)
-
-        if a_is_str or b_is_str:
-            out.append("Param " + a)
-            out.append("Param " + b)
-            out.append(dst + " = call __strcat_new, 2")
-            stringish.add(dst)
-        else:
-            out.append(ln)  # suma aritmética normal
-
-    # --- 3) Reescritura de 'call toString, 1' (no method) ---
-    final: list[str] = []
-    i = 0
-    while i < len(out):
-        ln = out[i]
-        m_call = re.match(r'^([A-Za-z_]\w*)\s*=\s*call\s+toString\s*,\s*1$', ln, re.IGNORECASE)
-        if m_call:
-            dst = m_call.group(1)
-            # busca el Param inmediatamente anterior
-            j = len(final) - 1
-            arg_tok = None
-            while j >= 0:
-                prev = final[j].strip()
-                m_param = re.match(r'^Param\s+(.+)$', prev, re.IGNORECASE)
-                if m_param:
-                    arg_tok = _token_name(m_param.group(1))
-                    break
-                # si encuentra otra cosa que no sea comentarios/Raw simples, corta
-                break
-            # decide si es int-ish
-            if arg_tok is not None:
-                is_intish = False
-                if arg_tok in _INTISH_HINT: is_intish = True
-                if _is_quoted_string(arg_tok): is_intish = False
-                if arg_tok in stringish: is_intish = False
-                # literal entero
-                if re.match(r'^-?\d+$', arg_tok): is_intish = True
-
-                if is_intish:
-                    final.append(dst + " = call __int_to_str, 1")
-                    stringish.add(dst)
-                    i += 1
-                    continue
-            # si no se decide, se deja igual
-            final.append(ln)
-            i += 1
-            continue
-
-        # no tocar: 'call method toString, N'
-        final.append(ln)
-        i += 1
-
-    return "\n".join(final)
+    return (head + "\n" + render(errors)).strip()
 
 
-# ---------- API principal para el IDE ----------
-def parse_code_from_string(source: str) -> Dict[str, Any]:
-    t0 = time.perf_counter()
-
-    lexer = CompiscriptLexer(InputStream(source))
+def _quads_to_asm(quads: List[tuple]) -> str:
+    """Quads del generador -> MIPS; nunca lanza: los errores quedan como comentario."""
+    MIPSEmitter = _backend()[1]
+    if MIPSEmitter is None:
+        return "# Backend MIPS no disponible (faltan backend/mips/*)."
+    try:
+        emitter = MIPSEmitter()
+        emitter.emit_preamble()
+        emitter.from_quads(quads)
+        return emitter.build()
+    except Exception as e:
+        return "# Error al emitir MIPS: " + str(e)
+
+
+def _tac_to_asm(ir: str) -> str:
+    """TAC (texto, p.ej. un .cgt) -> MIPS."""
+    parse_tac_text = _backend()[0]
+    if parse_tac_text is None:
+        return "# Backend MIPS no disponible (faltan backend/mips/*)."
+    return _quads_to_asm(parse_tac_text(ir))
+
+
+def _parse_source(source: str, parse_mode: str, frontend: str, use_dfa_cache: bool):
+    """Lexer + parser según las opciones: (tree, syn_errors, parse_stage, tokens)."""
+    if frontend == FRONTEND_RD:
+        tree = _parse_rd(source)
+        if tree is not None:
+            return tree, [], "rd", None
+    if use_dfa_cache:
+        _ensure_dfa_cache()
+    lexer = _grammar()[0](InputStream(source))
     tokens = CommonTokenStream(lexer)
-    parser = CompiscriptParser(tokens)
+    _, tree, syn, parse_stage = _parse_program(tokens, parse_mode)
+    return tree, syn.errors, parse_stage, tokens
 
-    syn = CollectingErrorListener()
-    parser.removeErrorListeners()
-    parser.addErrorListener(syn)
 
-    tree = parser.program()  # regla inicial
-    parse_tree_str = tree.toStringTree(recog=parser)
+class _ParseOnDemand(LazyParseTree):
+    """
+    Árbol de un resultado sacado de la caché de compilación: el código solo
+    se vuelve a parsear si alguien pide el árbol.
+    """
+    __slots__ = ("_source", "_options")
+
+    def __init__(self, source: str, options: Dict[str, Any]):
+        super().__init__(None, _grammar()[1].ruleNames)
+        self._source = source
+        self._options = options
+
+    def _load(self):
+        if self.tree is None:
+            self.tree = _parse_source(self._source, **self._options)[0]
+
+    def walk(self, max_depth=None):
+        self._load()
+        return super().walk(max_depth)
+
+    def stream(self, max_depth=None):
+        self._load()
+        return super().stream(max_depth)
+
+    def __bool__(self) -> bool:
+        return True
+
+
+# ---------- API principal para el IDE ----------
+def compile_session(source: str, parse_mode: str = PARSE_MODE_TWO_STAGE,
+                    use_dfa_cache: bool = True,
+                    frontend: str = FRONTEND_ANTLR,
+                    cache: Optional[CompileCache] = None,
+                    function_cache: Optional[FunctionCache] = None,
+                    symbols: bool = False,
+                    progress: Optional[Progress] = None,
+                    symbols_out: Optional[str] = None) -> CompilationSession:
+    """
+    Compila 'source' completo y devuelve la CompilationSession con lo que
+    produjo cada etapa (tokens, árbol, AST, errores, símbolos, IR, ASM);
+    session.result es el diccionario de parse_code_from_string.
+
+    Con 'cache' (CompileCache) un acierto devuelve IR, ASM, diagnósticos y
+    símbolos guardados sin ejecutar ninguna etapa; timings["cache"] indica
+    "hit" o "miss". Con 'function_cache' (FunctionCache) el TAC y el MIPS de
+    las funciones que no cambiaron desde la compilación anterior se
+    reutilizan. Con 'symbols' el semántico también arma el árbol de
+    símbolos (result["symbols"]). 'progress(etapa, sesión)' se llama al
+    terminar cada etapa de program.session.STAGES que se ejecuta.
+
+    La tabla de símbolos solo se exporta si se pasa 'symbols_out' (implica
+    'symbols'): la escribe en segundo plano el exportador del proceso
+    (program.symbol_export.default_exporter), atómica y solo si cambió.
+    """
+    if frontend not in FRONTENDS:
+        raise ValueError(f"frontend desconocido: {frontend!r} (usa uno de {FRONTENDS})")
+    t0 = time.perf_counter()
+
+    options = {"parse_mode": parse_mode, "frontend": frontend}
+    if function_cache is not None:
+        # las etiquetas/temporales del TAC por función son otros
+        options["function_cache"] = True
+    symbols = symbols or symbols_out is not None
+    if symbols:
+        options["symbols"] = True
+    session = CompilationSession(source, options)
+    key = None
+    if cache is not None:
+        from program.compile_cache import cache_key
+        key = cache_key(source, options)
+        entry = cache.get(key)
+        if entry is not None:
+            # el árbol perezoso solo recibe lo que entiende _parse_source
+            parse_options = {"parse_mode": parse_mode, "frontend": frontend,
+                             "use_dfa_cache": use_dfa_cache}
+            session.result = _result_from_cache(source, parse_options, entry,
+                                                round((time.perf_counter() - t0) * 1000))
+            session.symbols = session.result["symbols"]
+            _export_symbols(session, symbols_out)
+            return session
+
+    tree, syn_errors, parse_stage, tokens = _parse_source(source, parse_mode, frontend, use_dfa_cache)
+    session.tokens, session.tree, session.trees = tokens, tree, [(tree, 0)]
+    session.syn_errors, session.parse_stage = syn_errors, parse_stage
+    # Render perezoso: solo se construye el texto si alguien lo pide
+    parse_tree = LazyParseTree(tree, _grammar()[1].ruleNames)
 
     t1 = time.perf_counter()
+    if progress is not None:
+        progress("parse", session)
 
     # Semántico si no hay errores sintácticos
-    sem_struct: List[Dict[str, Any]] = []
-    symbols_tree = None
-    analyzer_errors: List[str] = []
-    if not syn.errors:
-        type_checker = TypeCheckVisitor()
-        type_checker.visit(tree)
-        analyzer_errors = type_checker.errors[:]
-        sem_struct = _semantic_str_to_struct(analyzer_errors)
-        try:
-            symbols_tree = type_checker.global_scope.to_dict()
-        except Exception:
-            symbols_tree = None
-        try:
-            type_checker.global_scope.export_json(str(ROOT / "symbol_table.json"))
-        except Exception:
-            pass
+    ast = None
+    if not syn_errors:
+        # AST tipado: se baja una vez y lo recorren el semántico y el TAC
+        ast = _lower()(tree)
+        session.ast, session.asts = ast, [(ast, 0)]
+        type_checker = _type_check_visitor()()
+        type_checker.visit(ast)
+        session.sem_errors = type_checker.errors[:]
+        # el analizador anota el tipo de cada expresión (lo usa el TAC)
+        session.analyze()
+        if symbols:
+            session.analyze_symbols()
+            _export_symbols(session, symbols_out)
 
     t2 = time.perf_counter()
+    if progress is not None and not syn_errors:
+        progress("semantic", session)
 
     # IR/TAC
-    ir  = ""
-    asm = ""
-    tac_ok = False
-    if not syn.errors and not analyzer_errors:
-        tac = TACGeneratorVisitor()
-        tac.visit(tree)
-        ir = tac.get_code()
-
-        # === APLICAR POST-PASS DE REESCRITURA ===
-        ir = _rewrite_tac_text(ir)
-
-        tac_ok = True
+    if not syn_errors and not session.sem_errors:
+        tac = _tac_generator_visitor()()
+        if function_cache is not None:
+            function_cache.begin([ast])
+            tac.function_cache = function_cache
+        tac.visit(ast)
+        session.quads = tac.get_ir()
+        session.ir = format_ir(session.quads)
+        session.tac_ok = True
 
     t3 = time.perf_counter()
+    if progress is not None and session.tac_ok:
+        progress("ir", session)
 
     # ASM (MIPS)
-    t_asm_start = time.perf_counter()
-    if tac_ok and parse_tac_text is not None and MIPSEmitter is not None:
-        try:
-            quads = parse_tac_text(ir)
-            emitter = MIPSEmitter()
-            emitter.emit_preamble()
-            emitter.from_quads(quads)
-            asm = emitter.build()
-        except Exception as e:
-            asm = "# Error al emitir MIPS: " + str(e)
-    elif tac_ok:
-        asm = "# Backend MIPS no disponible (faltan backend/mips/*)."
-    t_asm_end = time.perf_counter()
-
+    if session.tac_ok:
+        session.asm = (function_cache.asm_for_quads(session.quads) if function_cache is not None
+                       else _quads_to_asm(session.quads))
+    t4 = time.perf_counter()
+    if progress is not None and session.tac_ok:
+        progress("asm", session)
+
+    tac_ok = session.tac_ok
     timings = {
         "parse_ms":    round((t1 - t0) * 1000),
         "semantic_ms": round((t2 - t1) * 1000),
         "ir_ms":       round((t3 - t2) * 1000) if tac_ok else 0,
-        "asm_ms":      round((t_asm_end - t_asm_start) * 1000) if tac_ok else 0,
+        "asm_ms":      round((t4 - t3) * 1000) if tac_ok else 0,
+        "parse_stage": parse_stage,
     }
+    if function_cache is not None and tac_ok:
+        timings.update(function_cache.stats)
+    all_errors = syn_errors + session.sem_errors
 
-    all_errors = syn.errors + sem_struct
-    messages = _format_messages(all_errors, timings, tac_ok)
-
+    if cache is not None:
+        timings["cache"] = "miss"
+        try:
+            cache.put(key, {
+                "ir": session.ir, "asm": session.asm, "errors": to_json(all_errors),
+                "symbols": session.symbols, "tac_ok": tac_ok, "parse_stage": parse_stage,
+            })
+        except (OSError, TypeError, ValueError):
+            pass  # la caché nunca hace fallar la compilación
+
+    session.timings = timings
+    session.result = {
+        "parse_tree": parse_tree,
+        "messages": _format_messages(all_errors, timings, tac_ok),
+        "actions": "",
+        "ir": session.ir,
+        "asm": session.asm,
+        "errors": all_errors,
+        "symbols": session.symbols,
+        "timings": timings,
+    }
+    return session
+
+def parse_code_from_string(source: str, parse_mode: str = PARSE_MODE_TWO_STAGE,
+                           use_dfa_cache: bool = True,
+                           frontend: str = FRONTEND_ANTLR,
+                           cache: Optional[CompileCache] = None,
+                           function_cache: Optional[FunctionCache] = None,
+                           symbols: bool = False,
+                           symbols_out: Optional[str] = None) -> Dict[str, Any]:
+    """compile_session(...).result: el diccionario con IR, ASM, errores y timings."""
+    return compile_session(source, parse_mode, use_dfa_cache, frontend, cache,
+                           function_cache, symbols, symbols_out=symbols_out).result
+
+def _export_symbols(session: CompilationSession, path: Optional[str]) -> None:
+    if path is None or session.symbols is None:
+        return
+    from program.symbol_export import default_exporter
+    session.export_symbols(path, default_exporter())
+
+def check_syntax(source: str, parse_mode: str = PARSE_MODE_TWO_STAGE,
+                 use_dfa_cache: bool = True,
+                 frontend: str = FRONTEND_ANTLR) -> Dict[str, Any]:
+    """
+    Solo lexer + parser: mismas claves que parse_code_from_string, con
+    'errors' únicamente sintácticos y sin IR/ASM. No importa el semántico,
+    el generador de TAC ni el backend.
+    """
+    if frontend not in FRONTENDS:
+        raise ValueError(f"frontend desconocido: {frontend!r} (usa uno de {FRONTENDS})")
+    t0 = time.perf_counter()
+    tree, syn_errors, parse_stage, _ = _parse_source(source, parse_mode, frontend, use_dfa_cache)
+    timings = {
+        "parse_ms": round((time.perf_counter() - t0) * 1000),
+        "parse_stage": parse_stage,
+        "syntax_only": True,
+    }
+    head = f"{'ERR' if syn_errors else 'OK'}Parse {timings['parse_ms']} ms | Solo sintaxis"
+    if syn_errors:
+        messages = head + "\n" + render(syn_errors)
+    else:
+        messages = head + "\n✅ Sintaxis correcta."
     return {
-        "parse_tree": parse_tree_str,
+        "parse_tree": LazyParseTree(tree, _grammar()[1].ruleNames),
         "messages": messages,
         "actions": "",
-        "ir": ir,
-        "asm": asm,
-        "errors": all_errors,
-        "symbols": symbols_tree,
+        "ir": "",
+        "asm": "",
+        "errors": syn_errors,
+        "symbols": None,
+        "timings": timings,
+    }
+
+def _result_from_cache(source: str, options: Dict[str, Any], entry: Dict[str, Any],
+                       lookup_ms: int) -> Dict[str, Any]:
+    timings = {
+        "parse_ms": 0, "semantic_ms": 0, "ir_ms": 0, "asm_ms": 0,
+        "parse_stage": entry.get("parse_stage"),
+        "cache": "hit",
+        "cache_ms": lookup_ms,
+    }
+    errors = from_json(entry.get("errors"))
+    return {
+        "parse_tree": _ParseOnDemand(source, options),
+        "messages": _format_messages(errors, timings, bool(entry.get("tac_ok"))),
+        "actions": "",
+        "ir": entry.get("ir", ""),
+        "asm": entry.get("asm", ""),
+        "errors": errors,
+        "symbols": entry.get("symbols"),
         "timings": timings,
     }
 
 # ---------- CLI ----------
 def main(argv):
     src_path = ROOT / "program.cps"
-    if len(argv) > 1:
-        src_path = Path(argv[1]).resolve()
+    parse_mode = PARSE_MODE_TWO_STAGE
+    frontend = FRONTEND_ANTLR
+    cache = None
+    show_tree, tree_depth = False, None
+    syntax_only = False
+    symbols_out = None
+    args = []
+    for a in argv[1:]:
+        if a.startswith("--parse-mode="):
+            parse_mode = a.split("=", 1)[1]
+        elif a.startswith("--frontend="):
+            frontend = a.split("=", 1)[1]
+        elif a == "--cache" or a.startswith("--cache="):
+            from program.compile_cache import CompileCache
+            cache = CompileCache(a.split("=", 1)[1] if "=" in a else None)
+        elif a == "--syntax-only":
+            syntax_only = True
+        elif a.startswith("--symbols-out="):
+            symbols_out = a.split("=", 1)[1]
+        elif a == "--tree" or a.startswith("--tree="):
+            show_tree = True
+            if "=" in a:
+                tree_depth = int(a.split("=", 1)[1])
+        else:
+            args.append(a)
+    if args:
+        src_path = Path(args[0]).resolve()
 
     try:
         code = Path(src_path).read_text(encoding="utf-8")
     except UnicodeDecodeError:
         code = Path(src_path).read_text(encoding="latin-1")
 
-    out = parse_code_from_string(code)
+    if syntax_only:
+        out = check_syntax(code, parse_mode=parse_mode, frontend=frontend)
+    else:
+        out = parse_code_from_string(code, parse_mode=parse_mode, frontend=frontend,
+                                     cache=cache, symbols_out=symbols_out)
     print(out["messages"])
+    if show_tree and out.get("parse_tree"):
+        print("\n=== Árbol ===")
+        for chunk in out["parse_tree"].stream(tree_depth):
+            sys.stdout.write(chunk)
+        sys.stdout.write("\n")
     if out.get("ir"):
         print("\n=== TAC ===\n" + out["ir"])
     if out.get("asm"):
         print("\n=== ASM (MIPS) ===\n" + out["asm"])
+    if symbols_out and not syntax_only:
+        from program.symbol_export import default_exporter
+        default_exporter().flush()
 
 if __name__ == '__main__':
     main(sys.argv)
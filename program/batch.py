@@ -0,0 +1,211 @@
+# program/batch.py
+"""
+Compilación por lotes en paralelo.
+
+Recibe archivos, directorios o globs de .cps/.cspt y los reparte entre un
+ProcessPoolExecutor cuyos workers se precalientan una sola vez (imports de
+ANTLR, DFA en caché y una compilación mínima), así que el arranque se paga
+por worker y no por archivo. Junto a cada fuente se escriben sus artefactos
+(<nombre>.tac y <nombre>.s) y por la salida (o --summary=archivo) va un
+resumen JSON-lines: una línea por archivo, en el orden de entrada, y una
+línea final con los totales.
+
+Uso:
+    python -m program.batch [-j N] [--parse-mode=...] [--frontend=...]
+                            [--cache[=dir]] [--summary=archivo] [--no-artifacts]
+                            rutas|directorios|globs...
+"""
+from __future__ import annotations
+
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, TextIO
+
+from program.Driver import (
+    FRONTEND_ANTLR, PARSE_MODE_TWO_STAGE, _ensure_dfa_cache, parse_code_from_string,
+)
+from program.compile_cache import CompileCache
+from program.diagnostics import Diagnostic, to_json
+
+SOURCE_SUFFIXES = (".cps", ".cspt")
+
+_WARMUP = "function f(n: integer): integer { return n + 1; }\nprint(f(1));\n"
+
+# opciones del worker (las fija _init_worker)
+_options: Dict[str, Any] = {}
+
+
+def collect_sources(patterns: Iterable[str]) -> List[Path]:
+    """Expande archivos, directorios (recursivo) y globs; sin duplicados, ordenado."""
+    found = set()
+    for pat in patterns:
+        p = Path(pat)
+        if p.is_dir():
+            for suf in SOURCE_SUFFIXES:
+                found.update(q.resolve() for q in p.rglob("*" + suf))
+        elif p.is_file():
+            found.add(p.resolve())
+        else:
+            for m in glob.glob(pat, recursive=True):
+                q = Path(m)
+                if q.is_file() and q.suffix in SOURCE_SUFFIXES:
+                    found.add(q.resolve())
+    return sorted(found)
+
+
+# ---------- worker ----------
+def _init_worker(options: Dict[str, Any]) -> None:
+    """Precalienta el proceso: DFA de ANTLR y una compilación de prueba."""
+    global _options
+    _options = dict(options)
+    cache_dir = _options.pop("cache_dir", None)
+    if _options.pop("cache", False):
+        _options["cache"] = CompileCache(cache_dir)
+    _ensure_dfa_cache()
+    parse_code_from_string(_WARMUP, parse_mode=_options.get("parse_mode", PARSE_MODE_TWO_STAGE),
+                           frontend=_options.get("frontend", FRONTEND_ANTLR))
+
+
+def _read_source(path: Path) -> str:
+    try:
+        return path.read_text(encoding="utf-8")
+    except UnicodeDecodeError:
+        return path.read_text(encoding="latin-1")
+
+
+def compile_file(path: str) -> Dict[str, Any]:
+    """Compila un archivo y escribe sus artefactos; devuelve su línea de resumen."""
+    t0 = time.perf_counter()
+    src = Path(path)
+    record: Dict[str, Any] = {"file": str(src), "ok": False}
+    opts = dict(_options)
+    artifacts = opts.pop("artifacts", True)
+    try:
+        out = parse_code_from_string(_read_source(src), **opts)
+        record["ok"] = not out["errors"] and bool(out["ir"])
+        record["errors"] = to_json(out["errors"])
+        record["timings"] = out["timings"]
+        if artifacts:
+            written = []
+            for suffix, key in ((".tac", "ir"), (".s", "asm")):
+                if out.get(key):
+                    dst = src.with_suffix(suffix)
+                    dst.write_text(out[key] + "\n", encoding="utf-8")
+                    written.append(str(dst))
+            record["artifacts"] = written
+    except Exception as e:
+        record["errors"] = to_json([Diagnostic("internal", text=f"{type(e).__name__}: {e}")])
+    record["wall_ms"] = round((time.perf_counter() - t0) * 1000)
+    record["worker"] = os.getpid()
+    return record
+
+
+# ---------- lote ----------
+def run_batch(paths: List[Path], jobs: Optional[int] = None,
+              options: Optional[Dict[str, Any]] = None,
+              out: TextIO = sys.stdout) -> Dict[str, Any]:
+    """
+    Compila 'paths' con 'jobs' procesos (por defecto, uno por CPU) y escribe
+    el resumen JSON-lines en 'out'. Devuelve la línea de totales.
+    """
+    options = dict(options or {})
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(paths) or 1))
+    t0 = time.perf_counter()
+    failed = 0
+
+    def _write(rec: Dict[str, Any]) -> None:
+        out.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        out.flush()
+
+    names = [str(p) for p in paths]
+    if jobs == 1:
+        _init_worker(options)
+        results: Iterable[Dict[str, Any]] = map(compile_file, names)
+    else:
+        ex = ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(options,))
+        # lotes pequeños: reparto parejo aunque los archivos tarden distinto
+        results = ex.map(compile_file, names, chunksize=max(1, len(names) // (jobs * 8)))
+    try:
+        for rec in results:
+            failed += not rec["ok"]
+            _write(rec)
+    finally:
+        if jobs > 1:
+            ex.shutdown()
+
+    total = {
+        "summary": True,
+        "files": len(paths),
+        "ok": len(paths) - failed,
+        "failed": failed,
+        "jobs": jobs,
+        "wall_ms": round((time.perf_counter() - t0) * 1000),
+    }
+    _write(total)
+    return total
+
+
+# ---------- CLI ----------
+_USAGE = ("uso: python -m program.batch [-j N] [--parse-mode=...] [--frontend=...] "
+          "[--cache[=dir]] [--summary=archivo] [--no-artifacts] rutas...")
+
+
+def _jobs_arg(text: Optional[str]) -> int:
+    """Valor de -j/--jobs; 0 si falta o no es un entero (main lo rechaza)."""
+    try:
+        return int(text)
+    except (TypeError, ValueError):
+        return 0
+
+
+def main(argv) -> int:
+    jobs = None
+    options: Dict[str, Any] = {}
+    summary = None
+    patterns = []
+    args = iter(argv[1:])
+    for a in args:
+        if a == "-j":
+            jobs = _jobs_arg(next(args, None))
+        elif a.startswith("-j"):
+            jobs = _jobs_arg(a[2:].lstrip("="))
+        elif a.startswith("--jobs="):
+            jobs = _jobs_arg(a.split("=", 1)[1])
+        elif a.startswith("--parse-mode="):
+            options["parse_mode"] = a.split("=", 1)[1]
+        elif a.startswith("--frontend="):
+            options["frontend"] = a.split("=", 1)[1]
+        elif a == "--cache" or a.startswith("--cache="):
+            options["cache"] = True
+            if "=" in a:
+                options["cache_dir"] = a.split("=", 1)[1]
+        elif a.startswith("--summary="):
+            summary = a.split("=", 1)[1]
+        elif a == "--no-artifacts":
+            options["artifacts"] = False
+        else:
+            patterns.append(a)
+
+    if not patterns or (jobs is not None and jobs < 1):
+        print(_USAGE, file=sys.stderr)
+        return 2
+    paths = collect_sources(patterns)
+    if not paths:
+        print("No se encontraron archivos .cps/.cspt", file=sys.stderr)
+        return 2
+
+    if summary:
+        with open(summary, "w", encoding="utf-8") as f:
+            total = run_batch(paths, jobs, options, f)
+    else:
+        total = run_batch(paths, jobs, options)
+    return 0 if total["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
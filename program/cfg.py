@@ -0,0 +1,205 @@
+# program/cfg.py
+"""
+Grafo de flujo de control (CFG) sobre los quads del generador (program/ir.py).
+
+Un bloque básico empieza en la primera instrucción, en cada Label y después
+de cada Goto / IfZ / Return, y termina antes del siguiente líder. Sucesores:
+  - Goto L: el bloque de L;
+  - IfZ x, L: el bloque de L y el siguiente (si x != 0 se cae);
+  - Return: ninguno (salida de la función);
+  - cualquier otro final: el bloque siguiente.
+Un salto a una etiqueta que no está en la función no agrega arista.
+
+Uso:
+    for cfg in function_cfgs(quads):     # uno por BeginFunc (+ el preámbulo)
+        for b in cfg.rpo:                # alcanzables, en orden posorden inverso
+            b.quads, b.succs, b.preds, b.label
+        cfg.quads()                      # los quads otra vez en orden
+    idom = dominators(cfg)               # dominador inmediato de cada bloque
+    df = dominance_frontiers(cfg, idom)  # frontera de dominancia
+
+Construir un CFG es lineal en el número de quads: una pasada para partir en
+bloques, una para las aristas y un DFS iterativo para el orden (sin
+recursión, así que no hay límite por tamaño de función). Los dominadores
+salen del algoritmo iterativo de Cooper-Harvey-Kennedy sobre el RPO.
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterator, List, Optional, Set
+
+from program.ir import Quad
+
+# instrucciones que cierran un bloque
+_ENDS = {"Goto", "IfZ", "Return"}
+
+
+class BasicBlock:
+    """Bloque básico: quads consecutivos sin saltos adentro."""
+    __slots__ = ("index", "label", "quads", "succs", "preds", "rpo")
+
+    def __init__(self, index: int, quads: List[Quad]):
+        self.index = index                      # posición en cfg.blocks (orden del código)
+        self.label: Optional[str] = quads[0][1] if quads[0][0] == "Label" else None
+        self.quads = quads
+        self.succs: List["BasicBlock"] = []
+        self.preds: List["BasicBlock"] = []
+        self.rpo: Optional[int] = None          # posición en cfg.rpo; None si no es alcanzable
+
+    @property
+    def last(self) -> Quad:
+        return self.quads[-1]
+
+    def __repr__(self) -> str:
+        name = self.label or f"B{self.index}"
+        return f"<{name} {len(self.quads)} quads -> {[s.label or f'B{s.index}' for s in self.succs]}>"
+
+
+class CFG:
+    """CFG de una función: bloques en orden del código, entrada y orden RPO."""
+    __slots__ = ("name", "blocks", "by_label", "rpo")
+
+    def __init__(self, quads: List[Quad]):
+        self.name: Optional[str] = quads[0][1] if quads and quads[0][0] == "BeginFunc" else None
+        self.blocks: List[BasicBlock] = _split(quads)
+        self.by_label: Dict[str, BasicBlock] = {b.label: b for b in self.blocks if b.label is not None}
+        self._link()
+        self.rpo: List[BasicBlock] = self._number()
+
+    @property
+    def entry(self) -> Optional[BasicBlock]:
+        return self.blocks[0] if self.blocks else None
+
+    def _link(self) -> None:
+        blocks = self.blocks
+        for i, b in enumerate(blocks):
+            q = b.last
+            op = q[0]
+            if op == "Goto" or op == "IfZ":
+                target = self.by_label.get(q[1] if op == "Goto" else q[2])
+                if target is not None:
+                    b.succs.append(target)
+            if op != "Goto" and op != "Return" and i + 1 < len(blocks):
+                nxt = blocks[i + 1]
+                if nxt not in b.succs:
+                    b.succs.append(nxt)
+            for s in b.succs:
+                s.preds.append(b)
+
+    def _number(self) -> List[BasicBlock]:
+        entry = self.entry
+        if entry is None:
+            return []
+        post: List[BasicBlock] = []
+        seen = {entry.index}
+        stack = [(entry, iter(entry.succs))]
+        while stack:
+            b, it = stack[-1]
+            for s in it:
+                if s.index not in seen:
+                    seen.add(s.index)
+                    stack.append((s, iter(s.succs)))
+                    break
+            else:
+                stack.pop()
+                post.append(b)
+        post.reverse()
+        for i, b in enumerate(post):
+            b.rpo = i
+        return post
+
+    def quads(self) -> List[Quad]:
+        """Los quads de todos los bloques, en el orden del código."""
+        out: List[Quad] = []
+        for b in self.blocks:
+            out.extend(b.quads)
+        return out
+
+    def __iter__(self) -> Iterator[BasicBlock]:
+        return iter(self.blocks)
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+
+def _split(quads: List[Quad]) -> List[BasicBlock]:
+    blocks: List[BasicBlock] = []
+    cur: List[Quad] = []
+    for q in quads:
+        if q[0] == "Label" and cur:
+            blocks.append(BasicBlock(len(blocks), cur))
+            cur = []
+        cur.append(q)
+        if q[0] in _ENDS:
+            blocks.append(BasicBlock(len(blocks), cur))
+            cur = []
+    if cur:
+        blocks.append(BasicBlock(len(blocks), cur))
+    return blocks
+
+
+def split_functions(quads: List[Quad]) -> List[List[Quad]]:
+    """Trozos desde cada BeginFunc hasta el siguiente (lo previo va aparte)."""
+    out: List[List[Quad]] = []
+    start = 0
+    for i, q in enumerate(quads):
+        if q[0] == "BeginFunc" and i > start:
+            out.append(quads[start:i])
+            start = i
+    if start < len(quads):
+        out.append(quads[start:])
+    return out
+
+
+def function_cfgs(quads: List[Quad]) -> List[CFG]:
+    """Un CFG por función (y uno para lo que haya antes de la primera)."""
+    return [CFG(chunk) for chunk in split_functions(quads)]
+
+
+# ---------- dominancia ----------
+def dominators(cfg: CFG) -> List[Optional[BasicBlock]]:
+    """
+    Dominador inmediato de cada bloque (por b.index). La entrada es su propio
+    dominador; los bloques inalcanzables quedan en None.
+    """
+    idom: List[Optional[BasicBlock]] = [None] * len(cfg.blocks)
+    entry = cfg.entry
+    if entry is None:
+        return idom
+    idom[entry.index] = entry
+
+    def intersect(a: BasicBlock, b: BasicBlock) -> BasicBlock:
+        while a is not b:
+            while a.rpo > b.rpo:
+                a = idom[a.index]
+            while b.rpo > a.rpo:
+                b = idom[b.index]
+        return a
+
+    changed = True
+    while changed:
+        changed = False
+        for b in cfg.rpo[1:]:
+            new = None
+            for p in b.preds:
+                if idom[p.index] is not None:
+                    new = p if new is None else intersect(p, new)
+            if new is not None and idom[b.index] is not new:
+                idom[b.index] = new
+                changed = True
+    return idom
+
+
+def dominance_frontiers(cfg: CFG, idom: List[Optional[BasicBlock]]) -> List[Set[BasicBlock]]:
+    """Frontera de dominancia de cada bloque (por b.index)."""
+    df: List[Set[BasicBlock]] = [set() for _ in cfg.blocks]
+    for b in cfg.rpo:
+        preds = [p for p in b.preds if p.rpo is not None]
+        if len(preds) < 2:
+            continue
+        stop = idom[b.index]
+        for p in preds:
+            runner = p
+            while runner is not stop:
+                df[runner.index].add(b)
+                runner = idom[runner.index]
+    return df
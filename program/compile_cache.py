@@ -0,0 +1,226 @@
+# program/compile_cache.py
+"""
+Caché en disco, direccionada por contenido, de los resultados de
+parse_code_from_string.
+
+La clave es el sha256 de:
+  - la "versión del compilador": hash del código fuente del propio compilador
+    (program/, backend/ y el lexer/parser generados) + versión del runtime de
+    ANTLR; cualquier cambio en el compilador invalida todas las entradas,
+  - las opciones de compilación (parse_mode, frontend, ...),
+  - el texto fuente.
+
+Cada entrada es un JSON con IR, ASM, diagnósticos y árbol de símbolos. Las
+escrituras son atómicas (archivo temporal + os.replace), así que varios
+procesos pueden compartir el directorio. El tamaño total está acotado: al
+pasarse de max_bytes se borran las entradas usadas hace más tiempo (LRU por
+mtime; cada acierto actualiza el mtime de su entrada). El total se lleva en
+memoria (put y las entradas borradas lo ajustan): el directorio solo se
+recorre entero la primera vez, al pasarse del límite o cada _SWEEP_EVERY
+escrituras, para ver también lo que escribieron otros procesos.
+
+Uso:
+    python -m program.compile_cache stats | clear
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent
+
+DEFAULT_CACHE_DIR = ROOT / ".cache" / "compile"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+_FORMAT = 1
+_SUFFIX = ".json"
+_SWEEP_EVERY = 256
+
+# Código que determina la salida del compilador
+_COMPILER_GLOBS = ("program/*.py", "backend/**/*.py", "backend/**/*.s",
+                   "scripts/CompiscriptLexer.py", "scripts/CompiscriptParser.py")
+
+_compiler_version: Optional[str] = None
+
+
+def compiler_version() -> str:
+    """Hash del código del compilador (se calcula una vez por proceso)."""
+    global _compiler_version
+    if _compiler_version is None:
+        h = hashlib.sha256()
+        try:
+            from importlib.metadata import version
+            h.update(version("antlr4-python3-runtime").encode())
+        except Exception:
+            pass
+        files = sorted({p for pat in _COMPILER_GLOBS for p in ROOT.glob(pat)})
+        for p in files:
+            h.update(str(p.relative_to(ROOT)).encode())
+            h.update(b"\0")
+            h.update(p.read_bytes())
+        _compiler_version = h.hexdigest()
+    return _compiler_version
+
+
+def cache_key(source: str, options: Dict[str, Any]) -> str:
+    h = hashlib.sha256()
+    h.update(f"compiscript-cache/{_FORMAT}\0".encode())
+    h.update(compiler_version().encode())
+    h.update(json.dumps(options, sort_keys=True).encode())
+    h.update(b"\0")
+    h.update(source.encode("utf-8", "surrogatepass"))
+    return h.hexdigest()
+
+
+class CompileCache:
+    def __init__(self, directory: Optional[os.PathLike] = None,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory or DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+        # bytes de las entradas según la última pasada + lo escrito después
+        # (None: todavía no se recorrió el directorio)
+        self._bytes: Optional[int] = None
+        self._puts = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / (key + _SUFFIX)
+
+    # ---------- lectura ----------
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Entrada guardada, o None si no existe o está corrupta."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            self._drop(path)
+            return None
+        if not isinstance(entry, dict) or entry.get("format") != _FORMAT:
+            self._drop(path)
+            return None
+        try:
+            os.utime(path)  # LRU: marca la entrada como recién usada
+        except OSError:
+            pass
+        return entry
+
+    # ---------- escritura ----------
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        """Guarda la entrada (escritura atómica) y aplica el límite de tamaño."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        data = json.dumps(dict(entry, format=_FORMAT), ensure_ascii=False,
+                          separators=(",", ":")).encode("utf-8")
+        path = self._path(key)
+        try:
+            old = os.stat(path).st_size
+        except OSError:
+            old = 0
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-", suffix=_SUFFIX)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            self._discard(Path(tmp))
+            raise
+        self._puts += 1
+        if self._bytes is not None:
+            self._bytes += len(data) - old
+        if self._bytes is None or self._bytes > self.max_bytes or self._puts % _SWEEP_EVERY == 0:
+            self.evict()
+
+    def evict(self) -> int:
+        """Borra las entradas menos recientes hasta quedar bajo max_bytes."""
+        entries = []
+        total = 0
+        try:
+            it = os.scandir(self.directory)
+        except FileNotFoundError:
+            self._bytes = 0
+            return 0
+        with it:
+            for e in it:
+                if not e.name.endswith(_SUFFIX) or e.name.startswith(".tmp-"):
+                    continue
+                try:
+                    st = e.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, e.path))
+                total += st.st_size
+        removed = 0
+        if total > self.max_bytes:
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                self._discard(Path(path))
+                total -= size
+                removed += 1
+        self._bytes = total
+        return removed
+
+    def clear(self) -> None:
+        try:
+            it = os.scandir(self.directory)
+        except FileNotFoundError:
+            return
+        with it:
+            for e in it:
+                if e.name.endswith(_SUFFIX):
+                    self._discard(Path(e.path))
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        n = size = 0
+        try:
+            with os.scandir(self.directory) as it:
+                for e in it:
+                    if e.name.endswith(_SUFFIX) and not e.name.startswith(".tmp-"):
+                        n += 1
+                        size += e.stat().st_size
+        except FileNotFoundError:
+            pass
+        return {"entries": n, "bytes": size, "max_bytes": self.max_bytes}
+
+    def _drop(self, path: Path) -> None:
+        """Borra una entrada y la descuenta del total."""
+        try:
+            size = os.stat(path).st_size
+        except OSError:
+            return
+        self._discard(path)
+        if self._bytes is not None:
+            self._bytes -= size
+
+    @staticmethod
+    def _discard(path: Path) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def main(argv) -> int:
+    if len(argv) < 2 or argv[1] not in ("stats", "clear"):
+        print("uso: python -m program.compile_cache stats | clear")
+        return 2
+    cache = CompileCache()
+    if argv[1] == "clear":
+        cache.clear()
+        return 0
+    s = cache.stats()
+    print(f"{s['entries']} entradas, {s['bytes']} bytes (límite {s['max_bytes']}) en {cache.directory}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
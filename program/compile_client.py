@@ -0,0 +1,137 @@
+# program/compile_client.py
+"""
+Cliente liviano del servidor de compilación (program/compile_server.py).
+
+Reemplaza a 'python program/Driver.py archivo.cps' en scripts: misma salida,
+pero la compilación la hace el servidor residente. Solo usa la biblioteca
+estándar, así que arranca sin cargar ANTLR ni el backend. Si no hay servidor
+escuchando, compila en el propio proceso (con aviso por stderr), salvo con
+--no-fallback.
+
+Uso:
+    python -m program.compile_client [--socket=ruta] [--parse-mode=...]
+        [--frontend=...] [--cache] [--tree[=N]] [--no-fallback] archivo.cps
+    python -m program.compile_client --ping | --shutdown
+"""
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_SOCKET = os.environ.get("COMPISCRIPT_SOCKET", str(ROOT / ".cache" / "compile.sock"))
+
+
+class ServerUnavailable(OSError):
+    pass
+
+
+def request(req: Dict[str, Any], path: str = DEFAULT_SOCKET,
+            timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Envía un pedido y devuelve la respuesta; ServerUnavailable si no hay servidor."""
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    s.settimeout(timeout)
+    try:
+        try:
+            s.connect(path)
+        except OSError as e:
+            raise ServerUnavailable(f"no hay servidor en {path}: {e}") from None
+        s.sendall(json.dumps(req, ensure_ascii=False).encode("utf-8") + b"\n")
+        with s.makefile("rb") as f:
+            line = f.readline()
+    finally:
+        s.close()
+    if not line:
+        raise ServerUnavailable("el servidor cerró la conexión")
+    return json.loads(line)
+
+
+def compile_source(source: str, path: str = DEFAULT_SOCKET, tree=None,
+                   **options) -> Dict[str, Any]:
+    """parse_code_from_string remoto; el árbol llega ya en texto (o None)."""
+    resp = request({"op": "compile", "source": source, "options": options, "tree": tree}, path)
+    if not resp.get("ok"):
+        raise RuntimeError(resp.get("error", "error del servidor"))
+    result = resp["result"]
+    # los diagnósticos viajan como diccionarios; se devuelven como los del Driver
+    from program.diagnostics import from_json
+    result["errors"] = from_json(result.get("errors"))
+    return result
+
+
+def _compile_local(source: str, tree=None, **options) -> Dict[str, Any]:
+    from program.Driver import parse_code_from_string
+    from program.compile_cache import CompileCache
+
+    if options.pop("cache", False):
+        options["cache"] = CompileCache()
+    out = parse_code_from_string(source, **options)
+    if tree is not None and out.get("parse_tree"):
+        out["parse_tree"] = "".join(out["parse_tree"].stream(None if tree is True else tree))
+    else:
+        out["parse_tree"] = None
+    return out
+
+
+def main(argv) -> int:
+    path = DEFAULT_SOCKET
+    options: Dict[str, Any] = {}
+    tree = None
+    fallback = True
+    args = []
+    for a in argv[1:]:
+        if a.startswith("--socket="):
+            path = a.split("=", 1)[1]
+        elif a.startswith("--parse-mode="):
+            options["parse_mode"] = a.split("=", 1)[1]
+        elif a.startswith("--frontend="):
+            options["frontend"] = a.split("=", 1)[1]
+        elif a == "--cache":
+            options["cache"] = True
+        elif a == "--tree" or a.startswith("--tree="):
+            tree = int(a.split("=", 1)[1]) if "=" in a else True
+        elif a == "--no-fallback":
+            fallback = False
+        elif a in ("--ping", "--shutdown"):
+            try:
+                print(json.dumps(request({"op": a[2:]}, path)))
+            except ServerUnavailable as e:
+                print(e, file=sys.stderr)
+                return 1
+            return 0
+        else:
+            args.append(a)
+
+    src_path = Path(args[0]) if args else ROOT / "program.cps"
+    try:
+        code = src_path.read_text(encoding="utf-8")
+    except UnicodeDecodeError:
+        code = src_path.read_text(encoding="latin-1")
+
+    try:
+        out = compile_source(code, path, tree=tree, **options)
+    except ServerUnavailable as e:
+        if not fallback:
+            print(e, file=sys.stderr)
+            return 1
+        print(f"{e}; compilando localmente", file=sys.stderr)
+        out = _compile_local(code, tree=tree, **options)
+
+    # misma salida que program/Driver.py
+    print(out["messages"])
+    if out.get("parse_tree"):
+        print("\n=== Árbol ===")
+        print(out["parse_tree"])
+    if out.get("ir"):
+        print("\n=== TAC ===\n" + out["ir"])
+    if out.get("asm"):
+        print("\n=== ASM (MIPS) ===\n" + out["asm"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,172 @@
+# program/compile_server.py
+"""
+Servidor de compilación residente.
+
+Mantiene cargados la gramática, el generador de TAC y el backend, con el DFA
+de ANTLR ya caliente, y atiende pedidos por un socket Unix. Así cada pedido
+paga solo la compilación y no el arranque del intérprete ni los imports.
+
+Protocolo: una línea JSON por pedido y una línea JSON por respuesta.
+
+    {"op": "compile", "source": "...", "options": {"parse_mode": ..., "frontend": ...,
+     "cache": false}, "tree": null | profundidad | true}
+    -> {"ok": true, "result": {<mismas claves que parse_code_from_string>}}
+       result["parse_tree"] es el árbol en texto si se pidió "tree", si no null.
+
+    {"op": "ping"}      -> {"ok": true, "pid": ..., "version": ...}
+    {"op": "shutdown"}  -> {"ok": true}   (y el servidor termina)
+
+    Un pedido inválido responde {"ok": false, "error": "..."}.
+
+Uso:
+    python -m program.compile_server [--socket=ruta]
+El cliente liviano es program/compile_client.py.
+"""
+from __future__ import annotations
+
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+from typing import Any, Dict
+
+from program.Driver import (
+    FRONTEND_ANTLR, PARSE_MODE_TWO_STAGE, _ensure_dfa_cache, parse_code_from_string,
+)
+from program.compile_cache import CompileCache, compiler_version
+from program.compile_client import DEFAULT_SOCKET
+from program.diagnostics import to_json
+
+_WARMUP = "function f(n: integer): integer { return n + 1; }\nprint(f(1));\n"
+
+# límite de un pedido (una línea JSON)
+MAX_REQUEST_BYTES = 32 * 1024 * 1024
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for raw in iter(lambda: self.rfile.readline(MAX_REQUEST_BYTES + 1), b""):
+            if len(raw) > MAX_REQUEST_BYTES:
+                self._reply({"ok": False, "error": "pedido demasiado grande"})
+                return
+            if not raw.strip():
+                continue
+            req = None
+            try:
+                req = json.loads(raw)
+                if not isinstance(req, dict):
+                    raise ValueError("se esperaba un objeto JSON")
+                resp = self.server.dispatch(req)
+            except Exception as e:
+                resp = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            self._reply(resp)
+            if isinstance(req, dict) and req.get("op") == "shutdown":
+                return
+
+    def _reply(self, resp: Dict[str, Any]) -> None:
+        self.wfile.write(json.dumps(resp, ensure_ascii=False).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+
+class CompileServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Servidor de compilación; una conexión puede mandar varios pedidos."""
+    daemon_threads = True
+
+    def __init__(self, path: str = DEFAULT_SOCKET):
+        self.path = str(path)
+        _claim_socket(self.path)
+        super().__init__(self.path, _Handler)
+        # ANTLR comparte el DFA entre parsers: se compila de a un pedido
+        self._lock = threading.Lock()
+        self._cache = None
+        self.warm_up()
+
+    def warm_up(self) -> None:
+        _ensure_dfa_cache()
+        parse_code_from_string(_WARMUP)
+
+    # ---------- pedidos ----------
+    def dispatch(self, req: Dict[str, Any]) -> Dict[str, Any]:
+        op = req.get("op", "compile")
+        if op == "ping":
+            return {"ok": True, "pid": os.getpid(), "version": compiler_version()}
+        if op == "shutdown":
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {"ok": True}
+        if op != "compile":
+            return {"ok": False, "error": f"operación desconocida: {op!r}"}
+
+        source = req.get("source")
+        if not isinstance(source, str):
+            return {"ok": False, "error": "falta 'source' (texto)"}
+        opts = req.get("options") or {}
+        kwargs: Dict[str, Any] = {
+            "parse_mode": opts.get("parse_mode", PARSE_MODE_TWO_STAGE),
+            "frontend": opts.get("frontend", FRONTEND_ANTLR),
+        }
+        with self._lock:
+            if opts.get("cache"):
+                if self._cache is None:
+                    self._cache = CompileCache()
+                kwargs["cache"] = self._cache
+            out = parse_code_from_string(source, **kwargs)
+            tree = req.get("tree")
+            if tree is not None and tree is not False and out.get("parse_tree"):
+                depth = None if tree is True else int(tree)
+                out["parse_tree"] = "".join(out["parse_tree"].stream(depth))
+            else:
+                out["parse_tree"] = None
+        out["errors"] = to_json(out["errors"])
+        return {"ok": True, "result": out}
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def _claim_socket(path: str) -> None:
+    """Borra un socket abandonado; falla si ya hay un servidor escuchando."""
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        return
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        s.connect(path)
+    except OSError:
+        os.remove(path)
+        return
+    finally:
+        s.close()
+    raise OSError(f"ya hay un servidor de compilación en {path}")
+
+
+def main(argv) -> int:
+    path = DEFAULT_SOCKET
+    for a in argv[1:]:
+        if a.startswith("--socket="):
+            path = a.split("=", 1)[1]
+        else:
+            print("uso: python -m program.compile_server [--socket=ruta]", file=sys.stderr)
+            return 2
+    try:
+        server = CompileServer(path)
+    except OSError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(f"Servidor de compilación escuchando en {path} (pid {os.getpid()})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,134 @@
+# program/compile_worker.py
+"""
+Compilación en segundo plano para el IDE.
+
+Un hilo propio corre las compilaciones de a una. La cola tiene un solo
+lugar: un pedido nuevo reemplaza al que estaba esperando y cancela el que
+está corriendo. La cancelación es cooperativa: se corta al terminar la
+etapa en curso (ver program.session.STAGES), así el front end incremental
+nunca queda a medio actualizar.
+
+Los callbacks (on_stage, on_done, on_error) no se llaman desde el hilo de
+compilación: se entregan con 'post', que en Tk encola para el hilo de la
+interfaz (ver CompiscriptIDE._post / _drain_ui_queue, que vacía la cola con
+after()). Un resultado que llega cuando ya hay un pedido más nuevo se
+descarta.
+
+    worker = CompileWorker(lambda src, progress: inc.compile_session(src, progress=progress),
+                           post=ui_queue.put)
+    worker.submit(src, on_stage=..., on_done=..., on_error=...)
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Optional
+
+from program.session import CompilationSession, Progress
+
+CompileFn = Callable[[str, Progress], CompilationSession]
+
+
+class CompileCancelled(Exception):
+    """El pedido quedó viejo: hay uno más nuevo o se llamó a cancel()."""
+
+
+class _Job:
+    __slots__ = ("gen", "source", "on_stage", "on_done", "on_error")
+
+    def __init__(self, gen, source, on_stage, on_done, on_error):
+        self.gen = gen
+        self.source = source
+        self.on_stage = on_stage
+        self.on_done = on_done
+        self.on_error = on_error
+
+
+class CompileWorker:
+    def __init__(self, compile_fn: CompileFn,
+                 post: Optional[Callable[[Callable[[], Any]], Any]] = None):
+        self._compile = compile_fn
+        # sin 'post' los callbacks corren en el hilo del worker
+        self._post = post or (lambda fn: fn())
+        self._cond = threading.Condition()
+        self._gen = 0                    # sube con cada submit/cancel
+        self._pending: Optional[_Job] = None
+        self._running: Optional[_Job] = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._loop, name="compile-worker", daemon=True)
+        self._thread.start()
+
+    # ---------- API ----------
+    def submit(self, source: str,
+               on_stage: Optional[Callable[[str, CompilationSession], Any]] = None,
+               on_done: Optional[Callable[[CompilationSession], Any]] = None,
+               on_error: Optional[Callable[[BaseException], Any]] = None) -> int:
+        """Encola 'source'; reemplaza al pedido pendiente y cancela el actual."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("CompileWorker cerrado")
+            self._gen += 1
+            self._pending = _Job(self._gen, source, on_stage, on_done, on_error)
+            self._cond.notify()
+            return self._gen
+
+    def cancel(self) -> None:
+        """Descarta el pedido pendiente y corta el que está corriendo."""
+        with self._cond:
+            self._gen += 1
+            self._pending = None
+
+    @property
+    def busy(self) -> bool:
+        with self._cond:
+            return self._pending is not None or self._running is not None
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Espera a que no haya nada pendiente ni corriendo (para tests y cierre)."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._pending is None and self._running is None, timeout)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        with self._cond:
+            self._closed = True
+            self._gen += 1
+            self._pending = None
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    # ---------- hilo ----------
+    def _current(self, job: _Job) -> bool:
+        return job.gen == self._gen
+
+    def _deliver(self, job: _Job, fn: Optional[Callable[..., Any]], *args: Any) -> None:
+        if fn is None:
+            return
+        # se vuelve a mirar al entregar: el pedido pudo quedar viejo en la cola de la UI
+        self._post(lambda: fn(*args) if self._current(job) else None)
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None or self._closed)
+                if self._closed:
+                    return
+                job, self._pending = self._pending, None
+                self._running = job
+
+            def progress(stage: str, session: CompilationSession, job=job) -> None:
+                if not self._current(job):
+                    raise CompileCancelled(stage)
+                self._deliver(job, job.on_stage, stage, session)
+
+            try:
+                session = self._compile(job.source, progress)
+            except CompileCancelled:
+                pass
+            except Exception as e:
+                self._deliver(job, job.on_error, e)
+            else:
+                self._deliver(job, job.on_done, session)
+            finally:
+                with self._cond:
+                    self._running = None
+                    self._cond.notify_all()
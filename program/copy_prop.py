@@ -0,0 +1,151 @@
+# program/copy_prop.py
+"""
+Propagación de copias sobre los quads del generador (program/ir.py).
+
+Por función:
+
+  1. Hacia adelante, dentro de cada bloque básico (hasta la próxima
+     etiqueta): cada 'tK = x' (x constante, literal, nombre u otro
+     temporal) se recuerda y los usos siguientes de tK se reemplazan por x.
+     La copia se olvida cuando tK o x se vuelven a definir, en cada
+     etiqueta y, si x es una variable, en cada llamada (la función llamada
+     puede cambiar una global).
+  2. Hacia atrás, con los temporales vivos: una copia a un temporal que no
+     está vivo después de ella se borra. Los saltos hacia adelante se
+     resuelven en la misma pasada (la etiqueta destino ya se visitó); los
+     ciclos piden una pasada más por nivel de anidamiento.
+Ambas son lineales en el número de quads (por pasada); el antiguo peephole
+hacía un re.sub por línea y por temporal.
+
+Como el TempManager recicla nombres (t3 vuelve a usarse apenas se libera),
+nada se decide por el nombre del temporal en toda la función: las cadenas
+def-uso salen del orden de las instrucciones y de los saltos.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Set
+
+from program.cfg import split_functions
+from program.ir import DEF_AT, NAME_USES, USES, Quad, Temp
+
+_CALLS = {"Call", "CallMethod", "New"}
+
+
+def _is_var(x: Any) -> bool:
+    """Temporal o nombre (no constante ni literal string)."""
+    return type(x) is Temp or type(x) is str
+
+
+def copy_propagate(code: List[Quad]) -> List[Quad]:
+    out: List[Quad] = []
+    for fn in split_functions(code):
+        out.extend(_drop_dead_copies(_propagate(fn)))
+    return out
+
+
+def _propagate(code: List[Quad]) -> List[Quad]:
+    out: List[Quad] = []
+    copies: Dict[Temp, Any] = {}        # temporal -> lo que vale
+    by_src: Dict[str, Set[Temp]] = {}   # nombre/temporal -> temporales que lo copian
+    named: Set[Temp] = set()            # copias de variables (las invalida una llamada)
+
+    def forget(t: Temp) -> None:
+        src = copies.pop(t, None)
+        if _is_var(src):
+            by_src[src].discard(t)
+        named.discard(t)
+
+    for q in code:
+        op = q[0]
+        if op == "Label":
+            copies.clear(); by_src.clear(); named.clear()
+            out.append(q)
+            continue
+
+        # usos: se reemplazan por la copia vigente
+        uses = USES.get(op)
+        if uses and copies:
+            new = None
+            for i in uses:
+                x = q[i]
+                if type(x) is not Temp:
+                    continue
+                v = copies.get(x)
+                if v is None or ((op, i) in NAME_USES and not isinstance(v, str)):
+                    continue
+                if new is None:
+                    new = list(q)
+                new[i] = v
+            if new is not None:
+                q = tuple(new)
+
+        if op in _CALLS:
+            for t in list(named):
+                forget(t)
+
+        d = q[DEF_AT[op]] if op in DEF_AT else None
+        if d is not None:
+            src = q[2] if op == "Assign" else None
+            if src == d and type(src) is type(d):
+                continue            # x = x
+            # 'd' cambia: su copia y las que salen de él dejan de valer
+            if type(d) is Temp:
+                forget(d)
+            for t in by_src.pop(d, ()):
+                copies.pop(t, None)
+                named.discard(t)
+            if op == "Assign" and type(d) is Temp:
+                copies[d] = src
+                if _is_var(src):
+                    by_src.setdefault(src, set()).add(d)
+                    if type(src) is str and src != "this":
+                        named.add(d)
+        out.append(q)
+    return out
+
+
+def _reads(q: Quad) -> List[Temp]:
+    return [q[i] for i in USES.get(q[0], ()) if type(q[i]) is Temp]
+
+
+def _live_pass(code: List[Quad], at_label: Dict[str, Set[Temp]], drop: bool) -> List[Quad]:
+    """
+    Recorre 'code' hacia atrás con los temporales vivos y deja en at_label
+    lo vivo al entrar a cada etiqueta. Con drop=True devuelve el código sin
+    las copias muertas.
+    """
+    live: Set[Temp] = set()
+    keep: List[Quad] = []
+    for q in reversed(code):
+        op = q[0]
+        if op == "Label":
+            at_label[q[1]] = set(live)
+        elif op == "Goto":
+            live = set(at_label.get(q[1], ()))
+        elif op == "IfZ":
+            live |= at_label.get(q[2], set())
+        elif op == "Return":
+            live = set()
+        elif op in DEF_AT:
+            d = q[1]
+            if type(d) is Temp:
+                if drop and op == "Assign" and d not in live:
+                    continue        # copia muerta: tampoco lee su origen
+                live.discard(d)
+        live.update(_reads(q))
+        if drop:
+            keep.append(q)
+    keep.reverse()
+    return keep
+
+
+def _drop_dead_copies(code: List[Quad]) -> List[Quad]:
+    # lo vivo en cada etiqueta: los saltos hacia adelante ya están resueltos
+    # en la misma pasada; cada ciclo anidado pide una pasada más
+    at_label: Dict[str, Set[Temp]] = {}
+    while True:
+        before = {k: len(v) for k, v in at_label.items()}
+        _live_pass(code, at_label, False)
+        if before == {k: len(v) for k, v in at_label.items()}:
+            break
+    return _live_pass(code, at_label, True)
@@ -1,33 +1,87 @@
+# program/custom_types.py
+"""
+Universo de tipos compartido por el semántico, la tabla de símbolos y el
+generador de código.
+
+Los tipos están internados: dos tipos iguales son el mismo objeto, así que
+la igualdad es identidad (el __eq__/__hash__ de object) y sirven como clave
+de dict. Los primitivos son instancias únicas; ArrayType(T) y
+FunctionType(ret, params) devuelven siempre el mismo objeto para los mismos
+componentes; ClassType es nominal (una instancia por declaración).
+
+Cada tipo trae dos nombres calculados una sola vez:
+  - name: como se escribe en el fuente ('integer', 'string[]'); es el que
+    va al árbol de símbolos.
+  - str(t): como aparece en los mensajes de error ('int', 'string[]').
+"""
+import weakref
+
+
 class Type:
-  pass
+  name = "?"
+  _array = None       # ArrayType de este tipo, creado la primera vez que se pide
+
+  def __repr__(self): return self.name
+
 
 class _IntType(Type):
+  name = "integer"
   def __str__(self): return "int"
 
 class _FloatType(Type):
+  name = "float"
   def __str__(self): return "float"
 
 class _StringType(Type):
+  name = "string"
   def __str__(self): return "string"
 
 class _BoolType(Type):
+  name = "boolean"
   def __str__(self): return "bool"
 
 class _NullType(Type):
+  name = "null"
   def __str__(self): return "null"
 
 class _VoidType(Type):
+  name = "void"
   def __str__(self): return "void"
 
 
+def type_name(t):
+  """Nombre de fuente de 't' (también para None u otros valores sueltos)."""
+  return t.name if isinstance(t, Type) else str(t)
+
+
+# Tablas de internado. ArrayType(T) se guarda en el propio T (T._array), así
+# vive lo mismo que T. Las funciones van en una tabla débil en el valor con
+# clave de id(): la clave no retiene a nadie y, mientras la entrada exista,
+# la FunctionType mantiene vivos sus componentes (los id no se reutilizan).
+_functions = weakref.WeakValueDictionary()   # (id(ret), id(param)...) -> FunctionType
+_loose_arrays = {}                           # elem que no es Type (None) -> ArrayType
+_named = {}                                  # nombre -> _NamedType
+
+
 class FunctionType(Type):
+  def __new__(cls, return_type, param_types):
+    params = tuple(param_types)
+    key = (id(return_type),) + tuple(map(id, params))
+    t = _functions.get(key)
+    if t is None:
+      t = super().__new__(cls)
+      t.return_type = return_type
+      t.param_types = list(params)
+      t.name = f"fn({', '.join(type_name(p) for p in params)}) -> {type_name(return_type)}"
+      t._str = f"function<({', '.join(str(p) for p in params)}) => {return_type}>"
+      _functions[key] = t
+    return t
+
   def __init__(self, return_type, param_types):
-    self.return_type = return_type
-    self.param_types = param_types
+    pass
 
   def __str__(self):
-    params = ", ".join(str(p) for p in self.param_types)
-    return f"function<({params}) => {self.return_type}>"
+    return self._str
 
 # ===== NUEVO: Tipo para clases (soporta herencia sencilla) =====
 class ClassType(Type):
@@ -43,14 +97,39 @@ class ClassType(Type):
 
 # ===== Tipo de Array =====
 class ArrayType(Type):
+  def __new__(cls, elem_type):
+    if isinstance(elem_type, Type):
+      t = elem_type._array
+      if t is None:
+        t = elem_type._array = cls._make(elem_type)
+    else:
+      t = _loose_arrays.get(elem_type)
+      if t is None:
+        t = _loose_arrays[elem_type] = cls._make(elem_type)
+    return t
+
+  @classmethod
+  def _make(cls, elem_type):
+    t = super().__new__(cls)
+    t.elem_type = elem_type
+    t.name = f"{type_name(elem_type)}[]"
+    t._str = f"{elem_type}[]"
+    return t
+
   def __init__(self, elem_type):
-    self.elem_type = elem_type
+    pass
 
   def __str__(self):
-    return f"{self.elem_type}[]"
+    return self._str
+
 
-  def __eq__(self, other):
-    return isinstance(other, ArrayType) and self.elem_type == other.elem_type
+class _NamedType(Type):
+  """Tipo opaco conocido solo por su nombre (firmas de symbol_table.TYPE/FN)."""
+  def __init__(self, name):
+    self.name = name
+
+  def __str__(self):
+    return self.name
 
 
 # ===== Instancias únicas para primitivos =====
@@ -60,3 +139,36 @@ StringType = _StringType()
 BoolType   = _BoolType()
 NullType   = _NullType()
 VoidType   = _VoidType()
+
+# nombres de fuente -> primitivo ('null' no se puede anotar)
+PRIMITIVES = {
+  "integer": IntType,
+  "float": FloatType,
+  "boolean": BoolType,
+  "string": StringType,
+  "void": VoidType,
+}
+
+
+def resolve(name, dims=0, classes=None):
+  """
+  Tipo de una anotación: 'integer' / 'Persona' con 'dims' pares de []
+  (typed_ast.TypeRef). Las clases se buscan en 'classes'; None si el
+  nombre no es un tipo conocido.
+  """
+  t = PRIMITIVES.get(name)
+  if t is None and classes is not None:
+    t = classes.get(name)
+  for _ in range(dims):
+    t = ArrayType(t)
+  return t
+
+
+def named_type(name):
+  """Tipo por nombre de fuente; los que no son primitivos ni 'T[]' quedan opacos."""
+  if name.endswith("[]"):
+    return ArrayType(named_type(name[:-2]))
+  t = PRIMITIVES.get(name) or _named.get(name)
+  if t is None:
+    t = _named[name] = _NamedType(name)
+  return t
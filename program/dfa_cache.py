@@ -0,0 +1,248 @@
+# program/dfa_cache.py
+"""
+Caché en disco del DFA de predicción "caliente" de ANTLR.
+
+El runtime de Python construye los DFA de predicción (decisionsToDFA) del
+lexer y del parser de forma perezosa; cada proceso nuevo arranca con los DFA
+vacíos y paga la simulación completa del ATN en las primeras compilaciones.
+
+Este módulo serializa los estados DFA ya entrenados y los recarga al arrancar:
+  - la clave es el hash del ATN serializado de la gramática (lexer + parser)
+    más la versión del runtime; si la gramática cambia, la caché se ignora.
+  - los estados ATN referenciados por las configuraciones se guardan por
+    número de estado y se resuelven contra el ATN cargado en el proceso.
+
+Uso (entrenar con el corpus de ejemplo):
+    python -m program.dfa_cache warm
+    python -m program.dfa_cache warm "archivos_test/*.cspt" "program/tests/*.cps"
+"""
+from __future__ import annotations
+
+import glob
+import hashlib
+import io
+import os
+import pickle
+import sys
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent
+
+from antlr4.atn.ATNSimulator import ATNSimulator
+from antlr4.atn.ATNState import ATNState
+from antlr4.atn.SemanticContext import SemanticContext
+from antlr4.dfa.DFAState import DFAState
+from antlr4.PredictionContext import PredictionContext
+
+from scripts.CompiscriptLexer import CompiscriptLexer
+from scripts.CompiscriptParser import CompiscriptParser
+
+DEFAULT_CACHE_PATH = ROOT / ".cache" / "parser_dfa.pickle"
+DEFAULT_WARM_GLOBS = ("archivos_test/*.cspt", "archivos_test/**/*.cps", "program/tests/*.cps")
+
+_FORMAT = 1
+_EDGE_NONE = -1
+_EDGE_ERROR = -2
+
+# Reconocedores cuyo DFA se guarda: (etiqueta, clase generada)
+_RECOGNIZERS = (("lexer", CompiscriptLexer), ("parser", CompiscriptParser))
+
+
+def _runtime_version() -> str:
+    try:
+        from importlib.metadata import version
+        return version("antlr4-python3-runtime")
+    except Exception:
+        return "?"
+
+
+def grammar_key() -> str:
+    """Hash del ATN serializado de lexer y parser (+ versión del runtime)."""
+    from scripts import CompiscriptLexer as lexer_mod, CompiscriptParser as parser_mod
+    h = hashlib.sha256()
+    h.update(_runtime_version().encode())
+    h.update(str(lexer_mod.serializedATN()).encode())
+    h.update(str(parser_mod.serializedATN()).encode())
+    return h.hexdigest()
+
+
+# ---------- pickling con referencias persistentes al ATN ----------
+class _DFAPickler(pickle.Pickler):
+    def __init__(self, f, tag: str):
+        super().__init__(f, protocol=pickle.HIGHEST_PROTOCOL)
+        self._tag = tag
+
+    def persistent_id(self, obj):
+        if isinstance(obj, ATNState):
+            return ("atn", self._tag, obj.stateNumber)
+        if obj is SemanticContext.NONE:
+            return ("sem-none",)
+        if obj is PredictionContext.EMPTY:
+            return ("ctx-empty",)
+        return None
+
+
+class _DFAUnpickler(pickle.Unpickler):
+    def __init__(self, f):
+        super().__init__(f)
+        self._atns = {tag: cls.atn for tag, cls in _RECOGNIZERS}
+
+    def persistent_load(self, pid):
+        kind = pid[0]
+        if kind == "atn":
+            return self._atns[pid[1]].states[pid[2]]
+        if kind == "sem-none":
+            return SemanticContext.NONE
+        if kind == "ctx-empty":
+            return PredictionContext.EMPTY
+        raise pickle.UnpicklingError(f"referencia persistente desconocida: {pid!r}")
+
+
+def _dump_dfas(tag: str, dfas) -> bytes:
+    """
+    Aplana cada DFA en una lista de estados; las aristas se guardan como
+    índices para que el pickle no recorra el grafo recursivamente.
+    """
+    packed = []
+    for dfa in dfas:
+        if dfa.precedenceDfa or not dfa._states:
+            packed.append(None)
+            continue
+        states = list(dfa._states.values())
+        index = {id(st): i for i, st in enumerate(states)}
+        rows = []
+        for st in states:
+            edges = None
+            if st.edges is not None:
+                edges = []
+                for e in st.edges:
+                    if e is None:
+                        edges.append(_EDGE_NONE)
+                    elif e is ATNSimulator.ERROR:
+                        edges.append(_EDGE_ERROR)
+                    else:
+                        edges.append(index.get(id(e), _EDGE_NONE))
+            rows.append((st.stateNumber, st.configs, st.isAcceptState, st.prediction,
+                         st.requiresFullContext, st.predicates, st.lexerActionExecutor, edges))
+        s0 = index.get(id(dfa.s0), _EDGE_NONE) if dfa.s0 is not None else _EDGE_NONE
+        packed.append((s0, rows))
+    buf = io.BytesIO()
+    _DFAPickler(buf, tag).dump(packed)
+    return buf.getvalue()
+
+
+def _load_dfas(dfas, blob: bytes) -> int:
+    packed = _DFAUnpickler(io.BytesIO(blob)).load()
+    if len(packed) != len(dfas):
+        raise ValueError("número de decisiones distinto")
+    loaded = 0
+    for dfa, item in zip(dfas, packed):
+        if item is None or dfa.precedenceDfa:
+            continue
+        s0, rows = item
+        states: List[DFAState] = []
+        for (num, configs, accept, prediction, full_ctx, preds, lexer_exec, _) in rows:
+            st = DFAState(num, configs)
+            st.isAcceptState = accept
+            st.prediction = prediction
+            st.requiresFullContext = full_ctx
+            st.predicates = preds
+            st.lexerActionExecutor = lexer_exec
+            states.append(st)
+        for st, row in zip(states, rows):
+            edges = row[-1]
+            if edges is not None:
+                st.edges = [None if e == _EDGE_NONE else ATNSimulator.ERROR if e == _EDGE_ERROR else states[e]
+                            for e in edges]
+        dfa._states = {st: st for st in states}
+        dfa.s0 = states[s0] if s0 >= 0 else None
+        loaded += len(states)
+    return loaded
+
+
+# ---------- API ----------
+def save_dfa_cache(path: Optional[os.PathLike] = None) -> Path:
+    """Guarda el DFA actual del proceso (escritura atómica)."""
+    path = Path(path or DEFAULT_CACHE_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "format": _FORMAT,
+        "key": grammar_key(),
+        "dfas": {tag: _dump_dfas(tag, cls.decisionsToDFA) for tag, cls in _RECOGNIZERS},
+    }
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+    return path
+
+
+def load_dfa_cache(path: Optional[os.PathLike] = None) -> bool:
+    """
+    Carga el DFA guardado en los decisionsToDFA compartidos de lexer/parser.
+    Devuelve False (sin tocar nada) si no existe, está corrupta o la clave de
+    la gramática no coincide.
+    """
+    path = Path(path or DEFAULT_CACHE_PATH)
+    try:
+        with open(path, "rb") as f:
+            payload = pickle.load(f)
+    except Exception:
+        return False
+    if not isinstance(payload, dict) or payload.get("format") != _FORMAT:
+        return False
+    if payload.get("key") != grammar_key():
+        return False
+    try:
+        for tag, cls in _RECOGNIZERS:
+            _load_dfas(cls.decisionsToDFA, payload["dfas"][tag])
+    except Exception:
+        return False
+    return True
+
+
+def dfa_state_count() -> int:
+    return sum(len(d._states) for _, cls in _RECOGNIZERS for d in cls.decisionsToDFA)
+
+
+def warm_up(patterns: Iterable[str] = DEFAULT_WARM_GLOBS,
+            path: Optional[os.PathLike] = None) -> Path:
+    """Parsea el corpus (SLL y LL) para entrenar el DFA y lo guarda en disco."""
+    from antlr4 import CommonTokenStream, InputStream
+    from program.Driver import _parse_program, PARSE_MODES
+
+    files: List[str] = []
+    for pat in patterns:
+        files.extend(sorted(glob.glob(str(ROOT / pat) if not os.path.isabs(pat) else pat, recursive=True)))
+    for fp in files:
+        try:
+            src = Path(fp).read_text(encoding="utf-8")
+        except UnicodeDecodeError:
+            src = Path(fp).read_text(encoding="latin-1")
+        for mode in PARSE_MODES:
+            lexer = CompiscriptLexer(InputStream(src))
+            lexer.removeErrorListeners()
+            _parse_program(CommonTokenStream(lexer), mode)
+    out = save_dfa_cache(path)
+    print(f"DFA entrenado con {len(files)} archivo(s): {dfa_state_count()} estados -> {out}")
+    return out
+
+
+def main(argv: List[str]) -> int:
+    if len(argv) < 2 or argv[1] not in ("warm", "clear"):
+        print("uso: python -m program.dfa_cache warm [patrones...] | clear")
+        return 2
+    if argv[1] == "clear":
+        try:
+            os.remove(DEFAULT_CACHE_PATH)
+        except FileNotFoundError:
+            pass
+        return 0
+    warm_up(argv[2:] or DEFAULT_WARM_GLOBS)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
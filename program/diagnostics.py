@@ -0,0 +1,174 @@
+# program/diagnostics.py
+"""
+Diagnósticos estructurados: severidad, código, span y argumentos.
+
+Cada productor (listener de errores de ANTLR, SemanticAnalyzer,
+TypeCheckVisitor) crea un Diagnostic con el código y los argumentos del
+mensaje; el texto se arma recién cuando alguien lo muestra (d.message,
+str(d), d["msg"]). Así nadie formatea para después volver a sacar la
+línea y la columna con expresiones regulares.
+
+Para los consumidores de siempre un Diagnostic se lee como el diccionario
+{"sev", "line", "col", "msg"} (más "code", "end_line", "end_col", "args").
+Donde el diagnóstico sale del proceso (caché en disco, servidor, lotes) se
+usa to_dict(); from_dict() lo reconstruye.
+"""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, List, Optional
+
+# código -> plantilla (str.format con los argumentos del diagnóstico)
+MESSAGES: Dict[str, str] = {
+    # texto ya armado por otro (ANTLR, TypeCheckVisitor, excepciones)
+    "syntax": "{text}",
+    "check": "{text}",
+    "internal": "{text}",
+    # nombres y declaraciones
+    "undeclared": "'{name}' no ha sido declarado.",
+    "redeclared": "Identificador '{name}' ya ha sido declarado en este ámbito.",
+    "var-type-unknown": "No se pudo determinar el tipo de la variable '{name}'.",
+    "assign-mismatch": "No se puede asignar tipo '{actual}' a variable de tipo '{expected}'.",
+    "const-uninitialized": "La constante '{name}' debe ser inicializada.",
+    "const-untyped": "La constante '{name}' debe tener una anotación de tipo explícita.",
+    "const-redeclared": "Identificador '{name}' ya declarado.",
+    "const-mismatch": ("Tipo incompatible para constante '{name}'. "
+                       "Se esperaba '{expected}' pero se obtuvo '{actual}'."),
+    "function-redeclared": "Función o variable '{name}' ya ha sido declarada en este ámbito.",
+    # clases
+    "class-undeclared": "Clase '{cls}' no ha sido declarada.",
+    "base-undeclared": "Clase base '{base}' no ha sido declarada.",
+    "this-outside-class": "'this' usado fuera de una clase.",
+    "field-missing": "Campo '{name}' no existe en '{cls}'.",
+    "field-type-unknown": "No se pudo determinar el tipo del campo '{name}'.",
+    "method-missing": "Método '{name}' no existe en '{cls}'.",
+    "method-redeclared": "Método '{name}' ya ha sido declarado en esta clase.",
+    "prop-on-non-object": "No se puede acceder a '.{name}' sobre tipo '{type}'.",
+    # arrays
+    "index-non-array": "No se puede indexar sobre tipo '{type}'.",
+    "index-not-integer": "El índice de un array debe ser integer, se obtuvo '{type}'.",
+    # operadores
+    "arith-mul": ("Operación aritmética ('*', '/', '%') solo válida entre integers/floats. "
+                  "Se obtuvo '{left}' y '{right}'."),
+    "arith": "Operación aritmética ('{op}') solo válida entre números. Se obtuvo '{left}' y '{right}'.",
+    "eq-mismatch": "Comparación '==' o '!=' entre tipos incompatibles: '{left}' y '{right}'.",
+    "relational": ("Operadores relacionales (<, <=, >, >=) solo aplican a números. "
+                   "Se obtuvo '{left}' y '{right}'."),
+    "logical": "Operador '{op}' requiere operandos boolean. Se obtuvo '{left}' y '{right}'.",
+    # control de flujo
+    "if-condition": "La condición de un 'if' debe ser de tipo boolean, pero se obtuvo '{type}'.",
+    "return-outside": "Declaración 'return' encontrada fuera de una función.",
+    "return-void-value": "Una función de tipo 'void' no puede retornar un valor.",
+    "return-mismatch": "El tipo de retorno no coincide. Se esperaba '{expected}' pero se retornó '{actual}'.",
+    "return-missing-value": "Una función de tipo '{expected}' debe retornar un valor.",
+    # llamadas
+    "call-on-non-object": "No se puede llamar '{name}' sobre tipo '{type}'.",
+    "function-undeclared": "Función '{name}' no ha sido declarada.",
+    "not-callable": "'{name}' no es una función y no se puede llamar.",
+    "callee-unresolved": "No se pudo resolver el callee de la llamada.",
+    "arity": "La función '{name}' esperaba {expected} argumentos, pero recibió {actual}.",
+    "arg-mismatch": ("Argumento {index} de '{name}' es incorrecto. "
+                     "Se esperaba '{expected}', pero se obtuvo '{actual}'."),
+}
+
+_KEYS = ("sev", "code", "line", "col", "end_line", "end_col", "msg", "args")
+
+
+def _plain(v: Any) -> Any:
+    # los argumentos pueden ser tipos u otros objetos: afuera del proceso van como texto
+    return v if v is None or isinstance(v, (str, int, float, bool)) else str(v)
+
+
+class Diagnostic(Mapping):
+    __slots__ = ("severity", "code", "line", "col", "end_line", "end_col", "args", "_msg")
+
+    def __init__(self, code: str, line: Optional[int] = None, col: Optional[int] = None,
+                 end_line: Optional[int] = None, end_col: Optional[int] = None,
+                 severity: str = "error", **args: Any):
+        self.severity = severity
+        self.code = code
+        self.line = line
+        self.col = col
+        self.end_line = end_line
+        self.end_col = end_col
+        self.args = args
+        self._msg: Optional[str] = None
+
+    @classmethod
+    def at(cls, code: str, node, line_offset: int = 0, /, **args: Any) -> "Diagnostic":
+        """Diagnóstico con el span de un nodo del AST tipado."""
+        return cls(code, node.line + line_offset, node.col,
+                   node.end_line + line_offset, node.end_col, **args)
+
+    @property
+    def message(self) -> str:
+        if self._msg is None:
+            template = MESSAGES.get(self.code)
+            self._msg = template.format(**self.args) if template else self.code
+        return self._msg
+
+    def shifted(self, lines: int) -> "Diagnostic":
+        """Copia con las líneas desplazadas (fragmentos del front end incremental)."""
+        if not lines or self.line is None:
+            return self
+        d = Diagnostic(self.code, self.line + lines, self.col,
+                       None if self.end_line is None else self.end_line + lines, self.end_col,
+                       self.severity, **self.args)
+        d._msg = self._msg
+        return d
+
+    def __str__(self) -> str:
+        line = "-" if self.line is None else self.line
+        col = "-" if self.col is None else self.col
+        return f"line {line}:{col} {self.message}"
+
+    def __repr__(self) -> str:
+        return f"Diagnostic({self.code!r}, {self.line}, {self.col}, {self.message!r})"
+
+    # ---------- vista de diccionario ----------
+    def __getitem__(self, key: str) -> Any:
+        if key == "sev":
+            return self.severity
+        if key == "msg":
+            return self.message
+        if key == "args":
+            return {k: _plain(v) for k, v in self.args.items()}
+        if key in _KEYS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(_KEYS)
+
+    def __len__(self) -> int:
+        return len(_KEYS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {k: self[k] for k in _KEYS}
+
+    @classmethod
+    def from_dict(cls, d: Mapping) -> "Diagnostic":
+        if isinstance(d, Diagnostic):
+            return d
+        code = d.get("code")
+        args = dict(d.get("args") or {})
+        if code is None or code not in MESSAGES:
+            code, args = "internal", {"text": d.get("msg", "")}
+        diag = cls(code, d.get("line"), d.get("col"), d.get("end_line"), d.get("end_col"),
+                   d.get("sev") or "error", **args)
+        diag._msg = d.get("msg")
+        return diag
+
+
+def to_json(diags: Iterable[Mapping]) -> List[Dict[str, Any]]:
+    """Lista serializable (caché, servidor, lotes)."""
+    return [d.to_dict() if isinstance(d, Diagnostic) else dict(d) for d in diags or ()]
+
+
+def from_json(items: Iterable[Mapping]) -> List[Diagnostic]:
+    return [Diagnostic.from_dict(d) for d in items or ()]
+
+
+def render(diags: Iterable[Diagnostic]) -> str:
+    """Una línea por diagnóstico: 'line L:C mensaje' (lo que muestran CLI e IDE)."""
+    return "\n".join(str(d) for d in diags)
@@ -0,0 +1,258 @@
+# program/function_cache.py
+"""
+Caché en memoria, por función, del TAC y del MIPS.
+
+TAC: cada FunctionDecl del AST que el TACGeneratorVisitor encuentra fuera de
+otra función (funciones de nivel superior y métodos de clase) se genera con
+un visitor propio (temporales desde t1, etiquetas con prefijo propio y su
+propagación de copias) y sus quads se guardan bajo una huella que cubre:
+  - la forma canónica del AST de la función (sin posiciones) y el tipo
+    anotado de cada expresión (decide StrCat/IntToStr y el print),
+  - el layout de la clase que la contiene (campos y firmas de métodos),
+  - las firmas/layouts de las funciones y clases de nivel superior que
+    nombra (por identificador).
+Si nada de eso cambió, sus quads se empalman tal cual.
+
+MIPS: los quads finales se parten igual que en MIPSEmitter.from_quads (boot +
+un trozo por BeginFunc). Cada trozo se emite con un MIPSEmitter nuevo que
+recibe el estado entre funciones (nombres ya definidos / renombrados y si hay
+boot) y se guarda bajo sus quads + ese estado. Al empalmar, las etiquetas STR_n
+locales se renumeran al pool global en orden de primer uso, así que la
+salida es idéntica a la de emitir todo el archivo de una vez.
+
+Uso:
+    cache = FunctionCache()
+    cache.begin(programs)          # ASTs (typed_ast), una vez por compilación
+    tac.function_cache = cache     # TACGeneratorVisitor
+    ...
+    asm = cache.asm_for_quads(quads)
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Tuple
+
+from program.TACGeneratorVisitor import TACGeneratorVisitor
+from program.copy_prop import copy_propagate
+from program.custom_types import type_name
+from program.ir import map_labels
+from program.typed_ast import Expr, walk
+
+try:
+    from backend.mips.tac_parser import parse_tac_text
+    from backend.mips.emitter import MIPSEmitter
+except Exception:
+    parse_tac_text = None
+    MIPSEmitter = None
+
+DEFAULT_MAX_ENTRIES = 4096
+
+# marcador del prefijo de etiquetas dentro de los quads guardados
+_NS = "\x00"
+
+_WORD = re.compile(r"[A-Za-z_$][\w$]*")
+_STR_LABEL = re.compile(r"\bSTR_(\d+)\b")
+
+
+# ---------- huellas ----------
+def function_signature(fn) -> str:
+    """Cabecera de la función: nombre, parámetros y tipo de retorno."""
+    return "(FunctionDecl %r [%s] %s)" % (
+        fn.name, " ".join(p.dump() for p in fn.params), fn.ret.dump() if fn.ret is not None else "_")
+
+
+def class_layout(cls) -> str:
+    """Clase sin los cuerpos de sus métodos: base, campos y firmas."""
+    members = " ".join(function_signature(m) if m.kind == "FunctionDecl" else m.dump()
+                       for m in cls.members)
+    return "(ClassDecl %r %r [%s])" % (cls.name, cls.base, members)
+
+
+class FunctionCache:
+    """Caché LRU de TAC y MIPS por función; vive entre compilaciones."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+        # nombre de nivel superior -> firmas/layouts (de la compilación actual)
+        self._index: Dict[str, List[str]] = {}
+        self._layouts: Dict[int, str] = {}
+        self.stats: Dict[str, int] = {}
+        self._reset_stats()
+
+    def _reset_stats(self) -> None:
+        self.stats = {"functions": 0, "functions_reused": 0,
+                      "asm_units": 0, "asm_units_reused": 0}
+
+    # ---------- almacenamiento ----------
+    def _get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def _put(self, key, entry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ---------- compilación ----------
+    def begin(self, programs: Iterable[Any]) -> None:
+        """Indexa firmas de funciones y layouts de clases del programa completo."""
+        self._index = {}
+        self._layouts = {}
+        self._reset_stats()
+        for prog in programs:
+            if prog is None:
+                continue
+            index = prog.index
+            for st in index.functions:
+                if st.name is not None:
+                    self._index.setdefault(st.name, []).append(function_signature(st))
+            for st in index.classes:
+                if st.name is None:
+                    continue
+                layout = class_layout(st)
+                self._layouts[id(st)] = layout
+                # el nombre de la clase y el de cada miembro llevan a su layout
+                names = {st.name}
+                names.update(m.name for m in st.members if m.name is not None)
+                for name in names:
+                    self._index.setdefault(name, []).append(layout)
+
+    def fingerprint(self, fn, cls=None) -> str:
+        h = hashlib.sha256()
+        h.update(fn.dump().encode("utf-8", "surrogatepass"))
+        # todo nombre que aparece en la función (variables, campos, llamadas, tipos)
+        names = set()
+        types = []
+        for node in walk(fn):
+            for f in node._fields:
+                v = getattr(node, f)
+                if isinstance(v, str):
+                    names.add(v)
+            if isinstance(node, Expr):
+                types.append(type_name(node.etype))
+        h.update(b"\0types\0" + " ".join(types).encode("utf-8", "surrogatepass"))
+        if cls is not None:
+            layout = self._layouts.get(id(cls))
+            h.update(b"\0class\0")
+            h.update((layout if layout is not None else class_layout(cls)).encode("utf-8", "surrogatepass"))
+        for name in sorted(names):
+            for dep in self._index.get(name, ()):
+                h.update(b"\0" + name.encode("utf-8", "surrogatepass") + b"\0" +
+                         dep.encode("utf-8", "surrogatepass"))
+        return h.hexdigest()
+
+    # ---------- TAC ----------
+    def emit_function(self, visitor, fn, cls=None) -> bool:
+        """
+        Emite en visitor.code los quads de la función 'fn' (método de 'cls' si se
+        da), desde la caché si su huella no cambió. Siempre devuelve True.
+        """
+        fp = self.fingerprint(fn, cls)
+        self.stats["functions"] += 1
+        quads = self._get(("tac", fp))
+        if quads is None:
+            sub = TACGeneratorVisitor()
+            sub.label_ns = _NS
+            if cls is not None:
+                sub.current_class = cls.name
+                sub._string_fields = TACGeneratorVisitor.string_fields(cls)
+            sub._emit_function(fn)
+            sub._flush_pending()
+            quads = tuple(copy_propagate(sub.code))
+            self._put(("tac", fp), quads)
+        else:
+            self.stats["functions_reused"] += 1
+
+        # dos funciones idénticas en el mismo visitor: prefijos distintos
+        k = visitor._fn_count.get(fp, 0)
+        visitor._fn_count[fp] = k + 1
+        ns = visitor.label_ns + "f" + fp[:8] + ("_" + str(k) if k else "") + "_"
+        relabel = lambda L: L.replace(_NS, ns)
+        visitor.code.extend(map_labels(q, relabel) for q in quads)
+        return True
+
+    # ---------- MIPS ----------
+    def asm_for_quads(self, quads) -> str:
+        """Quads -> MIPS empalmando las funciones en caché; nunca lanza."""
+        if MIPSEmitter is None:
+            return "# Backend MIPS no disponible (faltan backend/mips/*)."
+        try:
+            return self._emit(quads)
+        except Exception as e:
+            return "# Error al emitir MIPS: " + str(e)
+
+    def asm_for(self, ir: str) -> str:
+        """Lo mismo desde TAC de texto."""
+        if parse_tac_text is None:
+            return "# Backend MIPS no disponible (faltan backend/mips/*)."
+        return self.asm_for_quads(parse_tac_text(ir))
+
+    def _unit(self, state, quads, text: str, boot: bool) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """(líneas, strings en orden local) de un trozo, desde la caché si se puede."""
+        words = set(_WORD.findall(text))
+        words |= {MIPSEmitter.BUILTIN_REDIRECTS[w] for w in words if w in MIPSEmitter.BUILTIN_REDIRECTS}
+        words |= {"new" + w for w in list(words)}
+        deps = tuple((n, state._func_seen.get(n), state._func_mangle.get(n))
+                     for n in sorted(words & (state._func_seen.keys() | state._func_mangle.keys())))
+        key = ("asm", hashlib.sha256(repr((boot, state._have_boot, deps, text)).encode(
+            "utf-8", "surrogatepass")).hexdigest())
+
+        self.stats["asm_units"] += 1
+        entry = self._get(key)
+        if entry is not None:
+            self.stats["asm_units_reused"] += 1
+            return entry
+
+        em = MIPSEmitter()
+        em._func_seen = dict(state._func_seen)
+        em._func_mangle = dict(state._func_mangle)
+        if boot:
+            em.emit_boot(quads)
+        else:
+            em._have_boot = state._have_boot
+            em._emit_quads_sequence(quads)
+        entry = (tuple(em.lines), tuple(em.str_pool))
+        self._put(key, entry)
+        return entry
+
+    def _emit(self, quads) -> str:
+        top, functions = MIPSEmitter.split_quads(quads)
+        out = MIPSEmitter()   # estado global: pool de strings y nombres
+        units = []
+        if top:
+            units.append((top, True))
+            out._have_boot = True
+        units.extend((fn, False) for fn in functions)
+
+        for chunk, boot in units:
+            lines, strings = self._unit(out, chunk, "\n".join(map(repr, chunk)), boot)
+            relabel = {}
+            for i, s in enumerate(strings):
+                lab = out._str_label(s)
+                if lab != "STR_" + str(i):
+                    relabel[str(i)] = lab
+            if relabel:
+                lines = [_STR_LABEL.sub(lambda m: relabel.get(m.group(1), m.group(0)), l)
+                         if "STR_" in l else l for l in lines]
+            out.lines.extend(lines)
+            if not boot:
+                name = chunk[0][1]
+                out.register_function(name)
+                if name == "main":
+                    out._saw_main = True
+
+        if out._have_boot and not out._saw_main:
+            out.emit_fallback_main()
+        return out.build()
@@ -0,0 +1,410 @@
+# program/incremental.py
+"""
+Front end incremental para el IDE.
+
+El buffer se parte en fragmentos de nivel superior: cada functionDeclaration /
+classDeclaration es un fragmento propio y las sentencias sueltas entre ellas
+forman otro. Cada fragmento es un 'program' válido por sí mismo, así que se
+lexea/parsea por separado y se guarda en caché por su texto:
+
+  - árbol de parseo, su AST tipado y errores sintácticos (líneas relativas
+    al fragmento),
+  - errores del chequeo semántico del Driver,
+  - TAC de sus declaraciones y de su aporte al main sintético, junto con
+    los tipos de sus expresiones con que se generó.
+
+Tras una edición solo se vuelven a procesar los fragmentos cuyo texto cambió;
+los demás se reutilizan tal cual y se desplazan a su línea actual. El
+SemanticAnalyzer sí recorre el programa entero en cada compilación (los
+tipos cruzan fragmentos): un fragmento sin cambios cuyo TAC dependía de un
+tipo que cambió en otro (p.ej. una global que pasó de integer a string) se
+vuelve a generar. La propagación de copias va por fragmento; el MIPS se
+hace sobre el TAC ensamblado, igual que en parse_code_from_string.
+
+Las etiquetas de cada fragmento llevan un prefijo propio (label_ns) para que
+el TAC en caché no choque con el de otros fragmentos.
+
+Dentro de un fragmento que sí cambió, el TAC y el MIPS se reutilizan función
+por función (program/function_cache.py): editar un método de una clase
+grande solo regenera ese método.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from antlr4 import CommonTokenStream, InputStream
+
+from program.Driver import (
+    PARSE_MODE_TWO_STAGE, _format_messages, _grammar, _lower, _parse_program,
+    _tac_generator_visitor, _type_check_visitor,
+)
+from program.diagnostics import Diagnostic, render
+from program.copy_prop import copy_propagate
+from program.sccp import sccp
+from program.custom_types import type_name
+from program.ir import Quad, format_ir
+from program.parse_tree_view import LazyParseTree
+from program.session import CompilationSession, Progress
+from program.typed_ast import Expr, walk
+
+DECL = "decl"
+STMTS = "stmts"
+
+# Solo interesa: strings, comentarios, llaves/paréntesis y las palabras clave
+_SCAN = re.compile(
+    r'"[^"\r\n]*"?'
+    r'|//[^\n]*'
+    r'|/\*.*?(?:\*/|\Z)'
+    r'|[{}()\[\]]'
+    r'|\b(?:function|class)\b',
+    re.DOTALL,
+)
+
+
+def split_top_level(source: str) -> List[Tuple[str, int, int]]:
+    """
+    Devuelve [(tipo, inicio, fin)] cubriendo todo el texto. tipo es DECL para
+    una declaración de función/clase de nivel superior y STMTS para el resto.
+    """
+    spans: List[Tuple[str, int, int]] = []
+    depth = 0
+    run_start = 0
+    decl_start: Optional[int] = None
+    opened = False
+
+    for m in _SCAN.finditer(source):
+        tok = m.group()
+        c = tok[0]
+        if c == '"' or c == "/":
+            continue
+        if c in "{([":
+            if decl_start is not None and depth == 0 and c == "{":
+                opened = True
+            depth += 1
+        elif c in "})]":
+            depth = max(0, depth - 1)
+            if decl_start is not None and opened and depth == 0 and c == "}":
+                spans.append((DECL, decl_start, m.end()))
+                run_start = m.end()
+                decl_start, opened = None, False
+        elif depth == 0 and decl_start is None:
+            # 'function' / 'class' en nivel superior
+            if m.start() > run_start:
+                spans.append((STMTS, run_start, m.start()))
+            decl_start = m.start()
+
+    if decl_start is not None:
+        spans.append((DECL, decl_start, len(source)))
+    elif run_start < len(source):
+        spans.append((STMTS, run_start, len(source)))
+    return spans
+
+
+class _Chunk:
+    __slots__ = ("kind", "tree", "_ast", "rule_names", "syn_errors", "sem_errors",
+                 "decl_code", "main_code", "types", "parse_stage")
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.tree = None
+        self._ast = None
+        self.rule_names: List[str] = []
+        self.syn_errors: List[Diagnostic] = []
+        self.sem_errors: Optional[List[Diagnostic]] = None
+        self.decl_code: Optional[List[Quad]] = None
+        self.main_code: Optional[List[Quad]] = None
+        # tipos de sus expresiones cuando se generó el TAC
+        self.types: Optional[Tuple[str, ...]] = None
+        self.parse_stage = "sll"
+
+    @property
+    def ast(self):
+        """AST tipado del fragmento; se baja la primera vez que se pide."""
+        if self._ast is None and self.tree is not None:
+            self._ast = _lower()(self.tree)
+        return self._ast
+
+    def expr_types(self) -> Tuple[str, ...]:
+        """Tipo anotado de cada expresión del fragmento, en preorden."""
+        return tuple(type_name(n.etype) for n in walk(self.ast) if isinstance(n, Expr))
+
+
+class IncrementalFrontEnd:
+    """Compila reutilizando los fragmentos que no cambiaron desde la última vez."""
+
+    def __init__(self, parse_mode: str = PARSE_MODE_TWO_STAGE):
+        self.parse_mode = parse_mode
+        self._cache: Dict[Tuple[str, int, int], _Chunk] = {}
+        # [(fragmento, desplazamiento de líneas)] de la última compilación
+        self.last_chunks: List[Tuple[_Chunk, int]] = []
+        # caché de TAC/MIPS por función; se crea al generar código por primera vez
+        self.functions = None
+
+    # ---------- fragmentos ----------
+    def _parse_chunk(self, kind: str, text: str) -> _Chunk:
+        ch = _Chunk(kind)
+        lexer = _grammar()[0](InputStream(text))
+        tokens = CommonTokenStream(lexer)
+        parser, tree, syn, stage = _parse_program(tokens, self.parse_mode)
+        ch.tree, ch.rule_names = tree, parser.ruleNames
+        ch.syn_errors, ch.parse_stage = syn.errors, stage
+        return ch
+
+    def _check_chunk(self, ch: _Chunk) -> None:
+        type_checker = _type_check_visitor()()
+        type_checker.visit(ch.ast)
+        ch.sem_errors = type_checker.errors[:]
+
+    def _gen_chunk(self, ch: _Chunk, ns: str) -> None:
+        tac = _tac_generator_visitor()()
+        tac.label_ns = ns
+        tac.function_cache = self.functions
+        deferred = tac.visit_top_level(ch.ast)
+        # la propagación de copias se aplica por fragmento porque cada
+        # fragmento numera sus temporales desde t1
+        ch.decl_code = copy_propagate(tac.code)
+        tac.code = []
+        tac.emit_main_body(deferred)
+        ch.main_code = copy_propagate(tac.code)
+        # funciones declaradas dentro de sentencias sueltas: van con las declaraciones
+        tac.code = []
+        tac._flush_pending()
+        ch.decl_code.extend(copy_propagate(tac.code))
+
+    def trees(self) -> List[Tuple[Any, int]]:
+        """[(árbol, desplazamiento de líneas)] del último compile, en orden."""
+        return [(ch.tree, off) for ch, off in self.last_chunks]
+
+    def asts(self) -> List[Tuple[Any, int]]:
+        """[(AST tipado, desplazamiento de líneas)] del último compile, en orden."""
+        return [(ch.ast, off) for ch, off in self.last_chunks]
+
+    # ---------- etapas comunes a compile y check ----------
+    def _update_chunks(self, source: str):
+        """Parte el texto y parsea solo los fragmentos nuevos: ([(fragmento, desplazamiento, clave)], reutilizados)."""
+        spans = split_top_level(source)
+        chunks: List[Tuple[_Chunk, int, Tuple[str, int, int]]] = []
+        seen: Dict[Tuple[str, int], int] = {}
+        reused = 0
+        line = 1
+        prev = 0
+        for kind, start, end in spans:
+            line += source.count("\n", prev, start)
+            prev = start
+            col = start - (source.rfind("\n", 0, start) + 1)
+            text = " " * col + source[start:end]
+            # el mismo texto puede repetirse: cada aparición es una entrada
+            k = seen.get((text, col), 0)
+            seen[(text, col)] = k + 1
+            key = (text, col, k)
+            ch = self._cache.get(key)
+            if ch is None:
+                ch = self._parse_chunk(kind, text)
+            else:
+                reused += 1
+            chunks.append((ch, line - 1, key))
+
+        self._cache = {key: ch for ch, _, key in chunks}
+        self.last_chunks = [(ch, off) for ch, off, _ in chunks]
+        return chunks, reused
+
+    @staticmethod
+    def _syntax_errors(chunks) -> List[Diagnostic]:
+        return [e.shifted(off) for ch, off, _ in chunks for e in ch.syn_errors]
+
+    def _semantic_errors(self, chunks) -> List[Diagnostic]:
+        # solo se chequean los fragmentos nuevos; el resto trae sus errores en caché
+        sem_errors: List[Diagnostic] = []
+        for ch, off, _ in chunks:
+            if ch.sem_errors is None:
+                self._check_chunk(ch)
+            sem_errors.extend(e.shifted(off) for e in ch.sem_errors)
+        return sem_errors
+
+    # ---------- API ----------
+    def compile(self, source: str) -> Dict[str, Any]:
+        """Mismas claves que parse_code_from_string."""
+        return self.compile_session(source).result
+
+    def check(self, source: str) -> Dict[str, Any]:
+        """
+        Diagnósticos en vivo: lexer + parser de los fragmentos que cambiaron y
+        semántico solo de esos fragmentos (los demás traen sus errores en
+        caché). Sin TAC ni MIPS. Mismas claves que Driver.check_syntax.
+        """
+        t0 = time.perf_counter()
+        chunks, reused = self._update_chunks(source)
+        syn_errors = self._syntax_errors(chunks)
+        t1 = time.perf_counter()
+        sem_struct = [] if syn_errors else self._semantic_errors(chunks)
+        t2 = time.perf_counter()
+
+        timings = {
+            "parse_ms":      round((t1 - t0) * 1000),
+            "semantic_ms":   round((t2 - t1) * 1000),
+            "parse_stage":   "ll" if any(ch.parse_stage == "ll" for ch, _, _ in chunks) else "sll",
+            "chunks":        len(chunks),
+            "chunks_reused": reused,
+            "live":          True,
+        }
+        errors = syn_errors + sem_struct
+        head = (f"{'ERR' if errors else 'OK'}Parse {timings['parse_ms']} ms | "
+                f"Semántica {timings['semantic_ms']} ms | En vivo")
+        body = render(errors)
+        rule_names = chunks[0][0].rule_names if chunks else []
+        return {
+            "parse_tree": _ChunkedParseTree([ch.tree for ch, _, _ in chunks], rule_names),
+            "messages": head + ("\n" + body if body else ""),
+            "actions": "",
+            "ir": "",
+            "asm": "",
+            "errors": errors,
+            "symbols": None,
+            "timings": timings,
+        }
+
+    def compile_session(self, source: str, symbols: bool = False,
+                        progress: Optional[Progress] = None) -> CompilationSession:
+        """
+        Compila y devuelve la CompilationSession (árboles y AST por fragmento
+        con su desplazamiento de líneas). Con 'symbols' el semántico también
+        arma el árbol de símbolos, incluso si hay errores de sintaxis.
+        'progress' como en Driver.compile_session.
+        """
+        t0 = time.perf_counter()
+        session = CompilationSession(source, {"parse_mode": self.parse_mode, "symbols": symbols})
+
+        chunks, reused = self._update_chunks(source)
+        session.trees = self.trees()
+        session.syn_errors = syn_errors = self._syntax_errors(chunks)
+
+        t1 = time.perf_counter()
+        if progress is not None:
+            progress("parse", session)
+
+        sem_struct: List[Diagnostic] = []
+        if not syn_errors:
+            sem_struct = self._semantic_errors(chunks)
+        if symbols or not syn_errors:
+            session.asts = self.asts()
+        if not syn_errors:
+            session.analyze()
+        if symbols:
+            session.analyze_symbols()
+        session.sem_errors = sem_struct
+
+        t2 = time.perf_counter()
+        if progress is not None and not syn_errors:
+            progress("semantic", session)
+
+        quads: List[Quad] = []
+        asm = ""
+        tac_ok = False
+        if not syn_errors and not sem_struct:
+            decl_code: List[Quad] = []
+            main_code: List[Quad] = []
+            if self.functions is None:
+                from program.function_cache import FunctionCache
+                self.functions = FunctionCache()
+            self.functions.begin([ch.ast for ch, _, _ in chunks])
+            for ch, _, key in chunks:
+                types = ch.expr_types()
+                if ch.decl_code is None or ch.types != types:
+                    ns = "c" + hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:8] + "_"
+                    self._gen_chunk(ch, ns)
+                    ch.types = types
+                decl_code.extend(ch.decl_code)
+                main_code.extend(ch.main_code)
+            tac = _tac_generator_visitor()()
+            tac.code = decl_code
+            tac.emit_main(())
+            tac.code[-3:-3] = main_code
+            # las constantes se pliegan sobre el programa armado: el main junta
+            # las sentencias de todos los fragmentos
+            quads = copy_propagate(sccp(tac.code))
+            tac_ok = True
+        session.quads, session.ir, session.tac_ok = quads, format_ir(quads), tac_ok
+
+        t3 = time.perf_counter()
+        if progress is not None and tac_ok:
+            progress("ir", session)
+        if tac_ok:
+            asm = self.functions.asm_for_quads(quads)
+        session.asm = asm
+        t4 = time.perf_counter()
+        if progress is not None and tac_ok:
+            progress("asm", session)
+
+        timings = {
+            "parse_ms":    round((t1 - t0) * 1000),
+            "semantic_ms": round((t2 - t1) * 1000),
+            "ir_ms":       round((t3 - t2) * 1000) if tac_ok else 0,
+            "asm_ms":      round((t4 - t3) * 1000) if tac_ok else 0,
+            "parse_stage": "ll" if any(ch.parse_stage == "ll" for ch, _, _ in chunks) else "sll",
+            "chunks":        len(chunks),
+            "chunks_reused": reused,
+        }
+        if tac_ok:
+            timings.update(self.functions.stats)
+
+        all_errors = syn_errors + sem_struct
+        rule_names = chunks[0][0].rule_names if chunks else []
+        session.parse_stage = timings["parse_stage"]
+        session.timings = timings
+        session.result = {
+            "parse_tree": _ChunkedParseTree([ch.tree for ch, _, _ in chunks], rule_names),
+            "messages": _format_messages(all_errors, timings, tac_ok),
+            "actions": "",
+            "ir": session.ir,
+            "asm": asm,
+            "errors": all_errors,
+            "symbols": session.symbols,
+            "timings": timings,
+        }
+        return session
+
+
+class _ChunkedParseTree(LazyParseTree):
+    """Vista perezosa que presenta los fragmentos como un solo 'program'."""
+    __slots__ = ("trees",)
+
+    def __init__(self, trees: List[Any], rule_names: List[str]):
+        super().__init__(trees[0] if trees else None, rule_names)
+        self.trees = trees
+
+    def walk(self, max_depth: Optional[int] = None):
+        if not self.trees:
+            return
+        yield 0, "program", False
+        if max_depth is not None and max_depth < 1:
+            yield 1, "…", True
+            return
+        for tree in self.trees:
+            for i in range(tree.getChildCount()):
+                child = tree.getChild(i)
+                if child.getChildCount() == 0:
+                    continue  # EOF de cada fragmento
+                sub = LazyParseTree(child, self.rule_names)
+                for depth, label, leaf in sub.walk(None if max_depth is None else max_depth - 1):
+                    yield depth + 1, label, leaf
+        yield 1, "<EOF>", True
+
+    def stream(self, max_depth: Optional[int] = None):
+        if not self.trees:
+            return
+        if max_depth is not None and max_depth < 1:
+            yield "(program …)"
+            return
+        yield "(program"
+        for tree in self.trees:
+            for i in range(tree.getChildCount()):
+                child = tree.getChild(i)
+                if child.getChildCount() == 0:
+                    continue
+                yield " "
+                yield from LazyParseTree(child, self.rule_names).stream(
+                    None if max_depth is None else max_depth - 1)
+        yield " <EOF>)"
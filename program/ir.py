@@ -0,0 +1,243 @@
+# program/ir.py
+"""
+IR en memoria entre el generador de TAC y el backend MIPS.
+
+Cada instrucción es un quad: una tupla (op, operandos...), la misma forma
+que siempre consumió MIPSEmitter. El TACGeneratorVisitor los emite
+directamente, la propagación de copias los reescribe y el
+emisor los lee tal cual: el texto ya no se vuelve a parsear.
+
+Los operandos llevan su clase en el tipo de Python:
+  - int / bool: constantes (true/false van como bool);
+  - Str: literal string, con sus comillas tal como está en el fuente;
+  - Temp: temporal del generador (t1, t2, ...);
+  - str: cualquier otro nombre (variables, 'this', funciones, campos, etiquetas).
+
+Operaciones:
+  Label L | Goto L | IfZ x, L | BeginFunc f, n | LoadParam d, i | Return [x]
+  Assign d, x | Add/Sub/Mul/Div/Mod/Eq/Ne/Lt/Le/Gt/Ge d, a, b
+  Param x | Call d|None, f, n | CallMethod d|None, m, n | New d, C
+  GetProp d, o, campo | SetProp o, campo, x
+  NewArray d, n | GetElem d, a, i | SetElem a, i, x | Len d, a
+  StrCat d, a, b | IntToStr d, x      (strings: las elige el generador por tipo)
+  Phi d, x1, x2, ...                  (solo en SSA: un xi por predecesor del bloque)
+  Raw texto
+Los marcadores FUNC/ActivationRecord/EndFunc del generador van como Raw: el
+backend cierra cada función en su 'return' y los deja como comentario.
+
+El texto (format_ir / parse_tac) queda solo para mostrar el TAC y para
+cargar un .cgt: parse_tac(format_ir(q)) == q para lo que emite el generador.
+"""
+from __future__ import annotations
+
+import re
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+Quad = Tuple[Any, ...]
+
+
+class Temp(str):
+    """Temporal del generador."""
+    __slots__ = ()
+
+
+class Str(str):
+    """Literal string (incluye las comillas)."""
+    __slots__ = ()
+
+
+BINARY_OPS = {
+    "Add": "+", "Sub": "-", "Mul": "*", "Div": "/", "Mod": "%",
+    "Eq": "==", "Ne": "!=", "Lt": "<", "Le": "<=", "Gt": ">", "Ge": ">=",
+}
+OP_OF = {sym: op for op, sym in BINARY_OPS.items()}
+
+# posición de la etiqueta en los quads que la llevan
+LABEL_AT = {"Label": 1, "Goto": 1, "IfZ": 2}
+
+# posición del destino (puede ser None en Call/CallMethod)
+DEF_AT = dict.fromkeys(("Assign", "LoadParam", "Call", "CallMethod", "GetProp", "New",
+                        "NewArray", "GetElem", "Len", "StrCat", "IntToStr", "Phi", *BINARY_OPS), 1)
+
+# posiciones que se leen; Param lee su último operando (Phi lee de la 2 en adelante)
+USES = {
+    "Assign": (2,), "IfZ": (1,), "Param": (-1,), "Return": (1,), "Call": (2,),
+    "GetProp": (2,), "SetProp": (1, 3), "NewArray": (2,), "GetElem": (2, 3),
+    "SetElem": (1, 2, 3), "Len": (2,), "StrCat": (2, 3), "IntToStr": (2,),
+}
+USES.update(dict.fromkeys(BINARY_OPS, (2, 3)))
+
+# usos que tienen que ser un nombre (objeto, array o función), no una constante
+NAME_USES = {("Call", 2), ("GetProp", 2), ("SetProp", 1), ("GetElem", 2), ("SetElem", 1),
+             ("Len", 2)}
+
+
+def map_labels(q: Quad, fn: Callable[[str], str]) -> Quad:
+    """El mismo quad con fn() aplicada a su etiqueta (si tiene)."""
+    i = LABEL_AT.get(q[0])
+    if i is None:
+        return q
+    return q[:i] + (fn(q[i]),) + q[i + 1:]
+
+
+# ---------- texto ----------
+def _opnd(x: Any) -> str:
+    if x is True:
+        return "true"
+    if x is False:
+        return "false"
+    return x if isinstance(x, str) else str(x)
+
+
+_FORMS = {
+    "Label": "{0}:",
+    "Goto": "goto {0}",
+    "IfZ": "if {0} == 0 goto {1}",
+    "BeginFunc": "BeginFunc {0} {1}",
+    "LoadParam": "{0} = LoadParam {1}",
+    "Assign": "{0} = {1}",
+    "Param": "param {0}",
+    "New": "{0} = new {1}",
+    "GetProp": "{0} = getprop {1}, {2}",
+    "SetProp": "setprop {0}, {1}, {2}",
+    "NewArray": "{0} = newarray {1}",
+    "GetElem": "{0} = getelem {1}, {2}",
+    "SetElem": "setelem {0}, {1}, {2}",
+    "Len": "{0} = len {1}",
+    "StrCat": "{0} = strcat {1}, {2}",
+    "IntToStr": "{0} = inttostr {1}",
+    "Raw": "{0}",
+}
+_FORMS.update({op: "{0} = {1} %s {2}" % sym for op, sym in BINARY_OPS.items()})
+
+
+def format_quad(q: Quad) -> str:
+    op = q[0]
+    if op == "Call" or op == "CallMethod":
+        call = "call method " if op == "CallMethod" else "call "
+        head = "" if q[1] is None else _opnd(q[1]) + " = "
+        return f"{head}{call}{q[2]}, {q[3]}"
+    if op == "Return":
+        return "return" if len(q) < 2 or q[1] is None else "return " + _opnd(q[1])
+    if op == "Phi":
+        return f"{_opnd(q[1])} = phi " + ", ".join(map(_opnd, q[2:]))
+    if op == "Param" and len(q) == 3:
+        return f"Param {q[1]}, {_opnd(q[2])}"
+    if op == "EndFunc":
+        return "EndFunc"
+    form = _FORMS.get(op)
+    if form is None:
+        return " ".join(map(_opnd, q))
+    return form.format(*map(_opnd, q[1:]))
+
+
+def format_ir(quads: Iterable[Quad]) -> str:
+    return "\n".join(map(format_quad, quads))
+
+
+_INT = re.compile(r"-?\d+$")
+_TEMP = re.compile(r"t\d+(?:\.\d+)?$")      # t3, o t3.2 en SSA
+_NAME = r"[A-Za-z_][\w$]*"
+_OPND = r'"[^"]*"|-?\d+|[A-Za-z_][\w.]*'
+_BIN = re.compile(rf"^({_OPND})\s*(<=|>=|==|!=|<|>|\+|-|\*|/|%)\s*({_OPND})$")
+
+
+def operand(tok: str) -> Any:
+    """Operando de texto -> su clase en el IR."""
+    tok = tok.strip()
+    if len(tok) >= 2 and tok[0] == '"' and tok[-1] == '"':
+        return Str(tok)
+    if _INT.match(tok):
+        return int(tok)
+    if tok == "true" or tok == "false":
+        return tok == "true"
+    if _TEMP.match(tok):
+        return Temp(tok)
+    return tok
+
+
+_STATEMENTS: List[Tuple[re.Pattern, Callable[..., Quad]]] = [
+    (re.compile(rf"^if\s+({_OPND})\s*==\s*0\s*goto\s+({_NAME})$", re.I),
+     lambda x, L: ("IfZ", operand(x), L)),
+    (re.compile(rf"^BeginFunc\s+({_NAME})\s+(\d+)$", re.I),
+     lambda f, n: ("BeginFunc", f, int(n))),
+    (re.compile(r"^EndFunc$", re.I), lambda: ("EndFunc",)),
+    (re.compile(rf"^IfZ\s+(.+?)\s+goto\s+({_NAME})$", re.I),
+     lambda x, L: ("IfZ", operand(x), L)),
+    (re.compile(rf"^goto\s+({_NAME})$", re.I), lambda L: ("Goto", L)),
+    (re.compile(r"^return(?:\s+(.*))?$", re.I),
+     lambda x: ("Return", operand(x) if x and x.strip() else None)),
+    (re.compile(r"^param\s+(\d+)\s*,\s*(.+)$", re.I),
+     lambda i, x: ("Param", int(i), operand(x))),
+    (re.compile(r"^param\s+(.+)$", re.I), lambda x: ("Param", operand(x))),
+    (re.compile(rf"^call\s+method\s+({_NAME})\s*,\s*(\d+)$", re.I),
+     lambda f, n: ("CallMethod", None, f, int(n))),
+    (re.compile(rf"^call\s+({_NAME})\s*,\s*(\d+)(?:\s*,\s*({_NAME}))?$", re.I),
+     lambda f, n, d: ("Call", operand(d) if d else None, f, int(n))),
+    (re.compile(rf"^setprop\s+({_NAME})\s*,\s*({_NAME})\s*,\s*(.+)$", re.I),
+     lambda o, f, x: ("SetProp", operand(o), f, operand(x))),
+    (re.compile(rf"^setelem\s+({_OPND})\s*,\s*({_OPND})\s*,\s*(.+)$", re.I),
+     lambda a, i, x: ("SetElem", operand(a), operand(i), operand(x))),
+]
+
+# lado derecho de 'd = ...'
+_RHS: List[Tuple[re.Pattern, Callable[..., Quad]]] = [
+    (re.compile(rf"^call\s+method\s+({_NAME})\s*,\s*(\d+)$", re.I),
+     lambda d, f, n: ("CallMethod", d, f, int(n))),
+    (re.compile(rf"^call\s+({_NAME})\s*,\s*(\d+)$", re.I),
+     lambda d, f, n: ("Call", d, f, int(n))),
+    (re.compile(r"^LoadParam\s+(\d+)$", re.I), lambda d, i: ("LoadParam", d, int(i))),
+    (re.compile(rf"^getprop\s+({_NAME})\s*,\s*({_NAME})$", re.I),
+     lambda d, o, f: ("GetProp", d, operand(o), f)),
+    (re.compile(rf"^this\.({_NAME})$"), lambda d, f: ("GetProp", d, "this", f)),
+    (re.compile(rf"^new\s+({_NAME})$"), lambda d, c: ("New", d, c)),
+    (re.compile(rf"^newarray\s+({_OPND})$"), lambda d, n: ("NewArray", d, operand(n))),
+    (re.compile(rf"^getelem\s+({_OPND})\s*,\s*({_OPND})$"),
+     lambda d, a, i: ("GetElem", d, operand(a), operand(i))),
+    (re.compile(rf"^len\s+({_OPND})$"), lambda d, a: ("Len", d, operand(a))),
+    (re.compile(rf"^strcat\s+({_OPND})\s*,\s*({_OPND})$"),
+     lambda d, a, b: ("StrCat", d, operand(a), operand(b))),
+    (re.compile(rf"^inttostr\s+({_OPND})$"), lambda d, x: ("IntToStr", d, operand(x))),
+    (re.compile(rf"^phi\s+((?:{_OPND})(?:\s*,\s*(?:{_OPND}))*)$"),
+     lambda d, xs: ("Phi", d, *map(operand, re.findall(_OPND, xs)))),
+]
+
+_ASSIGN = re.compile(r"^([A-Za-z_][\w$]*(?:\.\d+)?)\s*=\s*(.+)$")
+
+
+def parse_line(line: str) -> Optional[Quad]:
+    """Una línea de TAC -> quad (None si está vacía)."""
+    line = line.strip()
+    if not line:
+        return None
+    if line.startswith(("ActivationRecord", "FUNC ", ".frame", ".param", ".endframe")):
+        return ("Raw", line)
+    if line.endswith(":") and not line.startswith("."):
+        return ("Label", line[:-1].strip())
+    for pat, make in _STATEMENTS:
+        m = pat.match(line)
+        if m:
+            return make(*m.groups())
+    m = _ASSIGN.match(line)
+    if m is None:
+        return ("Raw", line)
+    dst, rhs = operand(m.group(1)), m.group(2).strip()
+    for pat, make in _RHS:
+        mr = pat.match(rhs)
+        if mr:
+            return make(dst, *mr.groups())
+    mb = _BIN.match(rhs)
+    if mb:
+        a, sym, b = mb.groups()
+        return (OP_OF[sym], dst, operand(a), operand(b))
+    return ("Assign", dst, operand(rhs))
+
+
+def parse_tac(text: str) -> List[Quad]:
+    """TAC de texto (el que muestra la UI, un .cgt) -> quads."""
+    out = []
+    for raw in (text or "").splitlines():
+        q = parse_line(raw)
+        if q is not None:
+            out.append(q)
+    return out
@@ -0,0 +1,124 @@
+# program/parse_tree_view.py
+"""
+Vista perezosa del árbol de parseo.
+
+Reemplaza la llamada incondicional a tree.toStringTree(recog=parser): el texto
+LISP solo se construye cuando alguien lo pide (str(), llamada, render()), puede
+limitarse en profundidad y puede emitirse por trozos (stream()). El IDE usa
+walk() para poblar su Treeview sin re-tokenizar el string.
+
+El formato de render() es idéntico al de Trees.toStringTree.
+"""
+from __future__ import annotations
+
+from typing import Iterator, List, Optional, Tuple
+
+from antlr4.tree.Tree import ErrorNode, RuleNode, TerminalNode
+
+_ELLIPSIS = "…"
+
+
+def _escape(s: str) -> str:
+    return s.replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+class LazyParseTree:
+    __slots__ = ("tree", "rule_names", "_full")
+
+    def __init__(self, tree, rule_names: List[str]):
+        self.tree = tree
+        self.rule_names = rule_names
+        self._full: Optional[str] = None
+
+    # ---------- texto de un nodo ----------
+    def node_text(self, node) -> str:
+        if isinstance(node, RuleNode):
+            name = self.rule_names[node.getRuleIndex()]
+            alt = node.getAltNumber()
+            return name + ":" + str(alt) if alt != 0 else name
+        if isinstance(node, ErrorNode):
+            return str(node)
+        if isinstance(node, TerminalNode) and node.symbol is not None:
+            return node.symbol.text
+        return str(node.getPayload())
+
+    # ---------- recorridos iterativos (sin recursión) ----------
+    def walk(self, max_depth: Optional[int] = None) -> Iterator[Tuple[int, str, bool]]:
+        """
+        Preorden: (profundidad, etiqueta, es_hoja). Los subárboles más allá de
+        max_depth se resumen en un único nodo hoja "…".
+        """
+        if self.tree is None:
+            return
+        stack = [(self.tree, 0)]
+        while stack:
+            node, depth = stack.pop()
+            if node is None:
+                yield depth, _ELLIPSIS, True
+                continue
+            n = node.getChildCount()
+            yield depth, _escape(self.node_text(node)), n == 0
+            if n == 0:
+                continue
+            if max_depth is not None and depth >= max_depth:
+                stack.append((None, depth + 1))
+                continue
+            for i in range(n - 1, -1, -1):
+                stack.append((node.getChild(i), depth + 1))
+
+    def stream(self, max_depth: Optional[int] = None) -> Iterator[str]:
+        """Emite el formato LISP de toStringTree por trozos."""
+        if self.tree is None:
+            return
+        # ("open", nodo, prof) | ("close",) | ("sep",)
+        stack: list = [("node", self.tree, 0)]
+        while stack:
+            item = stack.pop()
+            kind = item[0]
+            if kind == "close":
+                yield ")"
+                continue
+            if kind == "sep":
+                yield " "
+                continue
+            _, node, depth = item
+            text = _escape(self.node_text(node))
+            n = node.getChildCount()
+            if n == 0:
+                yield text
+                continue
+            yield "(" + text + " "
+            if max_depth is not None and depth >= max_depth:
+                yield _ELLIPSIS + ")"
+                continue
+            stack.append(("close",))
+            for i in range(n - 1, -1, -1):
+                stack.append(("node", node.getChild(i), depth + 1))
+                if i > 0:
+                    stack.append(("sep",))
+
+    def render(self, max_depth: Optional[int] = None) -> str:
+        if max_depth is not None:
+            return "".join(self.stream(max_depth))
+        if self._full is None:
+            self._full = "".join(self.stream())
+        return self._full
+
+    # ---------- azúcar ----------
+    def __call__(self, max_depth: Optional[int] = None) -> str:
+        return self.render(max_depth)
+
+    def __str__(self) -> str:
+        return self.render()
+
+    def __bool__(self) -> bool:
+        return self.tree is not None
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, LazyParseTree):
+            return self.render() == other.render()
+        if isinstance(other, str):
+            return self.render() == other
+        return NotImplemented
+
+    __hash__ = None
@@ -0,0 +1,698 @@
+# program/rd_parser.py
+"""
+Front end escrito a mano (lexer + descenso recursivo) para Compiscript.
+
+Alternativa rápida al lexer/parser generados por ANTLR: no hay predicción
+adaptativa ni simulación del ATN, cada decisión se toma mirando el siguiente
+token. El árbol que devuelve está hecho con los mismos contextos que el
+generado (CompiscriptParser.XxxContext, incluidas las alternativas etiquetadas
+como AssignExprContext o CallExprContext) y hojas TerminalNodeImpl, así que
+program/typed_ast.py lo baja igual y LazyParseTree lo muestra sin cambios.
+
+Las expresiones binarias se parsean con una tabla de niveles de precedencia
+(_LEVELS, un único bucle para los seis niveles), pero se conserva la cadena de
+contextos de la gramática (logicalOrExpr -> ... -> unaryExpr) porque la
+bajada al AST y la vista del árbol dependen de ella.
+
+No hay recuperación de errores: ante el primer error se lanza RDSyntaxError y
+el Driver vuelve a parsear con ANTLR para dar los diagnósticos de siempre.
+
+Decisiones que ANTLR resuelve con predicción LL completa y aquí se replican:
+  - statement 'Identifier = expr ;'        -> assignment (alt 1).
+  - statement 'expr . Identifier = expr ;' -> assignment (alt 2). Si hay varios
+    '. Identifier =' candidatos se prueba primero el último (ANTLR se queda con
+    la expresión izquierda más larga); si ninguno sirve, expressionStatement.
+  - dentro de expresiones 'lhs = ...' siempre es AssignExpr; PropertyAssignExpr
+    nunca gana la predicción porque el sufijo '.x' ya lo consume leftHandSide.
+"""
+from __future__ import annotations
+
+import re
+from typing import List
+
+from antlr4.Token import CommonToken, Token
+from antlr4.tree.Tree import TerminalNodeImpl
+
+from scripts.CompiscriptParser import CompiscriptParser as P
+
+RULE_NAMES = P.ruleNames
+
+
+class RDSyntaxError(Exception):
+    def __init__(self, line: int, col: int, msg: str):
+        super().__init__(f"linea {line}:{col} {msg}")
+        self.line = line
+        self.col = col
+        self.msg = msg
+
+
+# ---------- tipos de token (los mismos números que el lexer generado) ----------
+_LIT = {name[1:-1]: t for t, name in enumerate(P.literalNames) if name.startswith("'")}
+_KEYWORDS = {text: t for text, t in _LIT.items() if text[0].isalpha()}
+
+EOF = Token.EOF
+LITERAL = P.Literal
+IDENT = P.Identifier
+_STOP = -2  # centinela para cortar una expresión (assignment alt 2)
+
+LBRACE, RBRACE = _LIT["{"], _LIT["}"]
+LPAREN, RPAREN = _LIT["("], _LIT[")"]
+LBRACK, RBRACK = _LIT["["], _LIT["]"]
+SEMI, COLON, COMMA, DOT = _LIT[";"], _LIT[":"], _LIT[","], _LIT["."]
+ASSIGN, QUESTION = _LIT["="], _LIT["?"]
+MINUS, NOT = _LIT["-"], _LIT["!"]
+LET, VAR, CONST = _LIT["let"], _LIT["var"], _LIT["const"]
+FUNCTION, CLASS = _LIT["function"], _LIT["class"]
+NEW, THIS = _LIT["new"], _LIT["this"]
+ELSE, WHILE, IN, CATCH = _LIT["else"], _LIT["while"], _LIT["in"], _LIT["catch"]
+CASE, DEFAULT = _LIT["case"], _LIT["default"]
+
+_LHS_START = frozenset((IDENT, NEW, THIS))
+_LITERAL_START = frozenset((LITERAL, LBRACK, _LIT["null"], _LIT["true"], _LIT["false"]))
+_BASE_TYPES = frozenset((_LIT["boolean"], _LIT["integer"], _LIT["string"], IDENT))
+_SUFFIX_START = frozenset((LPAREN, LBRACK, DOT))
+
+# Niveles de precedencia, de menor a mayor: (contexto, operadores)
+_LEVELS = (
+    (P.LogicalOrExprContext,       frozenset((_LIT["||"],))),
+    (P.LogicalAndExprContext,      frozenset((_LIT["&&"],))),
+    (P.EqualityExprContext,        frozenset((_LIT["=="], _LIT["!="]))),
+    (P.RelationalExprContext,      frozenset((_LIT["<"], _LIT["<="], _LIT[">"], _LIT[">="]))),
+    (P.AdditiveExprContext,        frozenset((_LIT["+"], _LIT["-"]))),
+    (P.MultiplicativeExprContext,  frozenset((_LIT["*"], _LIT["/"], _LIT["%"]))),
+)
+_LAST_LEVEL = len(_LEVELS) - 1
+
+
+# ---------- lexer ----------
+_TOKEN_RE = re.compile(
+    r'(?P<ws>[ \t\r\n]+)'
+    r'|(?P<com>//[^\r\n]*|/\*.*?\*/)'
+    r'|(?P<id>[A-Za-z_][A-Za-z0-9_]*)'
+    r'|(?P<lit>[0-9]+|"[^"\r\n]*")'
+    r'|(?P<op>\|\||&&|==|!=|<=|>=|[{}();:=.,?<>+\-*/%!\[\]])',
+    re.DOTALL,
+)
+
+
+def _token(ttype: int, text: str, start: int, stop: int, line: int, col: int, index: int) -> CommonToken:
+    tok = CommonToken.__new__(CommonToken)
+    tok.source = CommonToken.EMPTY_SOURCE
+    tok.type = ttype
+    tok.channel = Token.DEFAULT_CHANNEL
+    tok.start = start
+    tok.stop = stop
+    tok.tokenIndex = index
+    tok.line = line
+    tok.column = col
+    tok._text = text
+    return tok
+
+
+def tokenize(source: str) -> List[CommonToken]:
+    """Tokens con los mismos tipos, líneas y columnas que CompiscriptLexer (EOF incluido)."""
+    toks: List[CommonToken] = []
+    append = toks.append
+    match = _TOKEN_RE.match
+    pos, n = 0, len(source)
+    line, line_start = 1, 0
+    while pos < n:
+        m = match(source, pos)
+        if m is None:
+            raise RDSyntaxError(line, pos - line_start, f"token recognition error at: '{source[pos]}'")
+        kind = m.lastgroup
+        end = m.end()
+        if kind == "ws" or kind == "com":
+            nl = source.count("\n", pos, end)
+            if nl:
+                line += nl
+                line_start = source.rfind("\n", pos, end) + 1
+        else:
+            text = m.group()
+            if kind == "id":
+                ttype = _KEYWORDS.get(text, IDENT)
+            elif kind == "op":
+                ttype = _LIT[text]
+            else:
+                ttype = LITERAL
+            append(_token(ttype, text, pos, end - 1, line, pos - line_start, len(toks)))
+        pos = end
+    append(_token(EOF, "<EOF>", pos, pos - 1, line, pos - line_start, len(toks)))
+    return toks
+
+
+# ---------- parser ----------
+class _Parser:
+    def __init__(self, toks: List[CommonToken]):
+        self.toks = toks
+        self.types = [t.type for t in toks]
+        self.pos = 0
+
+    # ---------- utilidades ----------
+    def _error(self, expected: str = ""):
+        tok = self.toks[self.pos]
+        msg = f"unexpected input {tok.text!r}" + (f", expecting {expected}" if expected else "")
+        raise RDSyntaxError(tok.line, tok.column, msg)
+
+    def _ctx(self, cls, parent, start=None):
+        # igual que el constructor generado, sin la cadena de __init__
+        ctx = cls.__new__(cls)
+        ctx.parentCtx = parent
+        ctx.invokingState = -1
+        ctx.children = []
+        ctx.start = start if start is not None else self.toks[self.pos]
+        ctx.stop = None
+        ctx.exception = None
+        ctx.parser = None
+        if parent is not None:
+            parent.children.append(ctx)
+        return ctx
+
+    def _done(self, ctx):
+        ctx.stop = self.toks[self.pos - 1]
+        return ctx
+
+    @staticmethod
+    def _adopt(ctx, child):
+        child.parentCtx = ctx
+        ctx.children.append(child)
+
+    def _term(self, ctx, ttype: int):
+        if self.types[self.pos] != ttype:
+            self._error(P.literalNames[ttype] if 0 < ttype < len(P.literalNames) else P.symbolicNames[ttype])
+        self._consume(ctx)
+
+    def _consume(self, ctx):
+        node = TerminalNodeImpl(self.toks[self.pos])
+        node.parentCtx = ctx
+        ctx.children.append(node)
+        self.pos += 1
+
+    def _speculate(self, fn, parent, *args) -> bool:
+        mark, pos = len(parent.children), self.pos
+        try:
+            fn(parent, *args)
+            return True
+        except RDSyntaxError:
+            del parent.children[mark:]
+            self.pos = pos
+            return False
+
+    # ---------- programa y sentencias ----------
+    def program(self):
+        ctx = self._ctx(P.ProgramContext, None)
+        types = self.types
+        while types[self.pos] != EOF:
+            self._statement(ctx)
+        # como en ANTLR, consumir EOF no avanza: stop es el último token real
+        ctx.stop = self.toks[self.pos - 1] if self.pos else None
+        self._consume(ctx)
+        return ctx
+
+    def _statement(self, parent):
+        ctx = self._ctx(P.StatementContext, parent)
+        rule = _STATEMENTS.get(self.types[self.pos])
+        if rule is not None:
+            rule(self, ctx)
+        elif not self._try_assignment(ctx):
+            e = self._ctx(P.ExpressionStatementContext, ctx)
+            self._expression(e)
+            self._term(e, SEMI)
+            self._done(e)
+        return self._done(ctx)
+
+    def _block(self, parent):
+        ctx = self._ctx(P.BlockContext, parent)
+        self._term(ctx, LBRACE)
+        types = self.types
+        while types[self.pos] != RBRACE:
+            if types[self.pos] == EOF:
+                self._error("'}'")
+            self._statement(ctx)
+        self._consume(ctx)
+        return self._done(ctx)
+
+    def _variable_declaration(self, parent):
+        ctx = self._ctx(P.VariableDeclarationContext, parent)
+        self._consume(ctx)  # let | var
+        self._term(ctx, IDENT)
+        if self.types[self.pos] == COLON:
+            self._type_annotation(ctx)
+        if self.types[self.pos] == ASSIGN:
+            ini = self._ctx(P.InitializerContext, ctx)
+            self._consume(ini)
+            self._expression(ini)
+            self._done(ini)
+        self._term(ctx, SEMI)
+        return self._done(ctx)
+
+    def _constant_declaration(self, parent):
+        ctx = self._ctx(P.ConstantDeclarationContext, parent)
+        self._consume(ctx)
+        self._term(ctx, IDENT)
+        if self.types[self.pos] == COLON:
+            self._type_annotation(ctx)
+        self._term(ctx, ASSIGN)
+        self._expression(ctx)
+        self._term(ctx, SEMI)
+        return self._done(ctx)
+
+    def _type_annotation(self, parent):
+        ctx = self._ctx(P.TypeAnnotationContext, parent)
+        self._consume(ctx)  # ':'
+        self._type(ctx)
+        return self._done(ctx)
+
+    def _try_assignment(self, parent) -> bool:
+        """Elige la alternativa de 'assignment' igual que la predicción LL de ANTLR."""
+        types, pos = self.types, self.pos
+        if types[pos] == IDENT and types[pos + 1] == ASSIGN:
+            if self._speculate(self._assignment_simple, parent):
+                return True
+        for dot in reversed(self._property_assign_candidates(pos)):
+            if self._speculate(self._assignment_property, parent, dot):
+                return True
+        return False
+
+    def _property_assign_candidates(self, i: int) -> List[int]:
+        """Posiciones de '.' en '. Identifier =' a profundidad 0 antes del ';'."""
+        types = self.types
+        start, depth, out = i, 0, []
+        while True:
+            t = types[i]
+            if t == LPAREN or t == LBRACK:
+                depth += 1
+            elif t == RPAREN or t == RBRACK:
+                depth -= 1
+                if depth < 0:
+                    return out
+            elif t == SEMI:
+                if depth == 0:
+                    return out
+            elif t == ASSIGN:
+                if depth == 0 and i - 2 > start and types[i - 1] == IDENT and types[i - 2] == DOT:
+                    out.append(i - 2)
+            elif t == EOF or t == LBRACE or t == RBRACE:
+                return out
+            i += 1
+
+    def _assignment_simple(self, parent):
+        ctx = self._ctx(P.AssignmentContext, parent)
+        self._consume(ctx)  # Identifier
+        self._consume(ctx)  # '='
+        self._expression(ctx)
+        self._term(ctx, SEMI)
+        return self._done(ctx)
+
+    def _assignment_property(self, parent, dot: int):
+        ctx = self._ctx(P.AssignmentContext, parent)
+        types = self.types
+        types[dot] = _STOP
+        try:
+            self._expression(ctx)
+        finally:
+            types[dot] = DOT
+        if self.pos != dot:
+            self._error("'.'")
+        self._consume(ctx)  # '.'
+        self._consume(ctx)  # Identifier
+        self._consume(ctx)  # '='
+        self._expression(ctx)
+        self._term(ctx, SEMI)
+        return self._done(ctx)
+
+    def _print_statement(self, parent):
+        ctx = self._ctx(P.PrintStatementContext, parent)
+        self._consume(ctx)
+        self._term(ctx, LPAREN)
+        self._expression(ctx)
+        self._term(ctx, RPAREN)
+        self._term(ctx, SEMI)
+        return self._done(ctx)
+
+    def _if_statement(self, parent):
+        ctx = self._ctx(P.IfStatementContext, parent)
+        self._consume(ctx)
+        self._term(ctx, LPAREN)
+        self._expression(ctx)
+        self._term(ctx, RPAREN)
+        self._block(ctx)
+        if self.types[self.pos] == ELSE:
+            self._consume(ctx)
+            self._block(ctx)
+        return self._done(ctx)
+
+    def _while_statement(self, parent):
+        ctx = self._ctx(P.WhileStatementContext, parent)
+        self._consume(ctx)
+        self._term(ctx, LPAREN)
+        self._expression(ctx)
+        self._term(ctx, RPAREN)
+        self._block(ctx)
+        return self._done(ctx)
+
+    def _do_while_statement(self, parent):
+        ctx = self._ctx(P.DoWhileStatementContext, parent)
+        self._consume(ctx)
+        self._block(ctx)
+        self._term(ctx, WHILE)
+        self._term(ctx, LPAREN)
+        self._expression(ctx)
+        self._term(ctx, RPAREN)
+        self._term(ctx, SEMI)
+        return self._done(ctx)
+
+    def _for_statement(self, parent):
+        ctx = self._ctx(P.ForStatementContext, parent)
+        types = self.types
+        self._consume(ctx)
+        self._term(ctx, LPAREN)
+        t = types[self.pos]
+        if t == LET or t == VAR:
+            self._variable_declaration(ctx)
+        elif t == SEMI:
+            self._consume(ctx)
+        elif not self._try_assignment(ctx):
+            self._error("declaración o asignación")
+        if types[self.pos] != SEMI:
+            self._expression(ctx)
+        self._term(ctx, SEMI)
+        if types[self.pos] != RPAREN:
+            self._expression(ctx)
+        self._term(ctx, RPAREN)
+        self._block(ctx)
+        return self._done(ctx)
+
+    def _foreach_statement(self, parent):
+        ctx = self._ctx(P.ForeachStatementContext, parent)
+        self._consume(ctx)
+        self._term(ctx, LPAREN)
+        self._term(ctx, IDENT)
+        self._term(ctx, IN)
+        self._expression(ctx)
+        self._term(ctx, RPAREN)
+        self._block(ctx)
+        return self._done(ctx)
+
+    def _break_statement(self, parent):
+        ctx = self._ctx(P.BreakStatementContext, parent)
+        self._consume(ctx)
+        self._term(ctx, SEMI)
+        return self._done(ctx)
+
+    def _continue_statement(self, parent):
+        ctx = self._ctx(P.ContinueStatementContext, parent)
+        self._consume(ctx)
+        self._term(ctx, SEMI)
+        return self._done(ctx)
+
+    def _return_statement(self, parent):
+        ctx = self._ctx(P.ReturnStatementContext, parent)
+        self._consume(ctx)
+        if self.types[self.pos] != SEMI:
+            self._expression(ctx)
+        self._term(ctx, SEMI)
+        return self._done(ctx)
+
+    def _try_catch_statement(self, parent):
+        ctx = self._ctx(P.TryCatchStatementContext, parent)
+        self._consume(ctx)
+        self._block(ctx)
+        self._term(ctx, CATCH)
+        self._term(ctx, LPAREN)
+        self._term(ctx, IDENT)
+        self._term(ctx, RPAREN)
+        self._block(ctx)
+        return self._done(ctx)
+
+    def _switch_statement(self, parent):
+        ctx = self._ctx(P.SwitchStatementContext, parent)
+        types = self.types
+        self._consume(ctx)
+        self._term(ctx, LPAREN)
+        self._expression(ctx)
+        self._term(ctx, RPAREN)
+        self._term(ctx, LBRACE)
+        while types[self.pos] == CASE:
+            case = self._ctx(P.SwitchCaseContext, ctx)
+            self._consume(case)
+            self._expression(case)
+            self._term(case, COLON)
+            self._case_statements(case)
+            self._done(case)
+        if types[self.pos] == DEFAULT:
+            default = self._ctx(P.DefaultCaseContext, ctx)
+            self._consume(default)
+            self._term(default, COLON)
+            self._case_statements(default)
+            self._done(default)
+        self._term(ctx, RBRACE)
+        return self._done(ctx)
+
+    def _case_statements(self, ctx):
+        types = self.types
+        while types[self.pos] not in (CASE, DEFAULT, RBRACE, EOF):
+            self._statement(ctx)
+
+    def _function_declaration(self, parent):
+        ctx = self._ctx(P.FunctionDeclarationContext, parent)
+        types = self.types
+        self._consume(ctx)
+        self._term(ctx, IDENT)
+        self._term(ctx, LPAREN)
+        if types[self.pos] == IDENT:
+            params = self._ctx(P.ParametersContext, ctx)
+            self._parameter(params)
+            while types[self.pos] == COMMA:
+                self._consume(params)
+                self._parameter(params)
+            self._done(params)
+        self._term(ctx, RPAREN)
+        if types[self.pos] == COLON:
+            self._consume(ctx)
+            self._type(ctx)
+        self._block(ctx)
+        return self._done(ctx)
+
+    def _parameter(self, parent):
+        ctx = self._ctx(P.ParameterContext, parent)
+        self._term(ctx, IDENT)
+        if self.types[self.pos] == COLON:
+            self._consume(ctx)
+            self._type(ctx)
+        return self._done(ctx)
+
+    def _class_declaration(self, parent):
+        ctx = self._ctx(P.ClassDeclarationContext, parent)
+        types = self.types
+        self._consume(ctx)
+        self._term(ctx, IDENT)
+        if types[self.pos] == COLON:
+            self._consume(ctx)
+            self._term(ctx, IDENT)
+        self._term(ctx, LBRACE)
+        while types[self.pos] != RBRACE:
+            member = self._ctx(P.ClassMemberContext, ctx)
+            t = types[self.pos]
+            if t == FUNCTION:
+                self._function_declaration(member)
+            elif t == LET or t == VAR:
+                self._variable_declaration(member)
+            elif t == CONST:
+                self._constant_declaration(member)
+            else:
+                self._error("'function', 'let', 'var', 'const' o '}'")
+            self._done(member)
+        self._consume(ctx)
+        return self._done(ctx)
+
+    # ---------- tipos ----------
+    def _type(self, parent):
+        ctx = self._ctx(P.TypeContext, parent)
+        types = self.types
+        base = self._ctx(P.BaseTypeContext, ctx)
+        if types[self.pos] not in _BASE_TYPES:
+            self._error("tipo")
+        self._consume(base)
+        self._done(base)
+        while types[self.pos] == LBRACK:
+            self._consume(ctx)
+            self._term(ctx, RBRACK)
+        return self._done(ctx)
+
+    # ---------- expresiones ----------
+    def _expression(self, parent):
+        ctx = self._ctx(P.ExpressionContext, parent)
+        self._assignment_expr(ctx)
+        return self._done(ctx)
+
+    def _assignment_expr(self, parent):
+        if self.types[self.pos] in _LHS_START:
+            start = self.toks[self.pos]
+            lhs = self._left_hand_side(None)
+            if self.types[self.pos] == ASSIGN:
+                ctx = self._ctx(P.AssignExprContext, parent, start)
+                ctx.lhs = lhs
+                self._adopt(ctx, lhs)
+                self._consume(ctx)
+                self._assignment_expr(ctx)
+                return self._done(ctx)
+            # no era asignación: el lhs ya parseado es el primer operando
+            ctx = self._ctx(P.ExprNoAssignContext, parent, start)
+            self._conditional(ctx, lhs)
+            return self._done(ctx)
+        ctx = self._ctx(P.ExprNoAssignContext, parent)
+        self._conditional(ctx, None)
+        return self._done(ctx)
+
+    def _conditional(self, parent, seed):
+        ctx = self._ctx(P.TernaryExprContext, parent, seed.start if seed is not None else None)
+        self._binary(ctx, 0, seed)
+        if self.types[self.pos] == QUESTION:
+            self._consume(ctx)
+            self._expression(ctx)
+            self._term(ctx, COLON)
+            self._expression(ctx)
+        return self._done(ctx)
+
+    def _binary(self, parent, level: int, seed=None):
+        """Un nivel de la tabla de precedencia: operando (op operando)*."""
+        cls, ops = _LEVELS[level]
+        ctx = self._ctx(cls, parent, seed.start if seed is not None else None)
+        types = self.types
+        if level < _LAST_LEVEL:
+            self._binary(ctx, level + 1, seed)
+            while types[self.pos] in ops:
+                self._consume(ctx)
+                self._binary(ctx, level + 1)
+        else:
+            self._unary(ctx, seed)
+            while types[self.pos] in ops:
+                self._consume(ctx)
+                self._unary(ctx)
+        return self._done(ctx)
+
+    def _unary(self, parent, seed=None):
+        ctx = self._ctx(P.UnaryExprContext, parent, seed.start if seed is not None else None)
+        t = self.types[self.pos]
+        if seed is None and (t == MINUS or t == NOT):
+            self._consume(ctx)
+            self._unary(ctx)
+        else:
+            self._primary(ctx, seed)
+        return self._done(ctx)
+
+    def _primary(self, parent, seed=None):
+        if seed is not None:
+            ctx = self._ctx(P.PrimaryExprContext, parent, seed.start)
+            self._adopt(ctx, seed)
+            return self._done(ctx)
+        ctx = self._ctx(P.PrimaryExprContext, parent)
+        t = self.types[self.pos]
+        if t in _LHS_START:
+            self._left_hand_side(ctx)
+        elif t == LPAREN:
+            self._consume(ctx)
+            self._expression(ctx)
+            self._term(ctx, RPAREN)
+        elif t in _LITERAL_START:
+            lit = self._ctx(P.LiteralExprContext, ctx)
+            if t == LBRACK:
+                self._array_literal(lit)
+            else:
+                self._consume(lit)
+            self._done(lit)
+        else:
+            self._error("expresión")
+        return self._done(ctx)
+
+    def _array_literal(self, parent):
+        ctx = self._ctx(P.ArrayLiteralContext, parent)
+        types = self.types
+        self._consume(ctx)
+        if types[self.pos] != RBRACK:
+            self._expression(ctx)
+            while types[self.pos] == COMMA:
+                self._consume(ctx)
+                self._expression(ctx)
+        self._term(ctx, RBRACK)
+        return self._done(ctx)
+
+    def _left_hand_side(self, parent):
+        ctx = self._ctx(P.LeftHandSideContext, parent)
+        types = self.types
+        t = types[self.pos]
+        if t == IDENT:
+            atom = self._ctx(P.IdentifierExprContext, ctx)
+            self._consume(atom)
+        elif t == THIS:
+            atom = self._ctx(P.ThisExprContext, ctx)
+            self._consume(atom)
+        else:
+            atom = self._ctx(P.NewExprContext, ctx)
+            self._consume(atom)
+            self._term(atom, IDENT)
+            self._term(atom, LPAREN)
+            if types[self.pos] != RPAREN:
+                self._arguments(atom)
+            self._term(atom, RPAREN)
+        self._done(atom)
+        while types[self.pos] in _SUFFIX_START:
+            t = types[self.pos]
+            if t == LPAREN:
+                op = self._ctx(P.CallExprContext, ctx)
+                self._consume(op)
+                if types[self.pos] != RPAREN:
+                    self._arguments(op)
+                self._term(op, RPAREN)
+            elif t == LBRACK:
+                op = self._ctx(P.IndexExprContext, ctx)
+                self._consume(op)
+                self._expression(op)
+                self._term(op, RBRACK)
+            else:
+                op = self._ctx(P.PropertyAccessExprContext, ctx)
+                self._consume(op)
+                self._term(op, IDENT)
+            self._done(op)
+        return self._done(ctx)
+
+    def _arguments(self, parent):
+        ctx = self._ctx(P.ArgumentsContext, parent)
+        types = self.types
+        self._expression(ctx)
+        while types[self.pos] == COMMA:
+            self._consume(ctx)
+            self._expression(ctx)
+        return self._done(ctx)
+
+
+# primer token -> regla de la sentencia (el resto: assignment / expressionStatement)
+_STATEMENTS = {
+    LET: _Parser._variable_declaration,
+    VAR: _Parser._variable_declaration,
+    CONST: _Parser._constant_declaration,
+    FUNCTION: _Parser._function_declaration,
+    CLASS: _Parser._class_declaration,
+    LBRACE: _Parser._block,
+    _LIT["print"]: _Parser._print_statement,
+    _LIT["if"]: _Parser._if_statement,
+    WHILE: _Parser._while_statement,
+    _LIT["do"]: _Parser._do_while_statement,
+    _LIT["for"]: _Parser._for_statement,
+    _LIT["foreach"]: _Parser._foreach_statement,
+    _LIT["try"]: _Parser._try_catch_statement,
+    _LIT["switch"]: _Parser._switch_statement,
+    _LIT["break"]: _Parser._break_statement,
+    _LIT["continue"]: _Parser._continue_statement,
+    _LIT["return"]: _Parser._return_statement,
+}
+
+
+# ---------- API ----------
+def parse(source: str) -> P.ProgramContext:
+    """Devuelve el ProgramContext del código o lanza RDSyntaxError."""
+    try:
+        return _Parser(tokenize(source)).program()
+    except RecursionError:
+        raise RDSyntaxError(0, 0, "anidamiento demasiado profundo") from None
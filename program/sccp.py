@@ -0,0 +1,288 @@
+# program/sccp.py
+"""
+Propagación de constantes condicional dispersa (SCCP, Wegman-Zadeck) sobre
+la forma SSA de cada función (program/ssa.py).
+
+Cada versión SSA vale ⊤ (todavía sin valor), una constante entera o ⊥ (no
+constante); un arco del CFG es ejecutable o no. Dos listas de trabajo:
+  - arcos: al volverse ejecutable un arco se evalúa su bloque destino (la
+    primera vez entero, después solo sus Phi);
+  - versiones: cuando una baja en el reticulado se reevalúan sus usos.
+Una Phi junta solo los argumentos de arcos ejecutables y un IfZ con
+condición constante habilita uno solo de sus arcos: así 'if (true)', el
+cortocircuito con operandos literales y las ramas que dependen de ellos se
+resuelven solos. Cada versión baja a lo sumo dos veces, así que el costo es
+lineal en el tamaño de la función en SSA.
+
+Con el resultado:
+  - los usos de lo que da constante leen la constante y su definición
+    (Add/Sub/.../Eq/.../'!', una copia, una Phi) se borra, salvo que algo
+    lo lea como nombre o lo junte una Phi: entonces queda 'd = c';
+  - un IfZ constante pasa a Goto o desaparece (se cae al siguiente);
+  - los bloques no ejecutables se borran (menos los marcadores Raw que el
+    backend usa para cerrar funciones) junto con sus arcos y sus
+    argumentos de Phi.
+Las operaciones se pliegan como las hace el MIPS: enteros de 32 bits con
+signo, división truncada, comparaciones 0/1; una división por cero no se
+pliega. Los nombres que no se renombraron (globales) nunca son constantes.
+
+Uso:
+    quads = copy_propagate(sccp(quads))   # la propagación de copias limpia
+                                          # los temporales que quedan muertos
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Set, Tuple
+
+from program.cfg import BasicBlock
+from program.ir import BINARY_OPS, LABEL_AT, NAME_USES, Quad
+from program.ssa import SSAFunction, def_of, phis, program_from_ssa, program_to_ssa, uses_of
+
+_TOP = object()     # sin valor todavía
+_BOT = object()     # no constante
+
+
+def _wrap(v: int) -> int:
+    """Entero con signo de 32 bits, como queda en un registro."""
+    return ((v + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+
+
+def _div(a: int, b: int) -> int:
+    q = abs(a) // abs(b)
+    return q if (a < 0) == (b < 0) else -q
+
+
+_FOLD = {
+    "Add": lambda a, b: a + b, "Sub": lambda a, b: a - b, "Mul": lambda a, b: a * b,
+    "Div": _div, "Mod": lambda a, b: a - b * _div(a, b),
+    "Eq": lambda a, b: int(a == b), "Ne": lambda a, b: int(a != b),
+    "Lt": lambda a, b: int(a < b), "Le": lambda a, b: int(a <= b),
+    "Gt": lambda a, b: int(a > b), "Ge": lambda a, b: int(a >= b),
+}
+assert set(_FOLD) == set(BINARY_OPS)
+
+
+def _fold(op: str, a: Any, b: Any) -> Any:
+    if op in ("Div", "Mod") and b == 0:
+        return _BOT                 # el error queda para la ejecución
+    return _wrap(_FOLD[op](_wrap(int(a)), _wrap(int(b))))
+
+
+def _meet(a: Any, b: Any) -> Any:
+    if a is _TOP:
+        return b
+    if b is _TOP or a is _BOT:
+        return a
+    if b is _BOT or a != b:
+        return _BOT
+    return a
+
+
+def sccp(code: List[Quad]) -> List[Quad]:
+    """'code' (un programa entero) con constantes plegadas y ramas muertas fuera."""
+    fns = program_to_ssa(code)
+    for fn in fns:
+        if fn.base:
+            _Solver(fn).run()
+    # plegar no alarga ninguna vida: cada versión vuelve a su nombre sin copias
+    return _tidy(program_from_ssa(fns, conventional=True))
+
+
+class _Solver:
+    def __init__(self, fn: SSAFunction):
+        self.cfg = fn.cfg
+        self.versions = {v for v, x in fn.base.items() if v != x}
+        self.value: Dict[str, Any] = {}
+        self.edges: Set[Tuple[int, int]] = set()
+        self.visited = [False] * len(self.cfg.blocks)
+        self.flow: List[Tuple[BasicBlock, BasicBlock]] = []
+        self.changed: List[str] = []
+        # usos de cada versión: (bloque, posición del quad)
+        self.uses: Dict[str, List[Tuple[BasicBlock, int]]] = {}
+        for b in self.cfg.rpo:
+            for k, q in enumerate(b.quads):
+                for i in uses_of(q):
+                    if q[i] in self.versions:
+                        self.uses.setdefault(q[i], []).append((b, k))
+
+    def get(self, x: Any) -> Any:
+        t = type(x)
+        if t is int or t is bool:
+            return x
+        if x in self.versions:
+            return self.value.get(x, _TOP)
+        return _BOT                 # nombre sin renombrar, literal string, ...
+
+    # ---------- análisis ----------
+    def run(self) -> None:
+        entry = self.cfg.entry
+        self._visit_block(entry)
+        flow, changed = self.flow, self.changed
+        while flow or changed:
+            while flow:
+                p, s = flow.pop()
+                if not self.visited[s.index]:
+                    self._visit_block(s)
+                else:
+                    for k in range(len(phis(s))):
+                        self._visit(s, k + (s.label is not None))
+            while changed:
+                for b, k in self.uses.get(changed.pop(), ()):
+                    if self.visited[b.index]:
+                        self._visit(b, k)
+        self._rewrite()
+
+    def _visit_block(self, b: BasicBlock) -> None:
+        self.visited[b.index] = True
+        for k in range(len(b.quads)):
+            self._visit(b, k)
+        if not b.quads or b.last[0] != "IfZ":
+            for s in b.succs:
+                self._edge(b, s)
+
+    def _edge(self, p: BasicBlock, s: BasicBlock) -> None:
+        if (p.index, s.index) not in self.edges:
+            self.edges.add((p.index, s.index))
+            self.flow.append((p, s))
+
+    def _lower(self, d: str, v: Any) -> None:
+        old = self.value.get(d, _TOP)
+        if v is _TOP or old is _BOT or (old is not _TOP and v is not _BOT):
+            return
+        self.value[d] = v
+        self.changed.append(d)
+
+    def _visit(self, b: BasicBlock, k: int) -> None:
+        q = b.quads[k]
+        op = q[0]
+        if op == "Phi":
+            v = _TOP
+            for j, p in enumerate(b.preds):
+                if (p.index, b.index) in self.edges:
+                    v = _meet(v, self.get(q[2 + j]))
+            self._lower(q[1], v)
+        elif op == "IfZ":
+            c = self.get(q[1])
+            taken = self.cfg.by_label.get(q[2])
+            if c is _TOP:
+                return
+            if c is _BOT or taken is None:
+                for s in b.succs:
+                    self._edge(b, s)
+            elif c == 0:
+                self._edge(b, taken)
+            elif b.index + 1 < len(self.cfg.blocks):
+                self._edge(b, self.cfg.blocks[b.index + 1])
+        else:
+            d = def_of(q)
+            if d not in self.versions:
+                return
+            if op == "Assign":
+                v = self.get(q[2])
+            elif op in _FOLD:
+                a, c = self.get(q[2]), self.get(q[3])
+                if a is _BOT or c is _BOT:
+                    v = _BOT
+                elif a is _TOP or c is _TOP:
+                    v = _TOP
+                else:
+                    v = _fold(op, a, c)
+            else:
+                v = _BOT
+            self._lower(d, v)
+
+    # ---------- reescritura ----------
+    def _const(self, x: Any) -> Any:
+        """La constante que vale 'x', o 'x' mismo."""
+        v = self.get(x)
+        return x if v is _TOP or v is _BOT else v
+
+    def _rewrite(self) -> None:
+        cfg, edges, visited = self.cfg, self.edges, self.visited
+        # versiones que siguen haciendo falta aunque valgan una constante:
+        # las que se usan como nombre y los argumentos de Phi que quedan
+        needed: Set[str] = set()
+        for b in cfg.rpo:
+            for q in b.quads:
+                if q[0] == "Phi":
+                    if self._const(q[1]) == q[1]:
+                        needed.update(q[2:])
+                else:
+                    needed.update(q[i] for i in uses_of(q) if (q[0], i) in NAME_USES)
+        for b in cfg.blocks:
+            if not visited[b.index]:
+                continue
+            out: List[Quad] = []
+            folded: List[Quad] = []         # Phi constantes: Assign después de las Phi
+            for q in b.quads:
+                op = q[0]
+                if op == "IfZ":
+                    c = self.get(q[1])
+                    if c is not _TOP and c is not _BOT and q[2] in cfg.by_label:
+                        if c == 0:
+                            out.append(("Goto", q[2]))
+                        continue            # != 0: se cae al siguiente
+                elif op == "Phi":
+                    v = self._const(q[1])
+                    if v != q[1]:
+                        if q[1] in needed:
+                            folded.append(("Assign", q[1], v))
+                        continue
+                else:
+                    uses = uses_of(q)
+                    if uses:
+                        new = list(q)
+                        for i in uses:
+                            if (op, i) not in NAME_USES:
+                                new[i] = self._const(q[i])
+                        q = tuple(new)
+                    d = def_of(q)
+                    if (op == "Assign" or op in _FOLD) and d is not None:
+                        v = self._const(d)
+                        if v != d:
+                            if d not in needed:
+                                continue    # todos sus usos leen la constante
+                            q = ("Assign", d, v)
+                out.append(q)
+            if folded:
+                at = (b.label is not None) + sum(q[0] == "Phi" for q in out)
+                out[at:at] = folded
+            b.quads = out
+
+        # arcos no ejecutables fuera (con su argumento de Phi)
+        for b in cfg.blocks:
+            if not visited[b.index]:
+                continue
+            b.succs = [s for s in b.succs if (b.index, s.index) in edges]
+            keep = [j for j, p in enumerate(b.preds) if (p.index, b.index) in edges]
+            if len(keep) != len(b.preds):
+                b.preds = [b.preds[j] for j in keep]
+                b.quads = [q[:2] + tuple(q[2 + j] for j in keep) if q[0] == "Phi" else q
+                           for q in b.quads]
+        # bloques muertos: solo quedan los marcadores del backend
+        for b in cfg.blocks:
+            if not visited[b.index]:
+                b.quads = [q for q in b.quads if q[0] == "Raw" or q[0] == "EndFunc"]
+                b.succs, b.preds, b.rpo = [], [], None
+        cfg.rpo = [b for b in cfg.rpo if visited[b.index]]
+        for i, b in enumerate(cfg.rpo):
+            b.rpo = i
+
+
+def _tidy(code: List[Quad]) -> List[Quad]:
+    """
+    Sin las ramas borradas quedan 'goto L' justo antes de 'L:' y etiquetas
+    a las que ya nadie salta: se quitan hasta que no quede ninguna.
+    """
+    while True:
+        targets = {q[LABEL_AT[q[0]]] for q in code if q[0] == "Goto" or q[0] == "IfZ"}
+        out: List[Quad] = []
+        for q in code:
+            if q[0] == "Label" and q[1] not in targets:
+                continue
+            if q[0] == "Label" and out and out[-1] == ("Goto", q[1]):
+                out.pop()
+            out.append(q)
+        if len(out) == len(code):
+            return out
+        code = out
@@ -0,0 +1,105 @@
+# program/session.py
+"""
+Sesión de compilación: lo que produce cada etapa de UNA compilación.
+
+El Driver (compile_session / parse_code_from_string), el front end
+incremental y el IDE comparten este objeto: el lexer/parser dejan aquí los
+tokens y el árbol, la bajada el AST, el semántico sus errores, el
+analizador (que anota el tipo de cada expresión en el AST) y el árbol de
+símbolos, y el generador el TAC y el MIPS. Cada etapa corre una sola vez
+por compilación; quien necesite un producto lo toma de la sesión en vez de
+volver a lexear, parsear o analizar.
+
+'result' es el diccionario de siempre (las mismas claves que devolvía
+parse_code_from_string), así que CLI, servidor y lotes no cambian. Quien
+pase 'progress' recibe la sesión al terminar cada etapa (STAGES) y puede
+mostrar diagnósticos antes de que esté el MIPS, o cortar la compilación
+lanzando una excepción desde el callback.
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# etapas, en orden; progress(etapa, sesión) se llama al terminar cada una
+STAGES = ("parse", "semantic", "ir", "asm")
+
+Progress = Callable[[str, "CompilationSession"], None]
+
+
+class CompilationSession:
+    __slots__ = (
+        "source", "options",
+        "tokens", "tree", "trees", "ast", "asts", "syn_errors", "parse_stage",
+        "sem_errors", "analyzer", "symbols",
+        "quads", "ir", "asm", "tac_ok", "timings", "result",
+    )
+
+    def __init__(self, source: str, options: Optional[Dict[str, Any]] = None):
+        self.source = source
+        self.options: Dict[str, Any] = dict(options or {})
+        # front end: tokens es el CommonTokenStream de ANTLR (None con el
+        # parser escrito a mano, con un acierto de caché o por fragmentos)
+        self.tokens = None
+        self.tree = None
+        self.ast = None
+        # [(árbol, desplazamiento de líneas)]: uno solo, o uno por fragmento
+        self.trees: List[Tuple[Any, int]] = []
+        self.asts: List[Tuple[Any, int]] = []
+        # diagnósticos: program.diagnostics.Diagnostic (texto solo al mostrar)
+        self.syn_errors: List[Any] = []
+        self.parse_stage: Optional[str] = None
+        # semántico
+        self.sem_errors: List[Any] = []
+        self.analyzer = None
+        self.symbols = None
+        # código: quads del generador (program/ir.py) e 'ir', su texto
+        self.quads: List[Any] = []
+        self.ir = ""
+        self.asm = ""
+        self.tac_ok = False
+        self.timings: Dict[str, Any] = {}
+        self.result: Optional[Dict[str, Any]] = None
+
+    @property
+    def errors(self) -> List[Any]:
+        """Errores sintácticos y semánticos conocidos hasta ahora."""
+        return self.syn_errors + self.sem_errors
+
+    # ---------- semántico / símbolos ----------
+    def analyze(self):
+        """
+        SemanticAnalyzer sobre los AST ya bajados (con su desplazamiento de
+        líneas), una sola vez por compilación: deja cada expresión anotada
+        con su tipo (lo que lee el generador de TAC). Devuelve el analizador.
+        """
+        if self.analyzer is None and self.asts:
+            from program.semantic_analyzer import SemanticAnalyzer
+            analyzer = SemanticAnalyzer()
+            for ast, offset in self.asts:
+                analyzer.line_offset = offset
+                analyzer.visit(ast)
+            self.analyzer = analyzer
+        return self.analyzer
+
+    def analyze_symbols(self) -> Optional[Dict[str, Any]]:
+        """Árbol de símbolos del programa (del mismo análisis que analyze())."""
+        if self.symbols is None and self.analyze() is not None:
+            self.symbols = self.analyzer.symbol_tree()
+            if self.result is not None:
+                self.result["symbols"] = self.symbols
+        return self.symbols
+
+    def export_symbols(self, path: str, exporter=None, pretty: bool = False) -> bool:
+        """
+        Exporta el árbol de símbolos a 'path' (ver program/symbol_export.py).
+        Con 'exporter' (SymbolExporter) solo se encola y vuelve enseguida;
+        sin él se escribe aquí mismo. False si no hay símbolos.
+        """
+        if self.symbols is None:
+            return False
+        if exporter is not None:
+            exporter.submit(path, self.symbols, pretty)
+        else:
+            from program.symbol_export import write_json_atomic
+            write_json_atomic(path, self.symbols, pretty)
+        return True
@@ -0,0 +1,550 @@
+# program/ssa.py
+"""
+Forma SSA por función sobre el CFG (program/cfg.py).
+
+Construcción (Cytron et al.):
+  1. Dominadores y frontera de dominancia (program/cfg.py).
+  2. Phi mínimas: para cada variable que algún bloque lee antes de
+     definirla (semi-pruned: un temporal que vive dentro de un solo bloque
+     no necesita Phi) se ponen Phi en la frontera de dominancia iterada de
+     sus definiciones.
+  3. Renombrado recorriendo el árbol de dominadores: cada definición crea
+     'x.k' (de la misma clase que x: un Temp sigue siendo Temp) y cada uso
+     toma la versión vigente. Un uso sin definición previa (una global, una
+     variable sin inicializar) lee 'x' tal cual: la versión de entrada.
+
+Entran los temporales, los parámetros (p_x = LoadParam i), 'this' y las
+variables locales que el generador reasigna. Un nombre que aparece en más
+de una función (una global del main sintético, una local que lee una
+función anidada) puede cambiar en una llamada, así que no se renombra en
+ninguna (pinned).
+
+Destrucción (Boissinot et al., "Revisiting Out-of-SSA Translation"):
+  1. Cada Phi une su destino con los argumentos de su misma variable en una
+     red (union-find).
+  2. Con la vida de cada versión se ve qué redes interfieren: una red cuyas
+     versiones se pisan se deshace, y dos redes de la misma variable que
+     viven a la vez no pueden volver las dos al nombre original.
+  3. Cada red vuelve al nombre original si puede y si no a un temporal
+     nuevo; las copias de cada Phi son entonces en su mayoría 'x = x' y
+     desaparecen. Las que quedan se emiten al final de cada predecesor (una
+     arista crítica se parte con un bloque nuevo) como copia paralela
+     secuencializada: primero las que no pisan un origen pendiente, y un
+     ciclo (intercambio) se rompe con un temporal.
+Sobre código recién construido (sin optimizar) ninguna red interfiere y la
+destrucción devuelve exactamente los quads de entrada.
+
+Uso:
+    fns = program_to_ssa(quads)        # una SSAFunction por función
+    ...                                # pases sobre fn.cfg (bloques con Phi)
+    quads = program_from_ssa(fns)
+"""
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from program.cfg import CFG, BasicBlock, dominance_frontiers, dominators, split_functions
+from program.ir import DEF_AT, USES, Quad, Temp
+
+_TEMP_NUM = re.compile(r"t(\d+)")
+
+
+def _is_var(x: Any) -> bool:
+    """Temporal o nombre (no constante ni literal string)."""
+    return type(x) is Temp or type(x) is str
+
+
+def uses_of(q: Quad) -> Iterable[int]:
+    """Posiciones que lee 'q' (también las de una Phi)."""
+    if q[0] == "Phi":
+        return range(2, len(q))
+    return USES.get(q[0], ())
+
+
+def def_of(q: Quad) -> Any:
+    """Lo que define 'q' (None si nada)."""
+    i = DEF_AT.get(q[0])
+    return q[i] if i is not None else None
+
+
+def phis(block: BasicBlock) -> List[Quad]:
+    """Las Phi de un bloque (van seguidas, después de su Label)."""
+    start = 1 if block.label is not None else 0
+    out = []
+    for q in block.quads[start:]:
+        if q[0] != "Phi":
+            break
+        out.append(q)
+    return out
+
+
+class SSAFunction:
+    """
+    Una función en SSA: su CFG (bloques con Phi), el dominador inmediato de
+    cada bloque y el nombre original de cada versión.
+    """
+    __slots__ = ("cfg", "idom", "base")
+
+    def __init__(self, cfg: CFG, idom: List[Optional[BasicBlock]], base: Dict[str, str]):
+        self.cfg = cfg
+        self.idom = idom
+        self.base = base            # 'x.k' -> 'x' (y 'x' -> 'x'), solo lo renombrado
+
+    def quads(self) -> List[Quad]:
+        return self.cfg.quads()
+
+
+# ---------- construcción ----------
+def to_ssa(cfg: CFG, pinned: Set[str] = frozenset()) -> SSAFunction:
+    """Pone 'cfg' en SSA (modifica sus bloques); 'pinned' no se renombra."""
+    idom = dominators(cfg)
+    base: Dict[str, str] = {}
+    entry = cfg.entry
+    # un salto de vuelta a la entrada dejaría Phi sin valor de entrada: no se toca
+    if entry is None or entry.preds:
+        return SSAFunction(cfg, idom, base)
+
+    # variables: lo que se define en bloques alcanzables, menos lo fijado
+    defs: Dict[str, List[BasicBlock]] = {}
+    upward: Set[str] = set()          # leídas en algún bloque antes de definirse ahí
+    for b in cfg.rpo:
+        local: Set[str] = set()
+        for q in b.quads:
+            for i in uses_of(q):
+                x = q[i]
+                if _is_var(x) and x not in local:
+                    upward.add(x)
+            d = def_of(q)
+            if d is not None and _is_var(d) and d not in pinned and "." not in d:
+                if d not in local:
+                    local.add(d)
+                    defs.setdefault(d, []).append(b)
+    for v in defs:
+        base[v] = v
+
+    # Phi en la frontera de dominancia iterada
+    df = dominance_frontiers(cfg, idom)
+    phi_vars: List[List[str]] = [[] for _ in cfg.blocks]
+    for v, blocks in defs.items():
+        if v not in upward:
+            continue
+        placed: Set[int] = set()
+        work = list(blocks)
+        queued = {b.index for b in blocks}
+        while work:
+            b = work.pop()
+            for f in df[b.index]:
+                if f.index in placed:
+                    continue
+                placed.add(f.index)
+                phi_vars[f.index].append(v)
+                if f.index not in queued:
+                    queued.add(f.index)
+                    work.append(f)
+
+    _rename(cfg, idom, base, phi_vars)
+    return SSAFunction(cfg, idom, base)
+
+
+def _rename(cfg: CFG, idom, base: Dict[str, str], phi_vars: List[List[str]]) -> None:
+    children: List[List[BasicBlock]] = [[] for _ in cfg.blocks]
+    for b in cfg.rpo[1:]:
+        children[idom[b.index].index].append(b)
+
+    stacks: Dict[str, List[str]] = {v: [] for v in base if v == base[v]}
+    count: Dict[str, int] = {}
+    # argumentos de las Phi de cada bloque: uno por predecesor (la entrada: 'x')
+    phi_args = [[[v] * len(b.preds) for v in phi_vars[b.index]] for b in cfg.blocks]
+    phi_dst: List[List[str]] = [list(vs) for vs in phi_vars]
+
+    def fresh(v: str) -> str:
+        k = count[v] = count.get(v, 0) + 1
+        name = type(v)(f"{v}.{k}")
+        base[name] = v
+        stacks[v].append(name)
+        return name
+
+    def current(x: Any) -> Any:
+        st = stacks.get(x) if _is_var(x) else None
+        return st[-1] if st else x
+
+    pushed: Dict[int, List[str]] = {}
+    work: List[Tuple[BasicBlock, bool]] = [(cfg.entry, False)]
+    while work:
+        b, leaving = work.pop()
+        if leaving:
+            for v in pushed.pop(b.index):
+                stacks[v].pop()
+            continue
+        mine: List[str] = []
+        for k, v in enumerate(phi_vars[b.index]):
+            phi_dst[b.index][k] = fresh(v)
+            mine.append(v)
+        out: List[Quad] = []
+        for q in b.quads:
+            uses = uses_of(q)
+            if uses:
+                new = list(q)
+                for i in uses:
+                    new[i] = current(q[i])
+                q = tuple(new)
+            i = DEF_AT.get(q[0])
+            if i is not None and q[i] in stacks:
+                v = q[i]
+                q = q[:i] + (fresh(v),) + q[i + 1:]
+                mine.append(v)
+            out.append(q)
+        b.quads = out
+        for s in b.succs:
+            j = s.preds.index(b)
+            for k, v in enumerate(phi_vars[s.index]):
+                phi_args[s.index][k][j] = current(v)
+        pushed[b.index] = mine
+        work.append((b, True))
+        work.extend((c, False) for c in reversed(children[b.index]))
+
+    # las Phi van al principio del bloque, después de su Label
+    for b in cfg.rpo:
+        if not phi_vars[b.index]:
+            continue
+        at = 1 if b.label is not None else 0
+        new_phis = [("Phi", d, *args) for d, args in zip(phi_dst[b.index], phi_args[b.index])]
+        b.quads[at:at] = new_phis
+
+
+# ---------- destrucción ----------
+class _Webs:
+    """Union-find de versiones (las redes de Phi)."""
+
+    def __init__(self):
+        self.parent: Dict[str, str] = {}
+
+    def find(self, x: str) -> str:
+        parent = self.parent
+        root = x
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while x != root:
+            parent[x], x = root, parent.get(x, x)
+        return root
+
+    def union(self, keep: str, other: str) -> None:
+        a, b = self.find(keep), self.find(other)
+        if a != b:
+            self.parent[b] = a
+
+
+def _liveness(cfg: CFG, is_ssa) -> List[Set[str]]:
+    """Versiones vivas al salir de cada bloque (los argumentos de Phi viven en su arista)."""
+    n = len(cfg.blocks)
+    gen: List[Set[str]] = [set() for _ in range(n)]
+    kill: List[Set[str]] = [set() for _ in range(n)]
+    edge: List[Set[str]] = [set() for _ in range(n)]     # argumentos de Phi de los sucesores
+    for b in cfg.rpo:
+        g, k = gen[b.index], kill[b.index]
+        for q in b.quads:
+            if q[0] == "Phi":
+                k.add(q[1])
+                continue
+            for i in uses_of(q):
+                x = q[i]
+                if is_ssa(x) and x not in k:
+                    g.add(x)
+            d = def_of(q)
+            if d is not None and is_ssa(d):
+                k.add(d)
+        for s in b.succs:
+            j = s.preds.index(b)
+            for q in phis(s):
+                if is_ssa(q[2 + j]):
+                    edge[b.index].add(q[2 + j])
+    live_in: List[Set[str]] = [set() for _ in range(n)]
+    live_out: List[Set[str]] = [set() for _ in range(n)]
+    changed = True
+    while changed:
+        changed = False
+        for b in reversed(cfg.rpo):
+            out = set(edge[b.index])
+            for s in b.succs:
+                out |= live_in[s.index]
+            new_in = gen[b.index] | (out - kill[b.index])
+            if new_in != live_in[b.index] or out != live_out[b.index]:
+                live_in[b.index], live_out[b.index] = new_in, out
+                changed = True
+    return live_out
+
+
+def _interference(fn: SSAFunction, webs: _Webs, live_out: List[Set[str]]):
+    """
+    (redes que se pisan a sí mismas, pares de redes de una misma variable que
+    viven a la vez). Una pasada hacia atrás por bloque: en cada definición se
+    mira qué otra versión de la misma variable sigue viva.
+    """
+    broken: Set[str] = set()
+    clash: Dict[str, Set[str]] = {}
+    base = fn.base
+
+    for b in fn.cfg.rpo:
+        live: Dict[str, Set[str]] = {}        # variable de la red -> versiones vivas
+        for x in live_out[b.index]:
+            live.setdefault(base[x], set()).add(x)
+
+        def define(d: str) -> None:
+            w = webs.find(d)
+            group = live.get(base[d], ())
+            for u in group:
+                if u == d:
+                    continue
+                wu = webs.find(u)
+                if wu == w:
+                    broken.add(w)
+                else:
+                    clash.setdefault(w, set()).add(wu)
+                    clash.setdefault(wu, set()).add(w)
+            if d in group:
+                group.discard(d)
+
+        quads = b.quads
+        for q in reversed(quads):
+            if q[0] == "Phi":
+                continue
+            d = def_of(q)
+            if d is not None and d in base:
+                define(d)
+            for i in uses_of(q):
+                x = q[i]
+                if x in base and _is_var(x):
+                    live.setdefault(base[x], set()).add(x)
+        # las Phi se definen juntas al entrar al bloque
+        for q in phis(b):
+            define(q[1])
+    return broken, clash
+
+
+def from_ssa(fn: SSAFunction, taken: Optional[Set[str]] = None,
+             conventional: bool = False) -> List[Quad]:
+    """
+    Quads sin Phi de 'fn'. 'taken' son los temporales ya usados en la
+    función (se calculan si no se dan) para elegir temporales nuevos.
+
+    Con conventional=True se promete que cada versión puede volver al nombre
+    de su variable sin copias: vale tal como sale de to_ssa y después de
+    pases que solo cambian usos por constantes, borran definiciones que
+    nadie lee o quitan arcos (SCCP). Entonces no hace falta mirar
+    interferencias: cada versión vuelve a su nombre y las Phi se van.
+    """
+    cfg, base = fn.cfg, fn.base
+    if not base:
+        return [q for q in cfg.quads() if q[0] != "Phi"]
+    if conventional:
+        return _drop_versions(cfg, base)
+
+    def is_ssa(x: Any) -> bool:
+        return _is_var(x) and x in base
+
+    # 1. redes: destino de cada Phi con sus argumentos de la misma variable
+    # (un argumento de otra variable, tras propagar copias, queda como copia)
+    webs = _Webs()
+    for b in cfg.rpo:
+        for q in phis(b):
+            for x in q[2:]:
+                if is_ssa(x) and base[x] == base[q[1]]:
+                    webs.union(q[1], x)
+
+    # 2. interferencias; una red que se pisa se deshace y se vuelve a mirar
+    live_out = _liveness(cfg, is_ssa)
+    while True:
+        broken, clash = _interference(fn, webs, live_out)
+        if not broken:
+            break
+        for v in list(base):
+            if webs.find(v) in broken:
+                webs.parent[v] = v
+
+    # 3. nombres: la red vuelve a la variable original salvo que choque
+    if taken is None:
+        taken = {x for q in cfg.quads() for x in q if type(x) is Temp}
+    top = max((int(m.group(1)) for t in taken for m in [_TEMP_NUM.match(t)] if m), default=0)
+
+    def new_temp() -> Temp:
+        nonlocal top
+        top += 1
+        return Temp(f"t{top}")
+
+    name_of: Dict[str, Any] = {}
+    entry = {webs.find(v) for v in base if base[v] == v}    # redes con la versión de entrada
+    roots = sorted({webs.find(v) for v in base}, key=lambda w: (w not in entry, w))
+    for w in roots:
+        v = base[w]
+        if w in entry or not any(name_of.get(c) == v for c in clash.get(w, ())):
+            name_of[w] = v
+        else:
+            name_of[w] = new_temp()
+
+    def rename(x: Any) -> Any:
+        return name_of[webs.find(x)] if is_ssa(x) else x
+
+    # 4. reescritura y copias de las Phi en los predecesores
+    copies_at: Dict[int, List[Tuple[Any, Any]]] = {}
+    for b in cfg.rpo:
+        for q in phis(b):
+            d = rename(q[1])
+            for j, p in enumerate(b.preds):
+                if p.rpo is None:
+                    continue
+                x = rename(q[2 + j])
+                if x != d:
+                    copies_at.setdefault(p.index, []).append((b, d, x))
+
+    # las copias van al final del predecesor; una arista que sale de un IfZ
+    # se parte con un bloque nuevo
+    tail: List[Quad] = []
+    after: Dict[int, List[Quad]] = {}
+    before_end: Dict[int, List[Quad]] = {}
+    for p in cfg.rpo:
+        pending = copies_at.get(p.index)
+        if not pending:
+            continue
+        by_succ: Dict[int, List[Tuple[Any, Any]]] = {}
+        for s, d, x in pending:
+            by_succ.setdefault(s.index, []).append((d, x))
+        for si, pc in by_succ.items():
+            s = cfg.blocks[si]
+            seq = _sequentialize(pc, new_temp)
+            if p.last[0] != "IfZ":
+                before_end[p.index] = seq
+                continue
+            if si == p.index + 1:
+                # caída del IfZ: bloque sin etiqueta entre los dos
+                after[p.index] = seq
+            if p.last[2] == s.label:
+                label = f"{s.label}_p{s.preds.index(p)}"
+                p.quads[-1] = p.last[:2] + (label,)
+                tail.append(("Label", label))
+                tail.extend(seq)
+                tail.append(("Goto", s.label))
+
+    out: List[Quad] = []
+    for b in cfg.blocks:
+        quads = [q for q in b.quads if q[0] != "Phi"]
+        if b.rpo is not None:
+            body = []
+            for q in quads:
+                new = list(q)
+                for i in uses_of(q):
+                    new[i] = rename(q[i])
+                i = DEF_AT.get(q[0])
+                if i is not None:
+                    new[i] = rename(q[i])
+                body.append(tuple(new))
+            quads = body
+        seq = before_end.get(b.index)
+        if seq:
+            if quads[-1][0] == "Goto":
+                quads[-1:-1] = seq
+            else:
+                quads.extend(seq)
+        out.extend(quads)
+        out.extend(after.get(b.index, ()))
+    out.extend(tail)
+    return out
+
+
+def _drop_versions(cfg: CFG, base: Dict[str, str]) -> List[Quad]:
+    out: List[Quad] = []
+    for b in cfg.blocks:
+        for q in b.quads:
+            op = q[0]
+            if op == "Phi":
+                continue
+            i = DEF_AT.get(op)
+            uses = uses_of(q)
+            if uses or i is not None:
+                new = list(q)
+                for k in uses:
+                    x = q[k]
+                    if _is_var(x):
+                        new[k] = base.get(x, x)
+                if i is not None and q[i] is not None:
+                    new[i] = base.get(q[i], q[i])
+                q = tuple(new)
+            out.append(q)
+    return out
+
+
+def _sequentialize(copies: List[Tuple[Any, Any]], new_temp) -> List[Quad]:
+    """
+    Copia paralela (d1, .., dn) := (x1, .., xn) -> Assign en un orden que no
+    pisa un origen antes de leerlo; un ciclo se rompe con un temporal.
+    Las constantes van al final (no son origen de nadie).
+    """
+    consts = [(d, x) for d, x in copies if not _is_var(x)]
+    moves = [(d, x) for d, x in copies if _is_var(x) and d != x]
+    out: List[Quad] = []
+    pred: Dict[Any, Any] = {}
+    loc: Dict[Any, Any] = {}
+    for d, x in moves:
+        loc[x] = x
+        pred[d] = x
+    ready = [d for d, _ in moves if d not in loc]
+    todo = [d for d, _ in moves]
+    while todo:
+        while ready:
+            d = ready.pop()
+            x = pred[d]
+            c = loc[x]
+            out.append(("Assign", d, c))
+            loc[x] = d
+            if x == c and x in pred:
+                ready.append(x)
+        d = todo.pop()
+        if d != loc[pred[d]]:
+            t = new_temp()
+            out.append(("Assign", t, d))
+            loc[d] = t
+            ready.append(d)
+    out.extend(("Assign", d, x) for d, x in consts)
+    return out
+
+
+# ---------- programa ----------
+def pinned_names(chunks: List[List[Quad]]) -> List[Set[str]]:
+    """
+    Por función: los nombres que también usa otra función (el main sintético
+    o una función anidada que lee una local de la que la contiene). Otra
+    función puede leerlos o cambiarlos en una llamada: no se renombran.
+    """
+    names: List[Set[str]] = []
+    count: Dict[str, int] = {}
+    for chunk in chunks:
+        seen: Set[str] = set()
+        params: Set[str] = set()
+        for q in chunk:
+            if q[0] == "LoadParam":
+                params.add(q[1])
+            for i in uses_of(q):
+                if type(q[i]) is str:
+                    seen.add(q[i])
+            d = def_of(q)
+            if type(d) is str:
+                seen.add(d)
+        seen -= params
+        names.append(seen)
+        for x in seen:
+            count[x] = count.get(x, 0) + 1
+    return [{x for x in seen if count[x] > 1} for seen in names]
+
+
+def program_to_ssa(quads: List[Quad]) -> List[SSAFunction]:
+    """Cada función del programa en SSA (lo previo a la primera, tal cual)."""
+    chunks = split_functions(quads)
+    pinned = pinned_names(chunks)
+    return [to_ssa(CFG(chunk), pin) for chunk, pin in zip(chunks, pinned)]
+
+
+def program_from_ssa(fns: List[SSAFunction], conventional: bool = False) -> List[Quad]:
+    out: List[Quad] = []
+    for fn in fns:
+        out.extend(from_ssa(fn, conventional=conventional))
+    return out
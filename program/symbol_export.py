@@ -0,0 +1,150 @@
+# program/symbol_export.py
+"""
+Exportación de la tabla de símbolos a JSON, fuera del camino caliente.
+
+Solo se exporta si alguien pide un archivo de salida: Driver con
+--symbols-out=ruta (o compile_session(symbols_out=...)) y el IDE con
+"Exportar tabla de símbolos…". La escritura:
+
+  - es atómica: se escribe a un temporal en el mismo directorio y se
+    renombra con os.replace, así dos compilaciones en el mismo checkout
+    nunca dejan un archivo a medias;
+  - se salta si el contenido no cambió desde la última escritura a esa
+    ruta: el hash se calcula sobre las partes de JSONEncoder.iterencode
+    antes de tocar el disco y, si es el mismo, no se crea ni el temporal;
+  - conserva los permisos del archivo que reemplaza (uno nuevo queda con
+    0666 menos el umask, como con open()): mkstemp crea el temporal 0600;
+  - es compacta por defecto (sin espacios); pretty=True usa indent=2.
+
+SymbolExporter hace lo mismo en un hilo propio: submit() vuelve enseguida
+y si llegan varias versiones para la misma ruta antes de escribir, solo se
+escribe la última.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+_COMPACT = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+_PRETTY = json.JSONEncoder(ensure_ascii=False, indent=2)
+
+# ruta absoluta -> hash del último contenido escrito (compartido por todo el proceso)
+_written: Dict[str, str] = {}
+_written_lock = threading.Lock()
+
+# umask del proceso (solo se puede leer cambiándolo: una vez, al importar)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def write_json_atomic(path: str, obj: Any, pretty: bool = False) -> bool:
+    """Escribe 'obj' en 'path' (hash primero + rename atómico). False si no cambió."""
+    path = os.path.abspath(path)
+    encoder = _PRETTY if pretty else _COMPACT
+    chunks = []
+    h = hashlib.sha256()
+    for chunk in encoder.iterencode(obj):
+        data = chunk.encode("utf-8")
+        chunks.append(data)
+        h.update(data)
+    digest = h.hexdigest()
+    with _written_lock:
+        if _written.get(path) == digest and os.path.exists(path):
+            return False
+    d = os.path.dirname(path) or "."
+    os.makedirs(d, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".symbols-", suffix=".tmp", dir=d)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.writelines(chunks)
+        try:
+            mode = os.stat(path).st_mode & 0o7777
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(tmp, mode)
+        with _written_lock:
+            os.replace(tmp, path)
+            _written[path] = digest
+        return True
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class SymbolExporter:
+    """Escritor en segundo plano; una sola tarea pendiente por ruta."""
+
+    def __init__(self, pretty: bool = False):
+        self.pretty = pretty
+        self._cond = threading.Condition()
+        self._pending: Dict[str, Tuple[Any, bool]] = {}
+        self._writing = False
+        self._closed = False
+        self.stats = {"written": 0, "unchanged": 0, "coalesced": 0, "failed": 0}
+        self.last_error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._loop, name="symbol-export", daemon=True)
+        self._thread.start()
+
+    def submit(self, path: str, symbols: Any, pretty: Optional[bool] = None) -> None:
+        """Encola la exportación; 'symbols' no debe modificarse después."""
+        if symbols is None:
+            return
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("SymbolExporter cerrado")
+            path = os.path.abspath(path)
+            if path in self._pending:
+                self.stats["coalesced"] += 1
+            self._pending[path] = (symbols, self.pretty if pretty is None else pretty)
+            self._cond.notify()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Espera a que se escriba todo lo encolado."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._writing, timeout)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                path = next(iter(self._pending))
+                symbols, pretty = self._pending.pop(path)
+                self._writing = True
+            try:
+                key = "written" if write_json_atomic(path, symbols, pretty) else "unchanged"
+            except Exception as e:
+                key = "failed"
+                self.last_error = e
+            with self._cond:
+                self.stats[key] += 1
+                self._writing = False
+                self._cond.notify_all()
+
+
+_default: Optional[SymbolExporter] = None
+_default_lock = threading.Lock()
+
+
+def default_exporter() -> SymbolExporter:
+    """Exportador del proceso (se crea la primera vez)."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = SymbolExporter()
+        return _default
@@ -1,23 +1,22 @@
 # program/symbol_table.py
 import json
-from typing import Optional, Dict, Any, List, Callable
+from typing import Optional, Dict, Any, List, Callable, Tuple
 
-class Type:
-    def __init__(self, name: str):
-        self.name = name
-    def __str__(self): return self.name
-    def __repr__(self): return self.name
+from program.custom_types import (
+    Type, IntType, StringType, BoolType, VoidType, named_type, type_name
+)
 
-# Exponemos un "constructor" de tipos por nombre para reutilizar
+# Los tipos son los de program/custom_types.py (internados): TYPE("integer")
+# devuelve el mismo objeto que usa el semántico.
 def TYPE(name: str) -> Type:
-    return Type(name)
+    return named_type(name)
 
-INT    = Type("integer")
-STR    = Type("string")
-BOOL   = Type("boolean")
-VOID   = Type("void")
-CLASS  = lambda n: Type(f"class<{n}>")
-FN     = lambda sig: Type(sig)  # ej: "fn(integer)->string"
+INT    = IntType
+STR    = StringType
+BOOL   = BoolType
+VOID   = VoidType
+CLASS  = lambda n: named_type(f"class<{n}>")
+FN     = lambda sig: named_type(sig)  # ej: "fn(integer)->string"
 
 class Symbol:
     def __init__(self,
@@ -41,7 +40,7 @@ class Symbol:
     def to_dict(self) -> Dict[str, Any]:
         return {
             "name": self.name,
-            "type": str(self.type),
+            "type": type_name(self.type),
             "const": self.is_const,
             "line": self.line,
             "col": self.col,
@@ -95,3 +94,106 @@ class SymbolTable:
     def export_json(self, path: str="symbol_table.json"):
         with open(path, "w", encoding="utf-8") as f:
             json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+
+
+# ---------- Tabla plana con marcas de scope (LeBlanc-Cook) ----------
+# SymbolTable.lookup sube por la cadena de padres en cada referencia y cada
+# bloque crea una tabla nueva. ScopedSymbolTable guarda un solo dict
+# nombre -> pila de (nivel, Symbol): lookup mira el tope de la pila, insert
+# apila y exit_scope desapila solo los nombres que declaró ese scope. Las
+# tres operaciones son O(1) amortizadas. Los scopes cerrados quedan en un
+# árbol (_Scope) con la misma forma que SymbolTable.to_dict().
+
+class _Scope:
+    __slots__ = ("name", "level", "symbols", "children", "next_local", "next_param")
+
+    def __init__(self, name: str, level: int):
+        self.name = name
+        self.level = level
+        self.symbols: Dict[str, Symbol] = {}
+        self.children: List['_Scope'] = []
+        self.next_local = 0
+        self.next_param = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "scope": self.name,
+            "level": self.level,
+            "symbols": [s.to_dict() for s in self.symbols.values()],
+            "children": [c.to_dict() for c in self.children]
+        }
+
+
+class ScopedSymbolTable:
+    def __init__(self, name: str = "global"):
+        self.root = _Scope(name, 0)
+        self._open: List[_Scope] = [self.root]
+        # nombres declarados en cada scope abierto, para desapilarlos al salir
+        self._declared: List[List[str]] = [[]]
+        self._bindings: Dict[str, List[Tuple[int, Symbol]]] = {}
+
+    @property
+    def current(self) -> _Scope:
+        return self._open[-1]
+
+    @property
+    def level(self) -> int:
+        return len(self._open) - 1
+
+    def enter_scope(self, name: str = "block") -> _Scope:
+        scope = _Scope(name, len(self._open))
+        self._open[-1].children.append(scope)
+        self._open.append(scope)
+        self._declared.append([])
+        return scope
+
+    def exit_scope(self) -> None:
+        if len(self._open) == 1:
+            return  # el global no se cierra
+        self._open.pop()
+        bindings = self._bindings
+        for name in self._declared.pop():
+            stack = bindings[name]
+            stack.pop()
+            if not stack:
+                del bindings[name]
+
+    def insert(self, name: str, symbol_type: Type, is_const: bool=False,
+               line: Optional[int]=None, col: Optional[int]=None,
+               is_param: bool=False, label: Optional[str]=None) -> bool:
+        level = len(self._open) - 1
+        stack = self._bindings.get(name)
+        if stack and stack[-1][0] == level:
+            return False
+        scope = self._open[-1]
+        if is_param:
+            off = scope.next_param
+            scope.next_param += 1
+        else:
+            off = scope.next_local
+            scope.next_local += 1
+        sym = Symbol(name, symbol_type, is_const, line, col, offset=off, label=label, is_param=is_param)
+        scope.symbols[name] = sym
+        if stack is None:
+            self._bindings[name] = [(level, sym)]
+        else:
+            stack.append((level, sym))
+        self._declared[-1].append(name)
+        return True
+
+    def lookup(self, name: str) -> Optional[Symbol]:
+        stack = self._bindings.get(name)
+        return stack[-1][1] if stack else None
+
+    def lookup_local(self, name: str) -> Optional[Symbol]:
+        stack = self._bindings.get(name)
+        if stack and stack[-1][0] == len(self._open) - 1:
+            return stack[-1][1]
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self.root.to_dict()
+
+    def export_json(self, path: str="symbol_table.json"):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
@@ -17,6 +17,8 @@ except Exception:
     # si se importa por ruta raíz
     from program.symbol_table import SymbolTable  # type: ignore
 
+from program.diagnostics import Diagnostic
+
 # --- Visitor base tolerante ---
 try:
     from scripts.CompiscriptVisitor import CompiscriptVisitor
@@ -63,19 +65,34 @@ class TypeCheckVisitor(CompiscriptVisitor):
 
     # -------- APIs de utilidad --------
     def add_error(self, msg: str, ctx: Optional[ParseTree] = None):
+        # diagnóstico estructurado: la posición viaja aparte del texto
+        if ctx is not None and hasattr(ctx, "line") and not hasattr(ctx, "start"):
+            # nodo del AST tipado
+            self.errors.append(Diagnostic.at("check", ctx, text=str(msg)))
+            return
         if ctx is not None and hasattr(ctx, "start"):
             try:
-                line = ctx.start.line
-                col = ctx.start.column
-                self.errors.append("linea " + str(line) + ":" + str(col) + " " + str(msg))
+                self.errors.append(Diagnostic("check", ctx.start.line, ctx.start.column, text=str(msg)))
                 return
             except Exception:
                 pass
-        self.errors.append(str(msg))
+        self.errors.append(Diagnostic("check", text=str(msg)))
 
     def has_errors(self) -> bool:
         return len(self.errors) > 0
 
+    def visit(self, tree):
+        # El Driver pasa el AST tipado (program/typed_ast.py): se recorre una
+        # vez y se llama check<Kind>(nodo) solo donde haya un chequeo definido.
+        from program.typed_ast import Node, walk
+        if not isinstance(tree, Node):
+            return super().visit(tree)
+        for node in walk(tree):
+            check = getattr(self, "check" + node.kind, None)
+            if check is not None:
+                check(node)
+        return None
+
     # --------- Ejemplos de visitas mínimas (no-op seguros) ----------
     # Mantengo estos métodos “seguros” para que puedas enchufarlo sin romper tu pipeline.
     def visitProgram(self, ctx):
@@ -0,0 +1,492 @@
+# program/typed_ast.py
+"""
+AST tipado y compacto de Compiscript.
+
+El árbol de ANTLR se baja UNA sola vez (lower) a nodos con __slots__: cada
+nodo tiene su clase (kind), su span (línea/columna de inicio y fin) y sus
+campos ya resueltos (nombres, operadores, valores de literales, tipos
+anotados). Los pases posteriores (semántico, TAC, caché por función)
+recorren este AST y nunca llaman a getText() ni sondean métodos del
+contexto: en expresiones anidadas getText() recorre el subárbol completo en
+cada llamada y el costo crece cuadráticamente.
+
+La bajada recorre el árbol en una pasada lineal: las cadenas de reglas de un
+solo hijo (expression -> assignmentExpr -> ... -> primaryExpr) se saltan con
+un bucle, así la recursión de Python crece con la profundidad del AST y no
+con la de la gramática. Tolera árboles con errores de sintaxis: lo que falta
+queda en None.
+
+Uso:
+    ast = lower(tree)          # tree: ProgramContext (ANTLR o rd_parser)
+    for node in walk(ast): ...
+    ast.index.functions        # partición del nivel superior (TopLevel)
+    ast.dump()                 # forma canónica, sin posiciones
+"""
+from __future__ import annotations
+
+from typing import Any, Iterator, List, Optional, Tuple
+
+from antlr4 import ParserRuleContext
+from antlr4.tree.Tree import TerminalNode
+
+from scripts.CompiscriptParser import CompiscriptParser as P
+
+Span = Tuple[int, int, int, int]
+_NOSPAN: Span = (0, 0, 0, 0)
+
+
+# ---------- nodos ----------
+class Node:
+    """Base: span (line, col, end_line, end_col) + los campos de _fields."""
+    __slots__ = ("line", "col", "end_line", "end_col")
+    kind = "Node"
+    _fields: Tuple[str, ...] = ()
+
+    def __init__(self, span: Span, *values: Any):
+        self.line, self.col, self.end_line, self.end_col = span
+        for f, v in zip(self._fields, values):
+            setattr(self, f, v)
+
+    @property
+    def span(self) -> Span:
+        return (self.line, self.col, self.end_line, self.end_col)
+
+    def children(self) -> Iterator["Node"]:
+        """Nodos hijos en orden (los campos lista se aplanan)."""
+        for f in self._fields:
+            v = getattr(self, f)
+            if isinstance(v, Node):
+                yield v
+            elif isinstance(v, list):
+                for x in v:
+                    if isinstance(x, Node):
+                        yield x
+
+    def dump(self) -> str:
+        """Forma canónica (sin posiciones): sirve de huella estructural."""
+        parts = [self.kind]
+        for f in self._fields:
+            parts.append(_dump_value(getattr(self, f)))
+        return "(" + " ".join(parts) + ")"
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{f}={getattr(self, f)!r}" for f in self._fields)
+        return f"{self.kind}@{self.line}:{self.col}({fields})"
+
+
+def _dump_value(v: Any) -> str:
+    if isinstance(v, Node):
+        return v.dump()
+    if isinstance(v, list):
+        return "[" + " ".join(_dump_value(x) for x in v) + "]"
+    if v is None:
+        return "_"
+    return repr(v)
+
+
+class Expr(Node):
+    """
+    Expresión. 'etype' es su tipo (program/custom_types.py): lo anota el
+    SemanticAnalyzer al recorrerla y el generador de TAC lo usa para bajar
+    strings; None si la expresión no se analizó.
+    """
+    __slots__ = ("etype",)
+
+    def __init__(self, span: Span, *values: Any):
+        Node.__init__(self, span, *values)
+        self.etype = None
+
+
+def _node(name: str, fields: Tuple[str, ...], base: type = Node) -> type:
+    return type(name, (base,), {"__slots__": fields, "kind": name, "_fields": fields})
+
+
+# tipos anotados: 'integer', 'Persona[][]' -> TypeRef('Persona', 2)
+class TypeRef(_node("TypeRef", ("name", "dims"))):
+    __slots__ = ()
+
+    def __str__(self) -> str:
+        return (self.name or "") + "[]" * self.dims
+
+
+class TopLevel:
+    """
+    Partición del nivel superior de un Program por tipo de nodo: funciones,
+    clases y sentencias sueltas (las que van al main sintético). 'decls'
+    tiene funciones y clases en orden de fuente, que es el orden de emisión.
+    """
+    __slots__ = ("functions", "classes", "decls", "statements")
+
+    def __init__(self, body: List[Node]):
+        self.functions: List[Node] = []
+        self.classes: List[Node] = []
+        self.decls: List[Node] = []
+        self.statements: List[Node] = []
+        for st in body:
+            if st.kind == "FunctionDecl":
+                self.functions.append(st)
+                self.decls.append(st)
+            elif st.kind == "ClassDecl":
+                self.classes.append(st)
+                self.decls.append(st)
+            else:
+                self.statements.append(st)
+
+
+# sentencias y declaraciones
+class Program(_node("Program", ("body",))):
+    __slots__ = ("_index",)
+
+    @property
+    def index(self) -> TopLevel:
+        """TopLevel del programa; se arma la primera vez y queda guardado."""
+        try:
+            return self._index
+        except AttributeError:
+            self._index = TopLevel(self.body)
+            return self._index
+
+
+Block        = _node("Block",        ("body",))
+VarDecl      = _node("VarDecl",      ("name", "type", "init"))
+ConstDecl    = _node("ConstDecl",    ("name", "type", "init"))
+Param        = _node("Param",        ("name", "type"))
+FunctionDecl = _node("FunctionDecl", ("name", "params", "ret", "body"))
+ClassDecl    = _node("ClassDecl",    ("name", "base", "members"))
+Assign       = _node("Assign",       ("name", "value"))
+PropAssign   = _node("PropAssign",   ("obj", "name", "value"))
+ExprStmt     = _node("ExprStmt",     ("expr",))
+Print        = _node("Print",        ("expr",))
+If           = _node("If",           ("cond", "then", "other"))
+While        = _node("While",        ("cond", "body"))
+DoWhile      = _node("DoWhile",      ("body", "cond"))
+For          = _node("For",          ("init", "cond", "update", "body"))
+Foreach      = _node("Foreach",      ("var", "iterable", "body"))
+TryCatch     = _node("TryCatch",     ("body", "var", "handler"))
+Switch       = _node("Switch",       ("subject", "cases", "default"))
+Case         = _node("Case",         ("value", "body"))
+Break        = _node("Break",        ())
+Continue     = _node("Continue",     ())
+Return       = _node("Return",       ("value",))
+
+# expresiones
+Literal        = _node("Literal",        ("lit", "value", "text"), Expr)   # lit: int|string|bool|null
+ArrayLit       = _node("ArrayLit",       ("items",), Expr)
+Name           = _node("Name",           ("name",), Expr)
+This           = _node("This",           (), Expr)
+New            = _node("New",            ("cls", "args"), Expr)
+Call           = _node("Call",           ("callee", "args"), Expr)
+Index          = _node("Index",          ("obj", "index"), Expr)
+Prop           = _node("Prop",           ("obj", "name"), Expr)
+Unary          = _node("Unary",          ("op", "operand"), Expr)
+Binary         = _node("Binary",         ("op", "left", "right"), Expr)    # aritméticos, relacionales, igualdad
+Logical        = _node("Logical",        ("op", "left", "right"), Expr)    # && y || (cortocircuito)
+Ternary        = _node("Ternary",        ("cond", "then", "other"), Expr)
+AssignExpr     = _node("AssignExpr",     ("target", "value"), Expr)
+PropAssignExpr = _node("PropAssignExpr", ("obj", "name", "value"), Expr)
+
+
+def walk(node: Optional[Node]) -> Iterator[Node]:
+    """Preorden iterativo."""
+    stack = [node] if node is not None else []
+    while stack:
+        n = stack.pop()
+        yield n
+        stack.extend(reversed(list(n.children())))
+
+
+# ---------- bajada desde el parse tree ----------
+def _span(ctx) -> Span:
+    start = ctx.start
+    stop = ctx.stop if ctx.stop is not None else start
+    if start is None:
+        return _NOSPAN
+    text = stop.text or ""
+    return (start.line, start.column, stop.line, stop.column + len(text))
+
+
+def _text(term) -> Optional[str]:
+    return term.getText() if term is not None else None
+
+
+_BINARY_RULES = (P.LogicalOrExprContext, P.LogicalAndExprContext, P.EqualityExprContext,
+                 P.RelationalExprContext, P.AdditiveExprContext, P.MultiplicativeExprContext)
+_BINARY_OPS = {"||", "&&", "==", "!=", "<", "<=", ">", ">=", "+", "-", "*", "/", "%"}
+_LOGICAL_OPS = {"||", "&&"}
+
+
+class _Lowering:
+    def __init__(self):
+        self._stmts = {
+            P.VariableDeclarationContext: self.var_decl,
+            P.ConstantDeclarationContext: self.const_decl,
+            P.AssignmentContext:          self.assignment,
+            P.FunctionDeclarationContext: self.function,
+            P.ClassDeclarationContext:    self.class_decl,
+            P.ExpressionStatementContext: self.expr_stmt,
+            P.PrintStatementContext:      self.print_stmt,
+            P.BlockContext:               self.block,
+            P.IfStatementContext:         self.if_stmt,
+            P.WhileStatementContext:      self.while_stmt,
+            P.DoWhileStatementContext:    self.do_while,
+            P.ForStatementContext:        self.for_stmt,
+            P.ForeachStatementContext:    self.foreach,
+            P.TryCatchStatementContext:   self.try_catch,
+            P.SwitchStatementContext:     self.switch,
+            P.BreakStatementContext:      lambda c: Break(_span(c)),
+            P.ContinueStatementContext:   lambda c: Continue(_span(c)),
+            P.ReturnStatementContext:     self.return_stmt,
+        }
+
+    # ----- sentencias -----
+    def program(self, ctx) -> Program:
+        return Program(_span(ctx), self.statements(ctx.statement()))
+
+    def statements(self, ctxs) -> List[Node]:
+        out = []
+        for st in ctxs or ():
+            node = self.statement(st)
+            if node is not None:
+                out.append(node)
+        return out
+
+    def statement(self, ctx) -> Optional[Node]:
+        if isinstance(ctx, P.StatementContext):
+            if not ctx.getChildCount():
+                return None
+            ctx = ctx.getChild(0)
+        fn = self._stmts.get(type(ctx))
+        return fn(ctx) if fn is not None else None
+
+    def type_ref(self, ctx) -> Optional[TypeRef]:
+        if ctx is None:
+            return None
+        base = ctx.baseType()
+        # type: baseType ('[' ']')*
+        return TypeRef(_span(ctx), _text(base) if base is not None else None,
+                       (ctx.getChildCount() - 1) // 2)
+
+    def var_decl(self, ctx) -> VarDecl:
+        ann = ctx.typeAnnotation()
+        init = ctx.initializer()
+        return VarDecl(_span(ctx), _text(ctx.Identifier()),
+                       self.type_ref(ann.type_()) if ann is not None else None,
+                       self.expr(init.expression()) if init is not None else None)
+
+    def const_decl(self, ctx) -> ConstDecl:
+        ann = ctx.typeAnnotation()
+        return ConstDecl(_span(ctx), _text(ctx.Identifier()),
+                         self.type_ref(ann.type_()) if ann is not None else None,
+                         self.expr(ctx.expression()))
+
+    def assignment(self, ctx) -> Node:
+        exprs = ctx.expression()
+        if len(exprs) >= 2:
+            return PropAssign(_span(ctx), self.expr(exprs[0]), _text(ctx.Identifier()),
+                              self.expr(exprs[1]))
+        return Assign(_span(ctx), _text(ctx.Identifier()), self.expr(exprs[0]) if exprs else None)
+
+    def function(self, ctx) -> FunctionDecl:
+        params = []
+        if ctx.parameters() is not None:
+            for p in ctx.parameters().parameter():
+                params.append(Param(_span(p), _text(p.Identifier()), self.type_ref(p.type_())))
+        return FunctionDecl(_span(ctx), _text(ctx.Identifier()), params,
+                            self.type_ref(ctx.type_()), self.block(ctx.block()))
+
+    def class_decl(self, ctx) -> ClassDecl:
+        ids = ctx.Identifier()
+        members = []
+        for m in ctx.classMember():
+            if m.getChildCount():
+                node = self.statement(m.getChild(0))
+                if node is not None:
+                    members.append(node)
+        return ClassDecl(_span(ctx), _text(ids[0]) if ids else None,
+                         _text(ids[1]) if len(ids) > 1 else None, members)
+
+    def expr_stmt(self, ctx) -> ExprStmt:
+        return ExprStmt(_span(ctx), self.expr(ctx.expression()))
+
+    def print_stmt(self, ctx) -> Print:
+        return Print(_span(ctx), self.expr(ctx.expression()))
+
+    def block(self, ctx) -> Optional[Block]:
+        if ctx is None:
+            return None
+        return Block(_span(ctx), self.statements(ctx.statement()))
+
+    def if_stmt(self, ctx) -> If:
+        blocks = ctx.block()
+        return If(_span(ctx), self.expr(ctx.expression()),
+                  self.block(blocks[0]) if blocks else None,
+                  self.block(blocks[1]) if len(blocks) > 1 else None)
+
+    def while_stmt(self, ctx) -> While:
+        return While(_span(ctx), self.expr(ctx.expression()), self.block(ctx.block()))
+
+    def do_while(self, ctx) -> DoWhile:
+        return DoWhile(_span(ctx), self.block(ctx.block()), self.expr(ctx.expression()))
+
+    def for_stmt(self, ctx) -> For:
+        init = None
+        if ctx.variableDeclaration() is not None:
+            init = self.var_decl(ctx.variableDeclaration())
+        elif ctx.assignment() is not None:
+            init = self.assignment(ctx.assignment())
+        # for '(' (init | ';') cond? ';' update? ')': el ';' propio separa cond de update
+        cond = update = None
+        semis = 0 if init is not None else -1
+        for ch in ctx.getChildren():
+            if isinstance(ch, TerminalNode):
+                semis += ch.getText() == ";"
+            elif isinstance(ch, P.ExpressionContext):
+                if semis > 0:
+                    update = self.expr(ch)
+                else:
+                    cond = self.expr(ch)
+        return For(_span(ctx), init, cond, update, self.block(ctx.block()))
+
+    def foreach(self, ctx) -> Foreach:
+        return Foreach(_span(ctx), _text(ctx.Identifier()), self.expr(ctx.expression()),
+                       self.block(ctx.block()))
+
+    def try_catch(self, ctx) -> TryCatch:
+        blocks = ctx.block()
+        return TryCatch(_span(ctx), self.block(blocks[0]) if blocks else None,
+                        _text(ctx.Identifier()), self.block(blocks[1]) if len(blocks) > 1 else None)
+
+    def switch(self, ctx) -> Switch:
+        cases = [Case(_span(c), self.expr(c.expression()), self.statements(c.statement()))
+                 for c in ctx.switchCase()]
+        d = ctx.defaultCase()
+        return Switch(_span(ctx), self.expr(ctx.expression()), cases,
+                      self.statements(d.statement()) if d is not None else None)
+
+    def return_stmt(self, ctx) -> Return:
+        e = ctx.expression()
+        return Return(_span(ctx), self.expr(e) if e is not None else None)
+
+    # ----- expresiones -----
+    def expr(self, ctx) -> Optional[Node]:
+        while ctx is not None:
+            t = type(ctx)
+            n = ctx.getChildCount()
+            if t in _BINARY_RULES:
+                if n == 1:
+                    ctx = ctx.getChild(0)
+                    continue
+                return self.binary(ctx)
+            if t is P.PrimaryExprContext:
+                ctx = ctx.getChild(1) if n == 3 else ctx.getChild(0)   # '(' expr ')'
+                continue
+            if t is P.UnaryExprContext:
+                if n == 1:
+                    ctx = ctx.getChild(0)
+                    continue
+                operand = self.expr(ctx.unaryExpr())
+                if operand is None:
+                    return None
+                return Unary(_span(ctx), ctx.getChild(0).getText(), operand)
+            if t is P.ExpressionContext or t is P.ExprNoAssignContext:
+                ctx = ctx.getChild(0) if n else None
+                continue
+            if t is P.TernaryExprContext:
+                if n == 1:
+                    ctx = ctx.getChild(0)
+                    continue
+                e = ctx.expression()
+                return Ternary(_span(ctx), self.expr(ctx.logicalOrExpr()),
+                               self.expr(e[0]) if e else None,
+                               self.expr(e[1]) if len(e) > 1 else None)
+            if t is P.LiteralExprContext:
+                return self.literal(ctx)
+            if t is P.LeftHandSideContext:
+                return self.lhs(ctx)
+            if t is P.AssignExprContext:
+                return AssignExpr(_span(ctx), self.lhs(ctx.lhs), self.expr(ctx.assignmentExpr()))
+            if t is P.PropertyAssignExprContext:
+                return PropAssignExpr(_span(ctx), self.lhs(ctx.lhs), _text(ctx.Identifier()),
+                                      self.expr(ctx.assignmentExpr()))
+            return None
+        return None
+
+    def binary(self, ctx) -> Optional[Node]:
+        acc = None
+        op = None
+        start = _span(ctx)[:2]   # incluye un '(' inicial, como el parse tree
+        for ch in ctx.getChildren():
+            if isinstance(ch, ParserRuleContext):
+                right = self.expr(ch)
+                if right is None:
+                    continue
+                if acc is None:
+                    acc = right
+                elif op is not None:
+                    cls = Logical if op in _LOGICAL_OPS else Binary
+                    acc = cls(start + (right.end_line, right.end_col), op, acc, right)
+                op = None
+            else:
+                text = ch.getText()
+                if text in _BINARY_OPS:
+                    op = text
+        return acc
+
+    def literal(self, ctx) -> Node:
+        sp = _span(ctx)
+        arr = ctx.arrayLiteral()
+        if arr is not None:
+            return ArrayLit(sp, [x for x in map(self.expr, arr.expression()) if x is not None])
+        tok = ctx.getChild(0).getText() if ctx.getChildCount() else ""
+        if tok == "true" or tok == "false":
+            return Literal(sp, "bool", tok == "true", tok)
+        if tok == "null":
+            return Literal(sp, "null", None, tok)
+        if tok.startswith('"'):
+            return Literal(sp, "string", tok[1:-1], tok)
+        return Literal(sp, "int", int(tok) if tok.isdigit() else 0, tok)
+
+    def lhs(self, ctx) -> Optional[Node]:
+        if ctx is None:
+            return None
+        atom = ctx.primaryAtom()
+        if atom is None:
+            return None
+        t = type(atom)
+        if t is P.IdentifierExprContext:
+            node = Name(_span(atom), atom.getText())
+        elif t is P.ThisExprContext:
+            node = This(_span(atom))
+        elif t is P.NewExprContext:
+            node = New(_span(atom), _text(atom.Identifier()), self.arguments(atom.arguments()))
+        else:
+            return None
+        line, col = node.line, node.col
+        for op in ctx.suffixOp():
+            _, _, el, ec = _span(op)
+            t = type(op)
+            if t is P.CallExprContext:
+                node = Call((line, col, el, ec), node, self.arguments(op.arguments()))
+            elif t is P.IndexExprContext:
+                node = Index((line, col, el, ec), node, self.expr(op.expression()))
+            elif t is P.PropertyAccessExprContext:
+                node = Prop((line, col, el, ec), node, _text(op.Identifier()))
+        return node
+
+    def arguments(self, ctx) -> List[Node]:
+        if ctx is None:
+            return []
+        return [x for x in map(self.expr, ctx.expression()) if x is not None]
+
+
+_LOWERING: Optional[_Lowering] = None
+
+
+def lower(tree) -> Optional[Program]:
+    """ProgramContext -> Program (un AST ya bajado se devuelve tal cual)."""
+    global _LOWERING
+    if tree is None or isinstance(tree, Node):
+        return tree
+    if _LOWERING is None:
+        _LOWERING = _Lowering()
+    return _LOWERING.program(tree)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+bench_cfg.py
+Construcción del CFG (program/cfg.py) sobre UNA función con decenas de miles
+de instrucciones: ifs y ciclos anidados, como los emite el generador. Se
+mide también la mitad de la función para ver que el costo crece lineal.
+
+    python test/bench_cfg.py [repeticiones] [grupos]
+"""
+
+import sys
+import os
+import time
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from program.cfg import CFG
+from program.ir import Temp
+
+
+def _big_function(n):
+    """'n' grupos if/else + while con un if adentro (~15 quads cada uno)."""
+    t1, t2 = Temp("t1"), Temp("t2")
+    q = [("BeginFunc", "big", 2), ("LoadParam", "a", 0), ("LoadParam", "b", 1), ("Assign", "s", 0)]
+    for i in range(n):
+        l_else, l_end, l_loop, l_exit, l_skip = ("L%d_%d" % (k, i) for k in range(5))
+        q += [("Lt", t1, "s", i), ("IfZ", t1, l_else), ("Add", "s", "s", "a"), ("Goto", l_end),
+              ("Label", l_else), ("Sub", "s", "s", 1), ("Label", l_end),
+              ("Label", l_loop), ("Gt", t2, "s", "b"), ("IfZ", t2, l_exit),
+              ("Mod", t1, "s", 2), ("IfZ", t1, l_skip), ("Sub", "s", "s", 3),
+              ("Label", l_skip), ("Goto", l_loop), ("Label", l_exit)]
+    q.append(("Return", "s"))
+    return q
+
+
+def _median_ms(quads, reps):
+    times = []
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        CFG(quads)
+        times.append((time.perf_counter() - t0) * 1000)
+    times.sort()
+    return times[len(times) // 2]
+
+
+def main():
+    reps = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 3000
+    half, full = _big_function(n // 2), _big_function(n)
+    cfg = CFG(full)
+    t_half, t_full = _median_ms(half, reps), _median_ms(full, reps)
+    print(f"{len(full)} quads, {len(cfg)} bloques ({len(cfg.rpo)} alcanzables): "
+          f"mediana {t_full:.0f} ms; con la mitad {t_half:.0f} ms (x{t_full / t_half:.2f})")
+
+
+if __name__ == "__main__":
+    main()
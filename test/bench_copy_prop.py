@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+bench_copy_prop.py
+Propagación de copias (program/copy_prop.py) sobre UNA función grande
+generada: ~50k líneas de TAC con asignaciones, condiciones y ciclos. Se
+mide el pase solo, sobre los quads crudos del generador, y la mitad del
+programa para ver que el tiempo crece linealmente. El peephole anterior
+hacía un re.sub por línea y por temporal.
+
+    python test/bench_copy_prop.py [repeticiones] [sentencias]
+"""
+
+import sys
+import os
+import time
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from program.Driver import compile_session
+from program.TACGeneratorVisitor import TACGeneratorVisitor
+from program.copy_prop import copy_propagate
+
+
+def _big_function(n):
+    """Una sola función con 'n' grupos de sentencias."""
+    out = ["function f(a: integer, b: integer): integer {",
+           "  let s: integer = 0;",
+           '  let m: string = "";']
+    for i in range(n):
+        out.append(f"  let x{i}: integer = a * {i} + b;")
+        out.append(f"  if (x{i} > s && b != {i}) {{ s = s + x{i}; }} else {{ s = s - 1; }}")
+        out.append(f'  while (s > {i}) {{ s = s - 2; m = "v{i}"; }}')
+    out.append("  return s;")
+    out.append("}")
+    out.append("print(f(3, 4));")
+    return "\n".join(out) + "\n"
+
+
+def _raw_code(n):
+    s = compile_session(_big_function(n))
+    assert s.tac_ok, s.errors[:3]
+    tac = TACGeneratorVisitor()
+    tac.visit(s.ast)
+    return tac.code
+
+
+def _median_ms(code, reps):
+    times = []
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        copy_propagate(code)
+        times.append((time.perf_counter() - t0) * 1000)
+    times.sort()
+    return times[len(times) // 2]
+
+
+def main():
+    reps = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 1700
+    half, full = _raw_code(n // 2), _raw_code(n)
+    out = copy_propagate(full)
+    t_half, t_full = _median_ms(half, reps), _median_ms(full, reps)
+    print(f"{len(full)} quads en una función ({len(out)} después del pase): "
+          f"mediana {t_full:.0f} ms; con la mitad ({len(half)} quads) {t_half:.0f} ms "
+          f"(x{t_full / t_half:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+bench_ir.py
+TAC -> MIPS sobre un programa grande. El generador entrega quads en memoria
+(program/ir.py) y el emisor los consume directo; antes el TAC se imprimía,
+se reescribía con expresiones regulares y se volvía a parsear línea por
+línea. Se mide la etapa IR + ASM de compile_session (timings ir_ms/asm_ms)
+y, como referencia, el camino de texto que queda para los .cgt.
+
+    python test/bench_ir.py [repeticiones] [funciones]
+"""
+
+import sys
+import os
+import time
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from program.Driver import compile_session, _tac_to_asm
+
+
+def _big_program(n):
+    """'n' funciones con aritmética, condiciones, ciclos y llamadas."""
+    out = []
+    for i in range(n):
+        out.append(f"function f{i}(a: integer, b: integer): integer {{")
+        out.append("  let s: integer = 0;")
+        out.append("  let k: integer = 0;")
+        out.append("  while (k < a) {")
+        out.append("    if (k % 2 == 0 && b > 1) { s = s + k * b - 1; } else { s = s - -1; }")
+        out.append("    k = k + 1;")
+        out.append("  }")
+        out.append(f"  return s + {i};")
+        out.append("}")
+    for i in range(n):
+        out.append(f"print(f{i}({i}, 3));")
+    return "\n".join(out) + "\n"
+
+
+def main():
+    reps = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+    src = _big_program(n)
+    quads_ms, text_ms = [], []
+    for _ in range(reps):
+        s = compile_session(src)
+        assert s.tac_ok, s.errors[:3]
+        quads_ms.append(s.timings["ir_ms"] + s.timings["asm_ms"])
+        t0 = time.perf_counter()
+        assert _tac_to_asm(s.ir) == s.asm
+        text_ms.append((time.perf_counter() - t0) * 1000)
+    quads_ms.sort()
+    text_ms.sort()
+    print(f"{n} funciones, {s.ir.count(chr(10)) + 1} líneas de TAC: "
+          f"IR + ASM (quads) mediana {quads_ms[len(quads_ms) // 2]} ms; "
+          f"solo parsear el texto y emitir {text_ms[len(text_ms) // 2]:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
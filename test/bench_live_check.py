@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+bench_live_check.py
+Latencia de los diagnósticos en vivo del IDE (IncrementalFrontEnd.check)
+sobre un archivo sintético de ~2000 líneas, editando una sola función.
+
+    python test/bench_live_check.py [ediciones] [funciones]
+
+Objetivo: < 50 ms por chequeo tras una edición, en un núcleo.
+"""
+
+import sys
+import os
+import time
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from program.Driver import _ensure_dfa_cache, check_syntax
+from program.incremental import IncrementalFrontEnd
+
+
+def _source(n_funcs):
+    funcs = []
+    for i in range(n_funcs):
+        body = "\n".join(f"    let v{j}: integer = a * {j} + {i};" for j in range(16))
+        funcs.append(f"function f{i}(a: integer): integer {{\n{body}\n"
+                     f"    if (a > {i}) {{ return v1; }}\n    return a;\n}}")
+    return "\n".join(funcs) + "\nprint(f1(2));\n"
+
+
+def main(argv):
+    edits = int(argv[1]) if len(argv) > 1 else 20
+    n_funcs = int(argv[2]) if len(argv) > 2 else 100
+    src = _source(n_funcs)
+    lines = src.count("\n") + 1
+
+    _ensure_dfa_cache()
+    inc = IncrementalFrontEnd()
+    t0 = time.perf_counter()
+    inc.check(src)
+    cold = time.perf_counter() - t0
+
+    times = []
+    for k in range(edits):
+        edited = src.replace(f"let v3: integer = a * 3 + {n_funcs // 2};",
+                             f"let v3: integer = a * 3 + {k};")
+        t0 = time.perf_counter()
+        inc.check(edited)
+        times.append(time.perf_counter() - t0)
+    times.sort()
+
+    t0 = time.perf_counter()
+    check_syntax(src)
+    whole = time.perf_counter() - t0
+
+    print(f"{lines} líneas, {n_funcs} funciones, {edits} ediciones")
+    print(f"  primer chequeo (todo)      {cold * 1000:8.1f} ms")
+    print(f"  check_syntax del archivo   {whole * 1000:8.1f} ms")
+    print(f"  tras editar: mediana      {times[len(times) // 2] * 1000:8.1f} ms   "
+          f"p90 {times[int(len(times) * 0.9)] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+bench_rd_parser.py
+Throughput del parser escrito a mano frente al generado por ANTLR.
+
+    python test/bench_rd_parser.py [repeticiones]
+
+ANTLR se mide con el DFA ya caliente (una pasada previa) para no contar el
+arranque en frío; ambos front ends producen el mismo árbol de contextos.
+"""
+
+import sys
+import os
+import glob
+import time
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from antlr4 import InputStream, CommonTokenStream
+
+from scripts.CompiscriptLexer import CompiscriptLexer
+from program.Driver import _parse_program, _ensure_dfa_cache, PARSE_MODE_TWO_STAGE
+from program.rd_parser import parse, tokenize
+
+
+def _antlr(src):
+    lexer = CompiscriptLexer(InputStream(src))
+    return _parse_program(CommonTokenStream(lexer), PARSE_MODE_TWO_STAGE)[1]
+
+
+def _bench(fn, sources, reps):
+    for src in sources:
+        fn(src)
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        for src in sources:
+            fn(src)
+    return (time.perf_counter() - t0) / reps
+
+
+def main(argv):
+    reps = int(argv[1]) if len(argv) > 1 else 5
+    files = sorted(glob.glob(os.path.join(ROOT, "archivos_test", "**", "*.cps"), recursive=True)
+                   + glob.glob(os.path.join(ROOT, "program", "tests", "*.cps"))
+                   + [os.path.join(ROOT, "program.cps")])
+    sources = []
+    for path in files:
+        with open(path, encoding="utf-8") as f:
+            sources.append(f.read())
+    lines = sum(s.count("\n") + 1 for s in sources)
+    tokens = sum(len(tokenize(s)) for s in sources)
+
+    _ensure_dfa_cache()
+    t_antlr = _bench(_antlr, sources, reps)
+    t_rd = _bench(parse, sources, reps)
+
+    print(f"Corpus: {len(sources)} archivos, {lines} líneas, {tokens} tokens ({reps} repeticiones)")
+    for name, t in (("ANTLR (sll-ll)", t_antlr), ("Descenso recursivo", t_rd)):
+        print(f"  {name:<20} {t * 1000:8.1f} ms/corpus  {lines / t:10.0f} líneas/s  {tokens / t:10.0f} tokens/s")
+    print(f"  Aceleración: x{t_antlr / t_rd:.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
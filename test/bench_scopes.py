@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+bench_scopes.py
+Tabla encadenada (SymbolTable: una tabla por bloque, lookup sube por los
+padres) frente a la plana de program/symbol_table.py (ScopedSymbolTable:
+nombre -> pila de bindings) en bloques muy anidados con muchos locales.
+
+    python test/bench_scopes.py [profundidad] [locales] [repeticiones]
+
+En cada nivel se declaran 'locales' variables y se resuelven las propias,
+las del nivel más externo y una global (lo típico: parámetros y globales
+usados dentro de bloques profundos); después se cierran todos los scopes.
+"""
+
+import sys
+import os
+import time
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from program.symbol_table import SymbolTable, ScopedSymbolTable, INT
+
+
+def _chained(depth, n_locals, names):
+    scope = SymbolTable()
+    scope.insert("g", INT)
+    found = 0
+    for d in range(depth):
+        scope = SymbolTable(parent=scope)
+        for name in names[d]:
+            scope.insert(name, INT)
+        for name in names[d] + names[0]:
+            found += scope.lookup(name) is not None
+        found += scope.lookup("g") is not None
+    for _ in range(depth):
+        scope = scope.parent
+    return found
+
+
+def _flat(depth, n_locals, names):
+    table = ScopedSymbolTable()
+    table.insert("g", INT)
+    found = 0
+    for d in range(depth):
+        table.enter_scope()
+        for name in names[d]:
+            table.insert(name, INT)
+        for name in names[d] + names[0]:
+            found += table.lookup(name) is not None
+        found += table.lookup("g") is not None
+    for _ in range(depth):
+        table.exit_scope()
+    return found
+
+
+def _bench(fn, args, reps):
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        result = fn(*args)
+    return (time.perf_counter() - t0) / reps, result
+
+
+def main(argv):
+    depth = int(argv[1]) if len(argv) > 1 else 200
+    n_locals = int(argv[2]) if len(argv) > 2 else 20
+    reps = int(argv[3]) if len(argv) > 3 else 5
+    # la mitad de los nombres se repiten en todos los niveles (sombreado)
+    names = [[f"v{i}" if i % 2 else f"v{i}_{d}" for i in range(n_locals)] for d in range(depth)]
+    args = (depth, n_locals, names)
+
+    t_chain, r_chain = _bench(_chained, args, reps)
+    t_flat, r_flat = _bench(_flat, args, reps)
+    assert r_chain == r_flat
+    print(f"Profundidad {depth}, {n_locals} locales por nivel, {r_flat} búsquedas ({reps} repeticiones)")
+    print(f"  SymbolTable (cadena)     {t_chain * 1000:8.1f} ms")
+    print(f"  ScopedSymbolTable        {t_flat * 1000:8.1f} ms   x{t_chain / t_flat:.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
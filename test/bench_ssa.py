@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+bench_ssa.py
+Entrada y salida de SSA (program/ssa.py) sobre UNA función con decenas de
+miles de instrucciones: ifs y ciclos anidados que reasignan las mismas
+variables, como los emite el generador. Se mide también la mitad de la
+función para ver que el costo crece lineal.
+
+    python test/bench_ssa.py [repeticiones] [grupos]
+"""
+
+import sys
+import os
+import time
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from program.cfg import CFG
+from program.ssa import from_ssa, to_ssa
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_cfg import _big_function
+
+
+def _round_trip_ms(quads, reps):
+    times = []
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        out = from_ssa(to_ssa(CFG(quads)))
+        times.append((time.perf_counter() - t0) * 1000)
+    assert out == quads
+    times.sort()
+    return times[len(times) // 2]
+
+
+def main():
+    reps = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 3000
+    half, full = _big_function(n // 2), _big_function(n)
+    fn = to_ssa(CFG(full))
+    phis = sum(q[0] == "Phi" for q in fn.quads())
+    t_half, t_full = _round_trip_ms(half, reps), _round_trip_ms(full, reps)
+    print(f"{len(full)} quads, {phis} Phi: ida y vuelta mediana {t_full:.0f} ms; "
+          f"con la mitad {t_half:.0f} ms (x{t_full / t_half:.2f})")
+
+
+if __name__ == "__main__":
+    main()
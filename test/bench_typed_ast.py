@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+bench_typed_ast.py
+Costo de recorrer el parse tree pidiendo getText() en cada nodo (lo que
+hacían el semántico y el TAC) frente a bajarlo una vez al AST tipado y
+recorrer ese.
+
+    python test/bench_typed_ast.py [repeticiones] [profundidad]
+
+Además del corpus se mide un programa sintético con expresiones y bloques
+anidados 'profundidad' niveles, donde getText() por nodo es cuadrático.
+"""
+
+import sys
+import os
+import glob
+import time
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from antlr4 import InputStream, CommonTokenStream, ParserRuleContext
+
+from scripts.CompiscriptLexer import CompiscriptLexer
+from program.Driver import _parse_program, _ensure_dfa_cache, PARSE_MODE_TWO_STAGE
+from program.typed_ast import lower, walk
+from program.semantic_analyzer import SemanticAnalyzer
+from program.TACGeneratorVisitor import TACGeneratorVisitor
+
+
+def _antlr(src):
+    lexer = CompiscriptLexer(InputStream(src))
+    return _parse_program(CommonTokenStream(lexer), PARSE_MODE_TWO_STAGE)[1]
+
+
+def _nested(depth):
+    """Bloques if anidados con una expresión de 'depth' paréntesis en el fondo."""
+    expr = "x"
+    for i in range(depth):
+        expr = f"({expr} + {i})"
+    body = f"x = {expr};"
+    for i in range(depth):
+        body = f"if (x < {i}) {{ {body} }}"
+    return f"function f(x: integer): integer {{ {body} return x; }}\nprint(f(1));\n"
+
+
+def _gettext_walk(tree):
+    stack = [tree]
+    n = 0
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ParserRuleContext):
+            node.getText()
+            n += 1
+            stack.extend(node.getChildren())
+    return n
+
+
+def _ast_walk(tree):
+    return sum(1 for _ in walk(lower(tree)))
+
+
+def _passes(tree):
+    ast = lower(tree)
+    SemanticAnalyzer().visit(ast)
+    TACGeneratorVisitor().visit(ast)
+
+
+def _bench(fn, trees, reps):
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        for tree in trees:
+            fn(tree)
+    return (time.perf_counter() - t0) / reps
+
+
+def main(argv):
+    reps = int(argv[1]) if len(argv) > 1 else 5
+    depth = int(argv[2]) if len(argv) > 2 else 50
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 20 * depth + 1000))
+
+    files = sorted(glob.glob(os.path.join(ROOT, "archivos_test", "**", "*.cps"), recursive=True)
+                   + [os.path.join(ROOT, "program.cps")])
+    corpus = []
+    for path in files:
+        with open(path, encoding="utf-8") as f:
+            corpus.append(f.read())
+
+    _ensure_dfa_cache()
+    for name, sources in (("Corpus", corpus), (f"Anidado x{depth}", [_nested(depth)])):
+        trees = [_antlr(s) for s in sources]
+        rules = sum(_gettext_walk(t) for t in trees)
+        nodes = sum(_ast_walk(t) for t in trees)
+        t_text = _bench(_gettext_walk, trees, reps)
+        t_ast = _bench(_ast_walk, trees, reps)
+        t_passes = _bench(_passes, trees, reps)
+        print(f"{name}: {rules} contextos del parse tree -> {nodes} nodos del AST ({reps} repeticiones)")
+        print(f"  getText() por nodo      {t_text * 1000:8.1f} ms")
+        print(f"  bajada + recorrido AST  {t_ast * 1000:8.1f} ms   x{t_text / t_ast:.1f}")
+        print(f"  semántico + TAC (AST)   {t_passes * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
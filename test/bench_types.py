@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+bench_types.py
+Chequeo semántico de código con muchos arrays anidados. Con tipos
+internados cada comparación de tipos es una comparación de identidad; antes
+ArrayType.__eq__ bajaba recursivamente por los elementos y cada anotación
+creaba objetos nuevos.
+
+    python test/bench_types.py [repeticiones] [declaraciones] [dimensiones]
+"""
+
+import sys
+import os
+import time
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from program.Driver import compile_session
+from program.semantic_analyzer import SemanticAnalyzer
+
+
+def _array_heavy(n, dims):
+    """'n' funciones que reciben, asignan, comparan y pasan arrays de 'dims' dimensiones."""
+    t = "integer" + "[]" * dims
+    lit = "[" * dims + "1" + "]" * dims
+    out = []
+    for i in range(n):
+        out.append(f"function f{i}(a: {t}, b: {t}): {t} {{")
+        out.append(f"  let c: {t} = {lit};")
+        out.append(f"  let d: {t}[] = [a, b, c];")
+        for j in range(8):
+            out.append(f"  let e{j}: {t} = a;")
+            out.append(f"  if (a == b) {{ b = e{j}; }}")
+        out.append(f"  return f{i}(c, a);")
+        out.append("}")
+    return "\n".join(out) + "\n"
+
+
+def main():
+    reps = int(sys.argv[1]) if len(sys.argv) > 1 else 15
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+    dims = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    src = _array_heavy(n, dims)
+    asts = compile_session(src).asts
+    times = []
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        sa = SemanticAnalyzer()
+        for ast, offset in asts:
+            sa.line_offset = offset
+            sa.visit(ast)
+        times.append(time.perf_counter() - t0)
+        assert not sa.errors, sa.errors[:3]
+    times.sort()
+    print(f"{n} funciones, arrays de {dims} dimensiones: semántico "
+          f"mediana {times[len(times) // 2] * 1000:.1f} ms, mínimo {times[0] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+test_batch.py
+Pruebas del compilador por lotes en paralelo (program/batch.py)
+"""
+
+import sys
+import os
+import io
+import contextlib
+import json
+import shutil
+import tempfile
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from program.batch import collect_sources, main, run_batch
+from program.Driver import parse_code_from_string
+
+FILES = ["archivos_test/ejemplo_propio/ejemplo1.cps",
+         "archivos_test/ejemplo_propio/ejemplo2.cps",
+         "archivos_test/ejemplo_extra/arrays_exitoso.cps"]
+
+
+def test_batch_writes_artifacts_and_summary():
+    """Cada archivo deja .tac/.s iguales a compilarlo solo y una línea JSON"""
+    with tempfile.TemporaryDirectory() as d:
+        for f in FILES:
+            shutil.copy(os.path.join(ROOT, f), d)
+        with open(os.path.join(d, "roto.cps"), "w") as f:
+            f.write("let x: integer = ;\n")
+
+        paths = collect_sources([d])
+        assert len(paths) == 4
+        out = io.StringIO()
+        total = run_batch(paths, jobs=2, out=out)
+        lines = [json.loads(l) for l in out.getvalue().splitlines()]
+        assert [r["file"] for r in lines[:-1]] == [str(p) for p in paths]
+        assert lines[-1] == total and total["failed"] == 1 and total["ok"] == 3
+
+        for rec, path in zip(lines, paths):
+            if path.name == "roto.cps":
+                assert not rec["ok"] and rec["errors"][0]["line"] == 1
+                assert not path.with_suffix(".s").exists()
+                continue
+            assert rec["ok"] and "parse_ms" in rec["timings"]
+            ref = parse_code_from_string(path.read_text(encoding="utf-8"))
+            assert path.with_suffix(".tac").read_text() == ref["ir"] + "\n"
+            assert path.with_suffix(".s").read_text() == ref["asm"] + "\n"
+    print("✅ Artefactos y resumen JSON-lines")
+
+
+def test_bad_jobs_prints_usage():
+    """-j sin valor, no entero o menor que 1: uso y código 2, sin traceback"""
+    path = os.path.join(ROOT, FILES[0])
+    for argv in (["-j"], ["-j", "x", path], ["-jx", path], ["-j0", path],
+                 ["--jobs=-1", path], ["--jobs=", path]):
+        err = io.StringIO()
+        with contextlib.redirect_stderr(err):
+            assert main(["batch"] + argv) == 2, argv
+        assert err.getvalue().startswith("uso: python -m program.batch"), argv
+    print("✅ -j inválido muestra el uso")
+
+
+if __name__ == "__main__":
+    test_batch_writes_artifacts_and_summary()
+    test_bad_jobs_prints_usage()
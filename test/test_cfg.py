@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+test_cfg.py
+Bloques básicos y CFG sobre el IR (program/cfg.py): partición en etiquetas
+y saltos, predecesores/sucesores y orden posorden inverso.
+"""
+
+import sys
+import os
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from program.Driver import compile_session
+from program.cfg import CFG, function_cfgs
+from program.ir import parse_tac
+
+LOOP = """BeginFunc f 1
+i = 0
+L1:
+t1 = i < n
+if t1 == 0 goto L2
+i = i + 1
+goto L1
+L2:
+return i"""
+
+
+def _names(blocks):
+    return [b.label or "B%d" % b.index for b in blocks]
+
+
+def test_blocks_and_edges():
+    """Un bloque por líder; aristas de goto, if y caída"""
+    cfg = CFG(parse_tac(LOOP))
+    assert [len(b.quads) for b in cfg] == [2, 3, 2, 2]
+    entry, head, body, exit_ = cfg.blocks
+    assert head.label == "L1" and exit_.label == "L2" and cfg.entry is entry
+    assert _names(entry.succs) == ["L1"]
+    assert _names(head.succs) == ["L2", "B2"]
+    assert _names(body.succs) == ["L1"] and exit_.succs == []
+    assert _names(head.preds) == ["B0", "B2"] and _names(exit_.preds) == ["L1"]
+    assert cfg.quads() == parse_tac(LOOP)
+    print("✅ Bloques y aristas")
+
+
+def test_reverse_postorder():
+    """RPO: cada bloque después de sus predecesores (salvo back edges); inalcanzables fuera"""
+    text = "BeginFunc g 0\nif c == 0 goto L1\nx = 1\ngoto L2\nL1:\nx = 2\nL2:\nreturn x\nx = 3"
+    cfg = CFG(parse_tac(text))
+    assert _names(cfg.rpo)[0] == "B0" and _names(cfg.rpo)[-1] == "L2"
+    assert cfg.blocks[-1].rpo is None and len(cfg.rpo) == len(cfg) - 1
+    for b in cfg.rpo:
+        assert all(p.rpo is None or p.rpo < b.rpo for p in b.preds)
+    loop = CFG(parse_tac(LOOP))
+    assert [b.rpo for b in loop.blocks] == [0, 1, 2, 3]
+    print("✅ Orden posorden inverso")
+
+
+def test_per_function_and_large():
+    """Un CFG por función del programa; miles de bloques sin recursión"""
+    s = compile_session("function f(a: integer): integer { if (a > 0) { return 1; } return 0; }\n"
+                        "print(f(2));\n")
+    cfgs = function_cfgs(s.quads)
+    assert [c.name for c in cfgs if c.name] == ["f", "main"]
+    assert sum(len(c.quads()) for c in cfgs) == len(s.quads)
+    n = 20000
+    chain = ["BeginFunc big 0"] + ["L%d:\nif x == 0 goto L%d" % (i, i + 1) for i in range(n)]
+    cfg = CFG(parse_tac("\n".join(chain) + "\nL%d:\nreturn" % n))
+    assert len(cfg.rpo) == len(cfg) == n + 2
+    print("✅ CFG por función y funciones grandes")
+
+
+if __name__ == "__main__":
+    test_blocks_and_edges()
+    test_reverse_postorder()
+    test_per_function_and_large()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+test_compile_cache.py
+Pruebas de la caché de compilación direccionada por contenido
+(program/compile_cache.py)
+"""
+
+import sys
+import os
+import tempfile
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import program.Driver as Driver
+import program.compile_cache as compile_cache
+from program.Driver import parse_code_from_string, PARSE_MODE_LL
+from program.compile_cache import CompileCache, cache_key
+
+SRC = """
+function doble(n: integer): integer { return n * 2; }
+let x: integer = doble(21);
+print(x);
+"""
+
+
+def test_hit_skips_compilation():
+    """El segundo compile sale de la caché con la misma salida y sin parsear"""
+    with tempfile.TemporaryDirectory() as d:
+        cache = CompileCache(d)
+        first = parse_code_from_string(SRC, cache=cache)
+        assert first["timings"]["cache"] == "miss"
+
+        original = Driver._parse_source
+        Driver._parse_source = None  # un acierto no debe llegar al parser
+        try:
+            second = parse_code_from_string(SRC, cache=cache)
+        finally:
+            Driver._parse_source = original
+        assert second["timings"]["cache"] == "hit"
+        for k in ("ir", "asm", "errors", "symbols"):
+            assert second[k] == first[k], k
+        # el árbol se reconstruye solo si se pide
+        assert str(second["parse_tree"]) == str(first["parse_tree"])
+    print("✅ Acierto de caché sin recompilar")
+
+
+def test_key_depends_on_source_and_options():
+    """Cambiar el código o las opciones da otra entrada"""
+    k = cache_key(SRC, {"parse_mode": "sll-ll", "frontend": "antlr"})
+    assert k != cache_key(SRC + " ", {"parse_mode": "sll-ll", "frontend": "antlr"})
+    assert k != cache_key(SRC, {"parse_mode": "ll", "frontend": "antlr"})
+    with tempfile.TemporaryDirectory() as d:
+        cache = CompileCache(d)
+        parse_code_from_string(SRC, cache=cache)
+        out = parse_code_from_string(SRC, parse_mode=PARSE_MODE_LL, cache=cache)
+        assert out["timings"]["cache"] == "miss"
+    print("✅ Clave por contenido y opciones")
+
+
+def test_lru_eviction_and_corrupt_entries():
+    """Al pasar el límite se borra la entrada usada hace más tiempo"""
+    with tempfile.TemporaryDirectory() as d:
+        cache = CompileCache(d, max_bytes=10 ** 9)
+        for i, k in enumerate(("a", "b", "c")):
+            cache.put(k, {"ir": "x" * 100})
+            os.utime(os.path.join(d, k + ".json"), (1000 + i, 1000 + i))
+        os.utime(os.path.join(d, "a.json"), (2000, 2000))  # 'a' usada hace poco
+        size = os.path.getsize(os.path.join(d, "a.json"))
+        cache.max_bytes = 2 * size
+        cache.evict()
+        assert cache.get("b") is None
+        assert cache.get("a") is not None and cache.get("c") is not None
+
+        with open(os.path.join(d, "c.json"), "w") as f:
+            f.write("{roto")
+        assert cache.get("c") is None
+        assert not os.path.exists(os.path.join(d, "c.json"))
+    print("✅ Expulsión LRU y entradas corruptas")
+
+
+def test_put_below_limit_does_not_sweep():
+    """Bajo el límite put no recorre el directorio; al pasarse sí, y expulsa"""
+    with tempfile.TemporaryDirectory() as d:
+        cache = CompileCache(d, max_bytes=10 ** 9)
+        sweeps = []
+        original = compile_cache.os.scandir
+
+        def scandir(path):
+            sweeps.append(path)
+            return original(path)
+
+        compile_cache.os.scandir = scandir
+        try:
+            for i in range(20):
+                cache.put(f"k{i}", {"ir": "x" * 100})
+            assert len(sweeps) == 1, sweeps        # solo la primera vez
+            size = os.path.getsize(os.path.join(d, "k0.json"))
+            assert cache.stats()["bytes"] == 20 * size
+            sweeps.clear()
+
+            cache.max_bytes = 21 * size
+            cache.put("k20", {"ir": "x" * 100})    # justo en el límite
+            assert not sweeps
+            cache.put("k21", {"ir": "x" * 100})    # se pasa: barrido y expulsión
+            assert len(sweeps) == 1
+        finally:
+            compile_cache.os.scandir = original
+        assert cache.stats()["bytes"] <= cache.max_bytes and cache.stats()["entries"] == 21
+    print("✅ put sin barrer el directorio bajo el límite")
+
+
+if __name__ == "__main__":
+    test_hit_skips_compilation()
+    test_key_depends_on_source_and_options()
+    test_lru_eviction_and_corrupt_entries()
+    test_put_below_limit_does_not_sweep()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+test_compile_server.py
+Pruebas del servidor de compilación residente y su cliente
+(program/compile_server.py, program/compile_client.py)
+"""
+
+import sys
+import os
+import tempfile
+import threading
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from program.compile_server import CompileServer
+from program.compile_client import ServerUnavailable, compile_source, request
+from program.Driver import parse_code_from_string
+
+SRC = """
+function doble(n: integer): integer { return n * 2; }
+print(doble(21));
+"""
+
+
+def test_remote_compile_matches_local():
+    """El servidor responde lo mismo que parse_code_from_string y sigue vivo tras errores"""
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "c.sock")
+        server = CompileServer(path)
+        th = threading.Thread(target=server.serve_forever, daemon=True)
+        th.start()
+        try:
+            assert request({"op": "ping"}, path)["pid"] == os.getpid()
+            local = parse_code_from_string(SRC)
+            remote = compile_source(SRC, path, tree=True)
+            for k in ("ir", "asm", "errors", "symbols"):
+                assert remote[k] == local[k], k
+            assert remote["parse_tree"] == str(local["parse_tree"])
+
+            bad = request({"op": "compile"}, path)
+            assert not bad["ok"] and "source" in bad["error"]
+            assert compile_source("let x: integer = ;", path)["errors"]
+        finally:
+            assert request({"op": "shutdown"}, path)["ok"]
+            th.join(5)
+            server.server_close()
+        assert not os.path.exists(path)
+        try:
+            request({"op": "ping"}, path)
+            assert False, "el servidor debía estar apagado"
+        except ServerUnavailable:
+            pass
+    print("✅ Compilación remota igual a la local")
+
+
+if __name__ == "__main__":
+    test_remote_compile_matches_local()
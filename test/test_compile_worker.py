@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+test_compile_worker.py
+Worker de compilación del IDE (program/compile_worker.py): etapas en orden,
+un pedido nuevo cancela al viejo y los resultados viejos no se entregan.
+"""
+
+import sys
+import os
+import threading
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from program.compile_worker import CompileWorker
+from program.incremental import IncrementalFrontEnd
+from program.session import STAGES
+
+SRC = """
+function sumar(a: integer, b: integer): integer {
+    return a + b;
+}
+let x: integer = sumar(1, 2);
+print(x);
+"""
+
+
+def test_stages_then_done():
+    """Cada etapa llega en orden y después la sesión completa"""
+    inc = IncrementalFrontEnd()
+    events = []
+    worker = CompileWorker(lambda src, progress: inc.compile_session(src, progress=progress))
+    worker.submit(SRC, on_stage=lambda st, s: events.append(st),
+                  on_done=lambda s: events.append(("done", bool(s.asm))))
+    assert worker.wait_idle(30)
+    worker.close()
+    assert events == list(STAGES) + [("done", True)], events
+    print("✅ Etapas y resultado del worker")
+
+
+def test_newer_request_supersedes():
+    """El pedido en curso se corta en la próxima etapa y solo se entrega el nuevo"""
+    inc = IncrementalFrontEnd()
+    started, release = threading.Event(), threading.Event()
+    delivered = []
+
+    def compile_fn(src, progress):
+        if src == "viejo":
+            started.set()
+            release.wait(10)
+            src = SRC
+        return inc.compile_session(src, progress=progress)
+
+    worker = CompileWorker(compile_fn)
+    worker.submit("viejo", on_stage=lambda st, s: delivered.append(("viejo", st)),
+                  on_done=lambda s: delivered.append(("viejo", "done")))
+    assert started.wait(10)
+    worker.submit(SRC + "print(x);\n", on_done=lambda s: delivered.append(("nuevo", s.ir.count("printInteger"))))
+    release.set()
+    assert worker.wait_idle(30)
+    worker.close()
+    assert delivered == [("nuevo", 2)], delivered
+    print("✅ Un pedido nuevo cancela al viejo")
+
+
+if __name__ == "__main__":
+    test_stages_then_done()
+    test_newer_request_supersedes()
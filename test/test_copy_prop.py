@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+test_copy_prop.py
+Propagación de copias sobre el IR (program/copy_prop.py): reemplaza el
+peephole textual del generador, respeta el reciclado de temporales y no
+borra una copia que todavía se lee después de un salto.
+"""
+
+import sys
+import os
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from program.copy_prop import copy_propagate
+from program.ir import Temp, parse_tac, format_ir
+
+
+def _run(text):
+    return format_ir(copy_propagate(parse_tac(text))).splitlines()
+
+
+def test_copies_fold_into_uses():
+    """'t1 = 5; x = t1' queda 'x = 5' y la copia muerta desaparece"""
+    assert _run("t1 = 5\nx = t1\nt2 = x\nt3 = t2 + 1\ny = t3") == ["x = 5", "t3 = x + 1", "y = t3"]
+    # un operando que tiene que ser nombre no recibe una constante
+    assert _run("t1 = 3\nn = len t1") == ["t1 = 3", "n = len t1"]
+    print("✅ Copias propagadas a sus usos")
+
+
+def test_temp_reuse_is_respected():
+    """t1 redefinido: los usos posteriores ven el valor nuevo"""
+    out = _run("t1 = a\nparam t1\nt1 = b\nparam t1\nt2 = t1\na = 0\nparam t2")
+    assert out == ["param a", "param b", "a = 0", "param b"]
+    # el origen cambia: la copia deja de valer
+    out = _run("t1 = a\na = 7\nparam t1")
+    assert out == ["t1 = a", "a = 7", "param t1"]
+    print("✅ Reciclado de temporales respetado")
+
+
+def test_labels_and_calls_invalidate():
+    """Una etiqueta corta el bloque; una llamada invalida copias de variables"""
+    out = _run("t1 = a\nL1:\nparam t1")
+    assert out == ["t1 = a", "L1:", "param t1"]
+    out = _run("t1 = g\nt2 = 4\ncall f, 0\nparam t1\nparam t2")
+    assert out == ["t1 = g", "call f, 0", "param t1", "param 4"]
+    print("✅ Etiquetas y llamadas invalidan copias")
+
+
+def test_copies_live_across_jumps_are_kept():
+    """Una copia que se lee tras un salto (adelante o ciclo) se conserva"""
+    out = _run("t1 = 1\nif c == 0 goto L2\nt1 = 2\nL2:\nparam t1")
+    assert out[0] == "t1 = 1" and "t1 = 2" in out
+    loop = "t1 = 0\nL1:\nt2 = t1 < 10\nif t2 == 0 goto L2\nt1 = t1 + 1\ngoto L1\nL2:\nreturn"
+    assert _run(loop)[0] == "t1 = 0"
+    # muerta en todos los caminos: se borra aunque haya un ciclo después
+    assert _run("t9 = 3\nx = 1\n" + loop)[:2] == ["x = 1", "t1 = 0"]
+    print("✅ Copias vivas tras saltos conservadas")
+
+
+def test_per_function():
+    """Las copias no cruzan BeginFunc"""
+    q = copy_propagate(parse_tac("BeginFunc f 0\nt1 = a\nBeginFunc g 0\nparam t1"))
+    assert ("Param", Temp("t1")) in q
+    print("✅ Propagación por función")
+
+
+if __name__ == "__main__":
+    test_copies_fold_into_uses()
+    test_temp_reuse_is_respected()
+    test_labels_and_calls_invalidate()
+    test_copies_live_across_jumps_are_kept()
+    test_per_function()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+test_custom_types.py
+Universo de tipos internado (program/custom_types.py): tipos iguales son el
+mismo objeto, sirven como clave de dict y los comparten el semántico, la
+tabla de símbolos y el generador.
+"""
+
+import sys
+import os
+import gc
+import weakref
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from program.custom_types import (
+    IntType, StringType, NullType, VoidType, ArrayType, FunctionType, ClassType,
+    resolve, named_type, type_name
+)
+from program.symbol_table import TYPE, INT, STR
+from program.semantic_analyzer import SemanticAnalyzer
+from program.typed_ast import TypeRef
+from program.TACGeneratorVisitor import TACGeneratorVisitor
+from program.Driver import compile_session
+
+_SPAN = (1, 0, 1, 0)
+
+
+def test_interned():
+    """Mismos componentes -> mismo objeto; igualdad por identidad; hashable"""
+    a = ArrayType(ArrayType(IntType))
+    assert a is ArrayType(ArrayType(IntType)) and a is resolve("integer", 2)
+    assert a is not ArrayType(ArrayType(StringType)) and a != ArrayType(IntType)
+    f = FunctionType(IntType, [a, StringType])
+    assert f is FunctionType(IntType, (a, StringType))
+    assert f is not FunctionType(VoidType, [a, StringType])
+    d = {a: "matriz", f: "fn", IntType: "int"}
+    assert d[resolve("integer", 2)] == "matriz" and d[FunctionType(IntType, [a, StringType])] == "fn"
+    # nombres de fuente y de mensajes
+    assert a.name == "integer[][]" and str(a) == "int[][]"
+    assert f.name == "fn(integer[][], string) -> integer"
+    assert type_name(None) == "None"
+    print("✅ Tipos internados")
+
+
+def test_classes_are_nominal():
+    """Dos clases con el mismo nombre son tipos distintos; sus arrays también"""
+    p1, p2 = ClassType("Persona"), ClassType("Persona")
+    assert p1 != p2 and ArrayType(p1) is not ArrayType(p2)
+    assert resolve("Persona", 1, {"Persona": p1}) is ArrayType(p1)
+    assert resolve("Persona", 0) is None and resolve("Persona", 1).name == "None[]"
+    # el internado no retiene clases de compilaciones viejas
+    c = ClassType("Vieja")
+    c.methods["m"] = FunctionType(ArrayType(c), [c])
+    ref = weakref.ref(c)
+    del c
+    gc.collect()
+    assert ref() is None
+    print("✅ Clases nominales")
+
+
+def test_shared_universe():
+    """symbol_table.TYPE, el semántico y el TAC resuelven al mismo objeto"""
+    assert INT is IntType and STR is StringType
+    assert TYPE("integer") is IntType and TYPE("string[]") is ArrayType(StringType)
+    assert TYPE("fn(integer)->string") is named_type("fn(integer)->string")
+    sa = SemanticAnalyzer()
+    assert sa._resolve_type(TypeRef(_SPAN, "string", 1)) is ArrayType(StringType)
+    assert TACGeneratorVisitor._is_string_type(TypeRef(_SPAN, "string", 0))
+    assert not TACGeneratorVisitor._is_string_type(TypeRef(_SPAN, "string", 1))
+    print("✅ Universo compartido")
+
+
+def test_semantic_uses_identity():
+    """Arrays de arrays, [] vacío y errores con los mismos textos de siempre"""
+    src = """
+let m: integer[][] = [[1, 2], [3]];
+let e: string[] = [];
+let bad: string[] = [1, 2];
+"""
+    s = compile_session(src, symbols=True)
+    msgs = [d.message for d in s.analyzer.errors]
+    assert len(msgs) == 1 and "'int[]'" in msgs[0] and "'string[]'" in msgs[0], msgs
+    types = {sym["name"]: sym["type"] for sym in s.symbols["symbols"]}
+    assert types == {"m": "integer[][]", "e": "string[]", "bad": "string[]"}, types
+    assert ArrayType(NullType).name == "null[]"
+    print("✅ Chequeo por identidad")
+
+
+if __name__ == "__main__":
+    test_interned()
+    test_classes_are_nominal()
+    test_shared_universe()
+    test_semantic_uses_identity()
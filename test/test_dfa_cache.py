@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+test_dfa_cache.py
+Pruebas de la caché en disco del DFA de ANTLR (program/dfa_cache.py)
+"""
+
+import sys
+import os
+import tempfile
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from antlr4.dfa.DFA import DFA
+
+from scripts.CompiscriptLexer import CompiscriptLexer
+from scripts.CompiscriptParser import CompiscriptParser
+from program.Driver import parse_code_from_string
+from program.dfa_cache import save_dfa_cache, load_dfa_cache, dfa_state_count
+
+SRC = """
+class A { let x: integer; function get(): integer { return this.x; } }
+let a: A = new A();
+a.x = 3;
+while (a.x > 0) { a.x = a.x - 1; }
+"""
+
+
+def _reset_dfas():
+    for cls in (CompiscriptLexer, CompiscriptParser):
+        cls.decisionsToDFA = [DFA(ds, i) for i, ds in enumerate(cls.atn.decisionToState)]
+
+
+def test_roundtrip():
+    """Guardar, vaciar y recargar el DFA conserva los estados y el resultado"""
+    expected = parse_code_from_string(SRC, use_dfa_cache=False)
+    warm = dfa_state_count()
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "dfa.pickle")
+        save_dfa_cache(path)
+        _reset_dfas()
+        assert dfa_state_count() == 0
+        assert load_dfa_cache(path)
+        assert dfa_state_count() == warm
+    out = parse_code_from_string(SRC, use_dfa_cache=False)
+    assert out["parse_tree"] == expected["parse_tree"]
+    assert out["ir"] == expected["ir"]
+    print("✅ DFA recargado desde disco")
+
+
+def test_missing_or_corrupt_cache():
+    """Una caché inexistente o corrupta se ignora"""
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "dfa.pickle")
+        assert not load_dfa_cache(path)
+        with open(path, "wb") as f:
+            f.write(b"no es un pickle")
+        assert not load_dfa_cache(path)
+    print("✅ Caché inválida ignorada")
+
+
+if __name__ == "__main__":
+    test_roundtrip()
+    test_missing_or_corrupt_cache()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+test_diagnostics.py
+Diagnósticos estructurados (program/diagnostics.py): la posición viaja
+aparte del texto, el mensaje se arma al mostrarlo y se serializan igual
+por caché, servidor y lotes.
+"""
+
+import sys
+import os
+import json
+import tempfile
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from program.Driver import compile_session, parse_code_from_string
+from program.compile_cache import CompileCache
+from program.diagnostics import Diagnostic, from_json, to_json
+from program.type_check_visitor import TypeCheckVisitor
+from program.typed_ast import TypeRef
+
+INVALIDO = """
+let x: integer = 1;
+let y: integer = ;
+"""
+
+
+def test_syntax_errors_are_structured():
+    """El listener de ANTLR deja código, span y texto; 'messages' se arma con ellos"""
+    out = parse_code_from_string(INVALIDO)
+    d = out["errors"][0]
+    assert isinstance(d, Diagnostic) and d.code == "syntax"
+    assert (d.line, d.col, d.end_line, d.end_col) == (3, 17, 3, 18)
+    assert d["line"] == 3 and d["msg"] == d.message and d["sev"] == "error"
+    assert str(d) in out["messages"]
+    print("✅ Errores sintácticos estructurados")
+
+
+def test_message_is_rendered_lazily():
+    """El semántico guarda código y argumentos; el texto sale al pedirlo"""
+    sa = compile_session("let a: integer = b;", symbols=True).analyzer
+    d = sa.errors[0]
+    assert d.code == "undeclared" and d.args == {"name": "b"} and d._msg is None
+    assert d.message == "'b' no ha sido declarado." and (d.line, d.col) == (1, 17)
+    print("✅ Mensaje armado al mostrarlo")
+
+
+def test_digits_in_message_do_not_move_the_error():
+    """Antes la línea salía de una regex sobre el texto; ahora viene del nodo"""
+    tc = TypeCheckVisitor()
+    tc.add_error("se esperaba linea 99:7 o línea 12, 3", TypeRef((5, 2, 5, 9), "integer", 0))
+    d = tc.errors[0]
+    assert (d.line, d.col, d.end_col) == (5, 2, 9)
+    assert d.message == "se esperaba linea 99:7 o línea 12, 3"
+    print("✅ Dígitos en el mensaje no cambian la posición")
+
+
+def test_json_round_trip_and_cache():
+    """to_json/from_json conservan todo; un acierto de caché da los mismos diagnósticos"""
+    diags = parse_code_from_string(INVALIDO)["errors"]
+    wire = json.loads(json.dumps(to_json(diags)))
+    assert from_json(wire) == diags
+    # tipos u otros objetos en los argumentos salen como texto
+    class T:
+        def __str__(self): return "int[]"
+    d = Diagnostic("index-non-array", 1, 0, type=T())
+    assert d.to_dict()["args"] == {"type": "int[]"}
+    assert Diagnostic.from_dict(json.loads(json.dumps(d.to_dict()))).message == d.message
+    # entradas viejas sin 'code'
+    old = Diagnostic.from_dict({"sev": "error", "line": 2, "col": 1, "msg": "algo"})
+    assert old.code == "internal" and old.message == "algo" and old.line == 2
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = CompileCache(tmp)
+        miss = parse_code_from_string(INVALIDO, cache=cache)
+        hit = parse_code_from_string(INVALIDO, cache=cache)
+        assert hit["timings"]["cache"] == "hit"
+        assert hit["errors"] == miss["errors"] and hit["messages"].split("\n")[1:] == \
+            miss["messages"].split("\n")[1:]
+    print("✅ Ida y vuelta por JSON y caché")
+
+
+if __name__ == "__main__":
+    test_syntax_errors_are_structured()
+    test_message_is_rendered_lazily()
+    test_digits_in_message_do_not_move_the_error()
+    test_json_round_trip_and_cache()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+test_driver.py
+Pruebas de la API principal del Driver (parse_code_from_string)
+"""
+
+import sys
+import os
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from program.Driver import parse_code_from_string, compile_session, PARSE_MODE_LL, PARSE_MODE_TWO_STAGE
+
+VALIDO = """
+function sumar(a: integer, b: integer): integer {
+    return a + b;
+}
+let x: integer = sumar(1, 2);
+if (x > 2) { print(x); }
+"""
+
+INVALIDO = """
+let x: integer = ;
+function f( { }
+"""
+
+
+def test_two_stage_parse_sll_ok():
+    """Un programa válido se resuelve en la pasada SLL"""
+    out = parse_code_from_string(VALIDO, parse_mode=PARSE_MODE_TWO_STAGE)
+    assert out["errors"] == []
+    assert out["timings"]["parse_stage"] == "sll"
+    print("✅ SLL suficiente para programa válido")
+
+
+def test_two_stage_matches_ll():
+    """Ambos modos producen el mismo árbol, errores e IR"""
+    for src in (VALIDO, INVALIDO):
+        a = parse_code_from_string(src, parse_mode=PARSE_MODE_LL)
+        b = parse_code_from_string(src, parse_mode=PARSE_MODE_TWO_STAGE)
+        assert str(a["parse_tree"]) == str(b["parse_tree"])
+        assert a["errors"] == b["errors"]
+        assert a["ir"] == b["ir"]
+        assert a["timings"]["parse_stage"] == "ll"
+    print("✅ SLL->LL equivalente a LL")
+
+
+def test_two_stage_falls_back_to_ll():
+    """Con errores sintácticos se re-parsea en LL y se reportan errores"""
+    out = parse_code_from_string(INVALIDO, parse_mode=PARSE_MODE_TWO_STAGE)
+    assert out["timings"]["parse_stage"] == "ll"
+    assert out["errors"] and all(e["line"] is not None for e in out["errors"])
+    print("✅ Fallback a LL con errores recolectados")
+
+
+def test_parse_tree_is_lazy():
+    """El árbol solo se renderiza cuando se pide, igual que toStringTree"""
+    out = parse_code_from_string(VALIDO)
+    view = out["parse_tree"]
+    assert view._full is None
+    text = str(view)
+    assert text.startswith("(program (statement (functionDeclaration function sumar (")
+    assert text.endswith("<EOF>)")
+    shallow = view.render(max_depth=1)
+    assert shallow.startswith("(program (statement …)") and len(shallow) < len(text)
+    assert "".join(view.stream()) == text
+    print("✅ Render perezoso del árbol")
+
+
+def test_session_runs_each_stage_once():
+    """La sesión guarda los productos de cada etapa; los símbolos no re-analizan"""
+    session = compile_session(VALIDO, symbols=True)
+    out = session.result
+    assert session.tokens is not None and session.trees == [(session.tree, 0)]
+    assert session.asts == [(session.ast, 0)]
+    assert out["ir"] == session.ir and out["asm"] == session.asm and session.tac_ok
+    assert out["symbols"] is session.symbols
+    assert [s["name"] for s in session.symbols["symbols"]] == ["sumar", "x"]
+    analyzer = session.analyzer
+    assert session.analyze_symbols() is session.symbols and session.analyzer is analyzer
+    assert parse_code_from_string(VALIDO)["symbols"] is None
+    print("✅ Sesión de compilación")
+
+
+def run_all_tests():
+    tests = [
+        test_two_stage_parse_sll_ok,
+        test_two_stage_matches_ll,
+        test_two_stage_falls_back_to_ll,
+        test_parse_tree_is_lazy,
+        test_session_runs_each_stage_once,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            print(f"❌ Test fallido: {test.__name__}: {e}")
+            failed += 1
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run_all_tests() else 1)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+test_function_cache.py
+Pruebas de la caché de TAC/MIPS por función (program/function_cache.py)
+"""
+
+import sys
+import os
+import glob
+import tempfile
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from program.Driver import parse_code_from_string, _tac_to_asm
+from program.compile_cache import CompileCache
+from program.function_cache import FunctionCache
+from program.incremental import IncrementalFrontEnd
+
+SRC = """
+class Contador {
+  var n: integer;
+  function constructor(n: integer) { this.n = n; }
+  function sumar(k: integer): integer { return this.n + k; }
+  function doble(): integer { return this.n * 2; }
+  function nombre(): string { return "contador"; }
+}
+function usar(c: Contador): integer { return c.sumar(1); }
+let c: Contador = new Contador(3);
+print(usar(c));
+"""
+
+
+def test_spliced_asm_matches_whole_file():
+    """El MIPS empalmado por funciones es idéntico al emitido de una vez"""
+    files = sorted(glob.glob(os.path.join(ROOT, "archivos_test", "**", "*.cps"), recursive=True))
+    fc = FunctionCache()
+    for path in files:
+        with open(path, encoding="utf-8") as f:
+            ir = parse_code_from_string(f.read())["ir"]
+        if ir:
+            assert fc.asm_for(ir) == _tac_to_asm(ir), path
+            assert fc.asm_for(ir) == _tac_to_asm(ir), path  # ahora desde la caché
+    print("✅ MIPS empalmado idéntico")
+
+
+def test_edit_one_method_regenerates_only_it():
+    """Editar un método solo regenera ese método; la salida es la de compilar desde cero"""
+    inc = IncrementalFrontEnd()
+    inc.compile(SRC)
+    edited = SRC.replace("this.n * 2", "this.n * 3")
+    out = inc.compile(edited)
+    t = out["timings"]
+    assert t["functions"] == 4 and t["functions_reused"] == 3, t
+    assert t["asm_units_reused"] == t["asm_units"] - 1, t
+
+    fresh = IncrementalFrontEnd().compile(edited)
+    assert (out["ir"], out["asm"]) == (fresh["ir"], fresh["asm"])
+    print("✅ Solo se regenera el método editado")
+
+
+def test_layout_change_invalidates_dependents():
+    """Cambiar la firma de un método invalida a quien lo nombra"""
+    fc = FunctionCache()
+    parse_code_from_string(SRC, function_cache=fc)
+    edited = SRC.replace("function sumar(k: integer)", "function sumar(k: integer, j: integer)")
+    out = parse_code_from_string(edited.replace("c.sumar(1)", "c.sumar(1, 2)"), function_cache=fc)
+    # cambia el layout de Contador: se regeneran sus 4 métodos y 'usar'
+    assert out["timings"]["functions_reused"] == 0, out["timings"]
+    print("✅ Dependencias de firma/layout en la huella")
+
+
+def test_compile_cache_hit_with_function_cache():
+    """Un acierto de la caché de compilación con function_cache reconstruye el árbol"""
+    with tempfile.TemporaryDirectory() as d:
+        cache = CompileCache(d)
+        first = parse_code_from_string(SRC, cache=cache, function_cache=FunctionCache())
+        second = parse_code_from_string(SRC, cache=cache, function_cache=FunctionCache())
+        assert second["timings"]["cache"] == "hit"
+        assert str(second["parse_tree"]) == str(first["parse_tree"])
+    print("✅ Acierto de caché con function_cache")
+
+
+if __name__ == "__main__":
+    test_spliced_asm_matches_whole_file()
+    test_edit_one_method_regenerates_only_it()
+    test_layout_change_invalidates_dependents()
+    test_compile_cache_hit_with_function_cache()
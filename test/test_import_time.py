@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+test_import_time.py
+Presupuesto de imports del Driver medido con 'python -X importtime':
+un --syntax-only no carga semántico, TAC ni backend y arranca más rápido
+que una compilación completa.
+"""
+
+import sys
+import os
+import subprocess
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SRC = os.path.join(ROOT, "archivos_test", "ejemplo_propio", "ejemplo1.cps")
+
+# Módulos que solo corresponden a etapas posteriores al parseo
+LATE_MODULES = {
+    "program.type_check_visitor", "program.TACGeneratorVisitor", "program.semantic_analyzer",
+    "program.compile_cache", "program.function_cache", "program.rd_parser",
+    "program.typed_ast",
+    "backend.mips.emitter", "backend.mips.tac_parser",
+}
+
+
+def _import_profile(*flags):
+    """{módulo: microsegundos propios} de una corrida del Driver."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", os.path.join(ROOT, "program", "Driver.py"), *flags, SRC],
+        cwd=ROOT, capture_output=True, text=True, timeout=120,
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    prof = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        prof[name.strip()] = int(self_us)
+    return prof
+
+
+def _best(*flags, runs=3):
+    """Perfil con el menor total de varias corridas (menos ruido)."""
+    return min((_import_profile(*flags) for _ in range(runs)), key=lambda p: sum(p.values()))
+
+
+def test_syntax_only_skips_late_stages():
+    """--syntax-only no importa las etapas posteriores y su import total es menor"""
+    syntax = _best("--syntax-only")
+    full = _best()
+    assert not LATE_MODULES & syntax.keys(), sorted(LATE_MODULES & syntax.keys())
+    assert {"program.TACGeneratorVisitor", "backend.mips.emitter"} <= full.keys()
+    assert set(syntax) < set(full)
+    t_syntax, t_full = sum(syntax.values()), sum(full.values())
+    assert t_syntax < t_full, (t_syntax, t_full)
+    print(f"✅ Imports: --syntax-only {t_syntax / 1000:.1f} ms, completo {t_full / 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    test_syntax_only_skips_late_stages()
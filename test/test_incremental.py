@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+test_incremental.py
+Pruebas del front end incremental del IDE (program/incremental.py)
+"""
+
+import sys
+import os
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "program"))
+
+from program.Driver import parse_code_from_string
+from program.incremental import IncrementalFrontEnd, split_top_level, DECL, STMTS
+
+SRC = """let total: integer = 0;
+
+function sumar(a: integer, b: integer): integer {
+    return a + b;
+}
+
+class Caja {
+    let valor: integer;
+    function get(): integer { return this.valor; }
+}
+
+total = sumar(1, 2);
+print("total: " + total);
+"""
+
+
+def test_split_top_level():
+    """Cada función/clase es un fragmento; el resto se agrupa entre ellas"""
+    kinds = [k for k, _, _ in split_top_level(SRC)]
+    assert kinds == [STMTS, DECL, STMTS, DECL, STMTS]
+    spans = split_top_level(SRC)
+    assert "".join(SRC[a:b] for _, a, b in spans) == SRC
+    print("✅ Partición en declaraciones de nivel superior")
+
+
+def test_only_edited_chunk_is_reparsed():
+    """Al editar el cuerpo de una función solo ese fragmento se reprocesa"""
+    inc = IncrementalFrontEnd()
+    first = inc.compile(SRC)
+    assert first["errors"] == [] and first["ir"]
+    assert first["timings"]["chunks_reused"] == 0
+
+    edited = SRC.replace("return a + b;", "let c: integer = a + b;\n    return c;")
+    out = inc.compile(edited)
+    t = out["timings"]
+    assert t["chunks_reused"] == t["chunks"] - 1
+    assert "main" in out["ir"] and out["asm"]
+    assert str(out["parse_tree"]) == str(parse_code_from_string(edited)["parse_tree"])
+    print("✅ Solo se re-parsea el fragmento editado")
+
+
+def test_errors_are_shifted():
+    """Los errores de un fragmento se reportan en la línea real del archivo"""
+    inc = IncrementalFrontEnd()
+    inc.compile(SRC)
+    broken = SRC.replace("total = sumar(1, 2);", "total = sumar(1, ;")
+    out = inc.compile(broken)
+    assert out["errors"] == parse_code_from_string(broken)["errors"]
+    assert out["errors"][0]["line"] == 12
+    print("✅ Líneas de error desplazadas al archivo completo")
+
+
+def test_live_check():
+    """El chequeo en vivo no genera código y solo reprocesa el fragmento editado"""
+    inc = IncrementalFrontEnd()
+    assert inc.check(SRC)["errors"] == []
+    broken = SRC.replace("return a + b;", "return a + ;")
+    out = inc.check(broken)
+    t = out["timings"]
+    assert t["live"] and t["chunks_reused"] == t["chunks"] - 1
+    assert out["ir"] == "" and out["asm"] == ""
+    assert out["errors"] == parse_code_from_string(broken)["errors"]
+    assert out["errors"][0]["line"] == 4
+    print("✅ Diagnósticos en vivo")
+
+
+def test_symbols_match_whole_file():
+    """El analizador recorrido por fragmentos da la misma tabla de símbolos"""
+    from antlr4 import InputStream, CommonTokenStream
+    from scripts.CompiscriptLexer import CompiscriptLexer
+    from scripts.CompiscriptParser import CompiscriptParser
+    from program.semantic_analyzer import SemanticAnalyzer
+
+    whole = SemanticAnalyzer()
+    whole.visit(CompiscriptParser(CommonTokenStream(CompiscriptLexer(InputStream(SRC)))).program())
+
+    inc = IncrementalFrontEnd()
+    inc.compile(SRC)
+    parts = SemanticAnalyzer()
+    for tree, offset in inc.trees():
+        parts.line_offset = offset
+        parts.visit(tree)
+    assert parts.symbol_tree() == whole.symbol_tree()
+    assert parts.errors == whole.errors
+    # la sesión del IDE arma el mismo árbol sin otra pasada
+    session = inc.compile_session(SRC, symbols=True)
+    assert session.symbols == whole.symbol_tree()
+    assert session.result["symbols"] is session.symbols
+    print("✅ Tabla de símbolos por fragmentos")
+
+
+if __name__ == "__main__":
+    test_split_top_level()
+    test_only_edited_chunk_is_reparsed()
+    test_errors_are_shifted()
+    test_live_check()
+    test_symbols_match_whole_file()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+test_ir.py
+IR en memoria (program/ir.py): el generador emite quads con operandos de
+clase conocida, el backend los consume sin pasar por texto y el texto queda
+como par impresor/parser para mostrar y cargar .cgt.
+"""
+
+import sys
+import os
+import glob
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from program.Driver import compile_session, _tac_to_asm
+from program.ir import Str, format_ir, parse_tac
+
+
+def _tagged(quads):
+    return [tuple((type(x).__name__, x) for x in q) for q in quads]
+
+
+def test_printer_parser_round_trip():
+    """parse_tac(format_ir(q)) da los mismos quads, con la misma clase de operando"""
+    files = sorted(glob.glob(os.path.join(ROOT, "archivos_test", "**", "*.cps"), recursive=True))
+    checked = 0
+    for path in files:
+        with open(path, encoding="utf-8") as f:
+            s = compile_session(f.read())
+        if not s.tac_ok:
+            continue
+        assert s.ir == format_ir(s.quads), path
+        assert _tagged(parse_tac(s.ir)) == _tagged(s.quads), path
+        assert _tac_to_asm(s.ir) == s.asm, path
+        checked += 1
+    assert checked
+    print("✅ Impresor y parser de TAC son inversos")
+
+
+def test_generator_operands_are_typed():
+    """Constantes, literales string y temporales llegan tipados al backend"""
+    # globales (las lee h): SCCP no las toca
+    s = compile_session('let a: integer = 5;\nlet b: string = "x + 1";\nlet c: boolean = true;\n'
+                        'let d: integer = a - -1;\n'
+                        'function h(): boolean { print(b); return c && d > a; }\n')
+    assigns = {q[1]: q[2] for q in s.quads if q[0] == "Assign"}
+    assert assigns["a"] == 5 and type(assigns["a"]) is int
+    assert assigns["b"] == Str('"x + 1"') and isinstance(assigns["b"], Str)
+    assert assigns["c"] is True
+    # '-1' es 0 - 1 plegado a un int: nunca un operando de texto '-1'
+    assert any(q[0] == "Sub" and q[2] == "a" and q[3] == -1 and type(q[3]) is int for q in s.quads)
+    print("✅ Operandos tipados desde el generador")
+
+
+def test_text_ambiguities_are_gone():
+    """'a - -1' y operadores dentro de un literal ya no se malinterpretan"""
+    assert parse_tac("t1 = a - -1") == [("Sub", "t1", "a", -1)]
+    assert parse_tac('t1 = "a < b"') == [("Assign", "t1", '"a < b"')]
+    q = parse_tac('t1 = "a + b"\nt2 = strcat t1, "c, d"')
+    assert isinstance(q[0][2], Str)
+    assert q[1] == ("StrCat", "t2", "t1", '"c, d"')
+    print("✅ Sin ambigüedades de texto")
+
+
+def test_method_receiver_goes_first():
+    """'call method' llega como CallMethod: el receptor (último param) va en $a0"""
+    s = compile_session("""
+class P {
+  var n: integer;
+  function constructor(n: integer) { this.n = n; }
+  function get(k: integer): integer { return this.n + k; }
+}
+let p: P = new P(2);
+let x: integer = p.get(7);
+""")
+    calls = [q for q in s.quads if q[0] == "CallMethod"]
+    assert [q[2] for q in calls] == ["constructor", "get"] and calls[0][1] is None
+    body = s.asm.split("jal get")[0].rsplit("addiu $sp, $sp, -40", 1)[1]
+    params = [ln.split()[1].rstrip(",") for ln in body.splitlines() if ln.strip().startswith("addu $a")]
+    assert params == ["$a0", "$a1"]
+    print("✅ Receptor de método en $a0")
+
+
+if __name__ == "__main__":
+    test_printer_parser_round_trip()
+    test_generator_operands_are_typed()
+    test_text_ambiguities_are_gone()
+    test_method_receiver_goes_first()
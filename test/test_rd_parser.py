@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+test_rd_parser.py
+Conformidad del parser escrito a mano (program/rd_parser.py) contra el
+parser generado por ANTLR sobre el corpus de ejemplo.
+"""
+
+import sys
+import os
+import glob
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from antlr4 import InputStream, CommonTokenStream
+from antlr4.tree.Tree import TerminalNode
+
+from scripts.CompiscriptLexer import CompiscriptLexer
+from program.Driver import _parse_program, parse_code_from_string, PARSE_MODE_LL, FRONTEND_RD
+from program.rd_parser import parse, RDSyntaxError
+
+CORPUS = sorted(
+    glob.glob(os.path.join(ROOT, "archivos_test", "**", "*.cps"), recursive=True)
+    + glob.glob(os.path.join(ROOT, "program", "tests", "*.cps"))
+    + [os.path.join(ROOT, "program.cps")]
+)
+
+# Casos donde ANTLR decide con predicción LL completa
+SNIPPETS = [
+    "a.b = c.d = e;",
+    "c ? a.b = 1 : d.e = 2;",
+    "c ? a.b = 1 : 2;",
+    "x = a.b = 2;",
+    "-a.b = 3;",
+    "f(x)(y).z = 2;",
+    "a[0] = 1;",
+    "for (a.b = 0; ;) { this.x = a[i]; }",
+    "switch (x) { case 1: print(1); case 2: default: break; }",
+    "class A : B { const k: integer = 1; var z; function f(a, b: string[]): A { return new A(); } }",
+    "do { x = !x && y || -z * 3 % 2 / 1 >= 4 != 5; } while (x);",
+]
+
+
+def _antlr(src):
+    lexer = CompiscriptLexer(InputStream(src))
+    lexer.removeErrorListeners()
+    _, tree, syn, _ = _parse_program(CommonTokenStream(lexer), PARSE_MODE_LL)
+    return tree, syn.errors
+
+
+def _key(node):
+    if isinstance(node, TerminalNode):
+        s = node.symbol
+        return (s.type, s.text, s.line, s.column, s.tokenIndex)
+    return (type(node), node.start.tokenIndex, node.stop.tokenIndex if node.stop else None)
+
+
+def _same_tree(a, b):
+    """Misma forma, mismas clases de contexto, mismos tokens y mismos padres."""
+    stack = [(a, b)]
+    while stack:
+        x, y = stack.pop()
+        assert _key(x) == _key(y), f"{_key(x)} != {_key(y)}"
+        assert type(x.parentCtx) is type(y.parentCtx)
+        assert x.getChildCount() == y.getChildCount()
+        for i in range(x.getChildCount()):
+            stack.append((x.getChild(i), y.getChild(i)))
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_corpus_conformance():
+    """El árbol coincide nodo a nodo con el de ANTLR en todo el corpus válido"""
+    for path in CORPUS:
+        src = _read(path)
+        tree, errors = _antlr(src)
+        assert not errors, path
+        _same_tree(tree, parse(src))
+    print(f"✅ {len(CORPUS)} archivos idénticos a ANTLR")
+
+
+def test_ll_decisions():
+    """Asignaciones de propiedad y ternarios se resuelven igual que en ANTLR"""
+    for src in SNIPPETS:
+        tree, errors = _antlr(src)
+        assert not errors, src
+        _same_tree(tree, parse(src))
+    print("✅ Decisiones LL replicadas")
+
+
+def test_syntax_errors_fall_back_to_antlr():
+    """Con errores el parser lanza RDSyntaxError y el Driver usa los diagnósticos de ANTLR"""
+    src = "let x: integer = ;\nfunction f( { }\n"
+    try:
+        parse(src)
+        assert False, "debía fallar"
+    except RDSyntaxError as e:
+        assert e.line == 1
+    a = parse_code_from_string(src)
+    b = parse_code_from_string(src, frontend=FRONTEND_RD)
+    assert b["errors"] == a["errors"] and b["errors"]
+    print("✅ Errores sintácticos vía ANTLR")
+
+
+def test_driver_output_matches():
+    """Con frontend='rd' el Driver produce el mismo IR y ASM"""
+    for path in CORPUS[:4] + [os.path.join(ROOT, "program.cps")]:
+        src = _read(path)
+        a = parse_code_from_string(src)
+        b = parse_code_from_string(src, frontend=FRONTEND_RD)
+        assert b["timings"]["parse_stage"] == "rd"
+        assert (a["errors"], a["ir"], a["asm"]) == (b["errors"], b["ir"], b["asm"]), path
+    print("✅ Misma salida del Driver con ambos front ends")
+
+
+if __name__ == "__main__":
+    test_corpus_conformance()
+    test_ll_decisions()
+    test_syntax_errors_fall_back_to_antlr()
+    test_driver_output_matches()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+test_sccp.py
+Propagación de constantes condicional dispersa (program/sccp.py): aritmética
+y comparaciones con literales, '!', cortocircuito, ramas constantes y
+bloques inalcanzables fuera; lo que depende de un ciclo o de una global
+queda como estaba.
+"""
+
+import sys
+import os
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from program.Driver import compile_session
+from program.copy_prop import copy_propagate
+from program.ir import parse_tac
+from program.sccp import sccp
+
+from test_ssa import _run
+
+
+def _body(s, fn="main"):
+    """Quads de una función del programa compilado."""
+    out, inside = [], False
+    for q in s.quads:
+        if q[0] == "BeginFunc":
+            inside = q[1] == fn
+        if inside:
+            out.append(q)
+    return out
+
+
+def test_folds_literal_arithmetic():
+    """'2 * 3 + x', '!' y comparaciones entre literales no llegan al MIPS"""
+    s = compile_session("function f(x: integer): integer {\n"
+                        "  let k: integer = 2 * 3 + x;\n"
+                        "  let neg: boolean = !(1 > 2);\n"
+                        "  if (neg) { k = k - -4 % 3; }\n"
+                        "  return k;\n}\nprint(f(1));\n")
+    ops = [q[0] for q in _body(s, "f")]
+    assert any(q[0] == "Add" and q[2:] == (6, "p_x") for q in _body(s, "f"))
+    assert "Mul" not in ops and "Gt" not in ops and "Eq" not in ops and "IfZ" not in ops
+    # -4 % 3 es -1 en el MIPS (resto con el signo del dividendo): k - -1
+    assert any(q[0] == "Sub" and q[3] == -1 for q in _body(s, "f"))
+    print("✅ Aritmética con literales plegada")
+
+
+def test_constant_branches_and_dead_blocks():
+    """'if (false)', un switch sobre una constante y su código muerto desaparecen"""
+    s = compile_session("""
+let DEBUG: boolean = false;
+let modo: integer = 2;
+if (DEBUG) { print("debug"); }
+switch (modo) {
+  case 1: print("uno"); break;
+  case 2: print("dos"); break;
+  default: print("otro");
+}
+if (DEBUG || modo > 1) { print("ok"); }
+""")
+    strings = [q[1] for q in s.quads if q[0] == "Param"]
+    assert strings == ['"dos"', '"ok"']
+    assert not any(q[0] in ("IfZ", "Goto", "Label") for q in s.quads)
+    assert "debug" not in s.asm and "otro" not in s.asm
+    print("✅ Ramas constantes y bloques muertos")
+
+
+def test_loops_globals_and_division_by_zero():
+    """Lo que cambia en un ciclo, una global que lee otra función y x / 0 no se pliegan"""
+    s = compile_session("""
+let g: integer = 1;
+function h(): integer { g = g + 1; return g; }
+let i: integer = 0;
+while (i < 3) { i = i + 1; }
+let r: integer = h();
+print(g + i + r);
+let z: integer = 10 / 0;
+""")
+    main = _body(s)
+    assert ("Assign", "g", 1) in main and any(q[0] == "Add" and q[2] == "g" for q in main)
+    assert any(q[0] == "Lt" and q[2] == "i" for q in main)
+    assert any(q[0] == "Div" and q[2:] == (10, 0) for q in main)
+    print("✅ Ciclos, globales y división por cero intactos")
+
+
+def test_same_results():
+    """El código plegado calcula lo mismo (intérprete de TAC)"""
+    code = parse_tac("""BeginFunc f 1
+p_n = LoadParam 0
+a = 3
+b = a * 4
+s = 0
+i = 0
+L1:
+t1 = i < p_n
+if t1 == 0 goto L2
+t2 = 10 < b
+if t2 == 0 goto L3
+t3 = s + a
+s = t3
+goto L4
+L3:
+s = 99
+L4:
+t1 = i + 1
+i = t1
+goto L1
+L2:
+t4 = s * 2
+t5 = 7 + a
+t6 = t4 + t5
+return t6""")
+    folded = copy_propagate(sccp(code))
+    assert ("Label", "L3") not in folded and not any(q[0] == "Mul" and q[2] == "a" for q in folded)
+    for n in (0, 1, 4):
+        assert _run(folded, n) == _run(code, n)
+    print("✅ Mismos resultados")
+
+
+if __name__ == "__main__":
+    test_folds_literal_arithmetic()
+    test_constant_branches_and_dead_blocks()
+    test_loops_globals_and_division_by_zero()
+    test_same_results()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+test_ssa.py
+Forma SSA sobre el CFG (program/ssa.py): Phi en la frontera de dominancia,
+renombrado de temporales, parámetros, 'this' y locales, y salida de SSA con
+copias paralelas que vuelven a los nombres originales.
+"""
+
+import sys
+import os
+import glob
+import re
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from program.Driver import compile_session
+from program.cfg import CFG, dominators
+from program.ir import format_ir, parse_tac
+from program.ssa import SSAFunction, from_ssa, program_from_ssa, program_to_ssa, to_ssa
+
+_ARITH = {"Add": lambda a, b: a + b, "Sub": lambda a, b: a - b, "Mul": lambda a, b: a * b,
+          "Lt": lambda a, b: int(a < b)}
+
+
+def _run(quads, *args):
+    """Intérprete mínimo de una función sin Phi (aritmética y saltos)."""
+    at = {q[1]: i for i, q in enumerate(quads) if q[0] == "Label"}
+    env = {}
+
+    def val(x):
+        return env[x] if isinstance(x, str) else x
+
+    pc = 0
+    while True:
+        q = quads[pc]
+        pc += 1
+        op = q[0]
+        if op == "LoadParam":
+            env[q[1]] = args[q[2]]
+        elif op == "Assign":
+            env[q[1]] = val(q[2])
+        elif op in _ARITH:
+            env[q[1]] = _ARITH[op](val(q[2]), val(q[3]))
+        elif op == "Goto":
+            pc = at[q[1]]
+        elif op == "IfZ" and val(q[1]) == 0:
+            pc = at[q[2]]
+        elif op == "Return":
+            return val(q[1])
+
+
+def _ssa_from_text(text):
+    """SSAFunction escrita a mano ('x.k' es versión de 'x')."""
+    cfg = CFG(parse_tac(text))
+    base = {}
+    for q in cfg.quads():
+        for x in q[1:]:
+            m = re.match(r"([A-Za-z_]\w*)\.\d+$", x) if isinstance(x, str) else None
+            if m:
+                base[x] = base[m.group(1)] = m.group(1)
+    return SSAFunction(cfg, dominators(cfg), base)
+
+
+def _phis(cfg):
+    return {b.label: sorted(format_ir([q]) for q in b.quads if q[0] == "Phi") for b in cfg.rpo}
+
+
+def test_round_trip_on_generated_code():
+    """Sobre el código del generador, salir de SSA devuelve los mismos quads"""
+    files = sorted(glob.glob(os.path.join(ROOT, "archivos_test", "**", "*.cps"), recursive=True))
+    checked = phis = 0
+    for path in files:
+        with open(path, encoding="utf-8") as f:
+            s = compile_session(f.read())
+        if not s.tac_ok:
+            continue
+        fns = program_to_ssa(list(s.quads))
+        phis += sum(q[0] == "Phi" for fn in fns for q in fn.quads())
+        assert program_from_ssa(fns) == s.quads, path
+        assert program_from_ssa(program_to_ssa(list(s.quads)), conventional=True) == s.quads, path
+        checked += 1
+    assert checked and phis
+    print("✅ Ida y vuelta a SSA sin cambios")
+
+
+def test_phi_placement():
+    """Phi solo donde se juntan definiciones distintas de algo vivo"""
+    cfg = CFG(parse_tac("BeginFunc f 1\np_n = LoadParam 0\ni = 0\ns = 0\nL1:\nt1 = i < p_n\n"
+                        "if t1 == 0 goto L2\nt1 = s + i\ns = t1\nt1 = i + 1\ni = t1\ngoto L1\n"
+                        "L2:\nreturn s"))
+    to_ssa(cfg)
+    assert _phis(cfg)["L1"] == ["i.2 = phi i.1, i.3", "s.2 = phi s.1, s.3"]
+    assert _phis(cfg)["L2"] == []
+    # if/else: Phi en la unión solo para lo que se lee después
+    cfg = CFG(parse_tac("BeginFunc g 1\np_c = LoadParam 0\nif p_c == 0 goto L1\nx = 1\n"
+                        "y = 1\ngoto L2\nL1:\nx = 2\ny = 2\nL2:\nreturn x"))
+    to_ssa(cfg)
+    assert _phis(cfg)["L2"] == ["x.3 = phi x.1, x.2"]
+    print("✅ Phi en la frontera de dominancia")
+
+
+def test_params_this_and_globals():
+    """Parámetros, 'this' y locales se renombran; las globales del main no"""
+    s = compile_session("""
+let g: integer = 1;
+class C {
+  var n: integer;
+  function constructor(n: integer) { this.n = n; }
+  function add(k: integer): integer { k = k + g; return this.n + k; }
+}
+let c: C = new C(2);
+g = c.add(3);
+""")
+    fns = program_to_ssa(list(s.quads))
+    add = next(fn for fn in fns if fn.cfg.name == "add")
+    text = format_ir(add.quads())
+    assert "this.1 = LoadParam 0" in text and "p_k.1 = LoadParam 1" in text
+    assert "p_k.2 = t1.1" in text and "t1.1 = p_k.1 + g\n" in text
+    main = next(fn for fn in fns if fn.cfg.name == "main")
+    assert "g" not in main.base and "c" in main.base
+    assert program_from_ssa(fns) == s.quads
+    print("✅ Parámetros, this y globales")
+
+
+def test_locals_read_by_nested_function():
+    """Una local que lee una función anidada no se renombra en ninguna de las dos"""
+    s = compile_session("""
+function outer(n: integer): integer {
+  let k: integer = n;
+  let j: integer = n;
+  function inner(): integer { return k; }
+  k = k + 1;
+  j = j + 1;
+  return inner() + j;
+}
+print(outer(2));
+""")
+    fns = program_to_ssa(list(s.quads))
+    outer = next(fn for fn in fns if fn.cfg.name == "outer")
+    inner = next(fn for fn in fns if fn.cfg.name == "inner")
+    assert "k" not in outer.base and "k" not in inner.base
+    assert "j" in outer.base            # la que nadie más lee sí
+    assert program_from_ssa(fns) == s.quads
+    print("✅ Locales de funciones anidadas")
+
+
+def test_swap_and_lost_copy():
+    """Copias paralelas en ciclo (swap) y una Phi cuyo origen sigue vivo (lost copy)"""
+    swap = _ssa_from_text("""BeginFunc f 1
+p_n.1 = LoadParam 0
+a.1 = 1
+b.1 = 2
+i.1 = 0
+L1:
+a.2 = phi a.1, b.2
+b.2 = phi b.1, a.2
+i.2 = phi i.1, i.3
+t1.1 = i.2 < p_n.1
+if t1.1 == 0 goto L2
+i.3 = i.2 + 1
+goto L1
+L2:
+t2.1 = a.2 * 10
+t3.1 = t2.1 + b.2
+return t3.1""")
+    code = from_ssa(swap)
+    assert not any(q[0] == "Phi" for q in code)
+    assert [_run(code, n) for n in range(4)] == [12, 21, 12, 21]
+
+    lost = _ssa_from_text("""BeginFunc f 1
+p_n.1 = LoadParam 0
+x.1 = 0
+L1:
+x.2 = phi x.1, x.3
+x.3 = x.2 + 1
+t1.1 = x.3 < p_n.1
+if t1.1 == 0 goto L2
+goto L1
+L2:
+return x.2""")
+    code = from_ssa(lost)
+    assert [_run(code, n) for n in (1, 5)] == [0, 4]
+    # la copia va en el bloque del back edge, no en la salida del ciclo
+    assert code[code.index(("Goto", "L1")) - 1][0] == "Assign"
+    print("✅ Swap y lost copy")
+
+
+def test_critical_edges_are_split():
+    """Una copia en una arista que sale de un IfZ va en un bloque nuevo"""
+    fn = _ssa_from_text("""BeginFunc f 1
+p_n.1 = LoadParam 0
+x.1 = 0
+y.1 = 5
+L1:
+x.2 = phi x.1, y.2
+y.2 = phi y.1, x.3
+x.3 = x.2 + 1
+t1.1 = p_n.1 < x.3
+if t1.1 == 0 goto L1
+return y.2""")
+    code = from_ssa(fn)
+    assert ("IfZ", "t1", "L1_p1") in code and ("Label", "L1_p1") in code
+    assert [_run(code, n) for n in (0, 1, 6)] == [5, 1, 2]
+    print("✅ Aristas críticas partidas")
+
+
+if __name__ == "__main__":
+    test_round_trip_on_generated_code()
+    test_phi_placement()
+    test_params_this_and_globals()
+    test_locals_read_by_nested_function()
+    test_swap_and_lost_copy()
+    test_critical_edges_are_split()
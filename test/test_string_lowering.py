@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+test_string_lowering.py
+Strings por tipo: el SemanticAnalyzer anota cada expresión (Expr.etype) y
+el generador de TAC emite StrCat / IntToStr y elige el print por ese tipo,
+para cualquier clase y sin listas de nombres de campos.
+"""
+
+import sys
+import os
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from program.Driver import compile_session
+from program.custom_types import IntType, StringType
+from program.incremental import IncrementalFrontEnd
+from program.typed_ast import walk
+
+LIBRO = """
+function toString(x: integer): string { return ""; }
+class Libro {
+  let titulo: string;
+  let nombre: integer;
+  function constructor(t: string) { this.titulo = t; this.nombre = 1; }
+  function ficha(): string { return this.titulo + " #" + toString(this.nombre); }
+  function siguiente(): integer { return this.nombre + 1; }
+}
+let l: Libro = new Libro("Rayuela");
+print(l.ficha());
+print(l.siguiente());
+"""
+
+
+def _ops(quads, op):
+    return [q for q in quads if q[0] == op]
+
+
+def test_expressions_are_annotated():
+    """Después del semántico cada expresión lleva su tipo"""
+    s = compile_session('let a: integer = 2;\nlet b: string = "x" + "y";\nprint(a * 3);\n')
+    binaries = {n.op: n.etype for n in walk(s.ast) if n.kind == "Binary"}
+    assert binaries == {"+": StringType, "*": IntType}
+    print("✅ Expresiones anotadas con su tipo")
+
+
+def test_lowering_follows_types():
+    """StrCat/IntToStr salen del tipo: un campo 'nombre' integer se suma"""
+    s = compile_session(LIBRO)
+    assert s.tac_ok
+    assert len(_ops(s.quads, "StrCat")) == 2
+    assert len(_ops(s.quads, "IntToStr")) == 1
+    assert _ops(s.quads, "Add") and not any(q[2] == "toString" for q in _ops(s.quads, "Call"))
+    prints = [q[2] for q in _ops(s.quads, "Call") if q[2].startswith("print")]
+    assert prints == ["printString", "printInteger"]
+    assert "jal __strcat_new" in s.asm and "jal __int_to_str" in s.asm
+    print("✅ Strings bajados por tipo")
+
+
+def test_incremental_regenerates_on_type_change():
+    """Un fragmento sin cambios se regenera si cambia el tipo de lo que usa"""
+    body = "\nfunction f() { print(g + g); }\nf();\n"
+    fe = IncrementalFrontEnd()
+    s1 = fe.compile_session("let g: integer = 1;" + body)
+    s2 = fe.compile_session('let g: string = "a";' + body)
+    assert s2.timings["chunks_reused"] == 2
+    assert not _ops(s1.quads, "StrCat") and len(_ops(s2.quads, "StrCat")) == 1
+    print("✅ Regeneración por cambio de tipos")
+
+
+if __name__ == "__main__":
+    test_expressions_are_annotated()
+    test_lowering_follows_types()
+    test_incremental_regenerates_on_type_change()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+test_symbol_export.py
+Exportación de la tabla de símbolos (program/symbol_export.py): opcional,
+atómica, en segundo plano y sin reescribir si no cambió.
+"""
+
+import sys
+import os
+import json
+import stat
+import tempfile
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import program.symbol_export as symbol_export
+from program.Driver import compile_session
+from program.symbol_export import SymbolExporter, default_exporter, write_json_atomic
+
+SRC = """
+function sumar(a: integer, b: integer): integer { return a + b; }
+let x: integer = sumar(1, 2);
+"""
+
+
+def test_write_skips_unchanged():
+    """Compacto por defecto, pretty opcional y sin reescribir lo mismo"""
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "sym.json")
+        data = {"name": "global", "symbols": [{"name": "ñ", "type": "integer"}], "children": []}
+        assert write_json_atomic(path, data)
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        assert json.loads(text) == data and " " not in text
+        mtime = os.stat(path).st_mtime_ns
+        assert not write_json_atomic(path, data)
+        assert os.stat(path).st_mtime_ns == mtime
+        assert write_json_atomic(path, data, pretty=True)
+        assert os.listdir(d) == ["sym.json"]          # sin temporales
+    print("✅ Escritura atómica y sin cambios no reescribe")
+
+
+def test_unchanged_touches_no_disk_and_keeps_mode():
+    """Sin cambios no se crea el temporal; el archivo conserva sus permisos"""
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "sym.json")
+        assert write_json_atomic(path, {"v": 1})
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+        assert mode == 0o666 & ~symbol_export._UMASK, oct(mode)   # no el 0600 de mkstemp
+
+        original = symbol_export.tempfile.mkstemp
+        symbol_export.tempfile.mkstemp = None     # un contenido igual no debe llegar al disco
+        try:
+            assert not write_json_atomic(path, {"v": 1})
+        finally:
+            symbol_export.tempfile.mkstemp = original
+
+        os.chmod(path, 0o640)
+        assert write_json_atomic(path, {"v": 2})
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+    print("✅ Sin escritura si no cambió y mismos permisos")
+
+
+def test_background_exporter():
+    """Las versiones encoladas para la misma ruta se juntan; solo se escribe la última"""
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "sym.json")
+        ex = SymbolExporter()
+        for i in range(50):
+            ex.submit(path, {"v": i})
+        ex.submit(path, {"v": 49})
+        assert ex.flush(10)
+        ex.close(10)
+        with open(path, encoding="utf-8") as f:
+            assert json.load(f) == {"v": 49}
+        st = ex.stats
+        assert st["failed"] == 0 and st["written"] >= 1
+        assert st["written"] + st["unchanged"] + st["coalesced"] == 51
+    print("✅ Exportador en segundo plano")
+
+
+def test_opt_in_from_driver():
+    """Sin symbols_out no se escribe nada; con él, el árbol de la sesión"""
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "out", "symbols.json")
+        compile_session(SRC)
+        assert not os.path.exists(path)
+        session = compile_session(SRC, symbols_out=path)
+        assert default_exporter().flush(10)
+        with open(path, encoding="utf-8") as f:
+            assert json.load(f) == session.symbols
+    print("✅ Exportación opcional desde el Driver")
+
+
+if __name__ == "__main__":
+    test_write_skips_unchanged()
+    test_unchanged_touches_no_disk_and_keeps_mode()
+    test_background_exporter()
+    test_opt_in_from_driver()
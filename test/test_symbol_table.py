@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+test_symbol_table.py
+Tabla de símbolos plana (ScopedSymbolTable) frente a la encadenada
+(SymbolTable): mismas respuestas y misma forma de to_dict().
+"""
+
+import sys
+import os
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from program.symbol_table import SymbolTable, ScopedSymbolTable, INT, STR
+
+
+def test_shadowing_and_exit():
+    """Sombreado, redeclaración en el mismo scope y restauración al salir"""
+    t = ScopedSymbolTable()
+    assert t.insert("x", INT)
+    assert not t.insert("x", STR)
+    t.enter_scope("fn f")
+    assert t.insert("a", INT, is_param=True) and t.insert("x", STR)
+    assert t.lookup("x").type is STR and t.lookup_local("a") is not None
+    t.enter_scope("block")
+    assert t.lookup("a").is_param and t.lookup_local("a") is None
+    t.exit_scope()
+    t.exit_scope()
+    assert t.lookup("x").type is INT and t.lookup("a") is None
+    t.exit_scope()   # el global no se cierra
+    assert t.level == 0 and t.lookup("x") is not None
+    print("✅ Sombreado y salida de scopes")
+
+
+def test_same_shape_as_symbol_table():
+    """to_dict() igual al de SymbolTable armado con child()"""
+    chained = SymbolTable()
+    chained.insert("g", INT, line=1, col=0)
+    f = chained.child("fn f")
+    f.insert("p", STR, is_param=True)
+    f.insert("v", INT, is_const=True)
+    f.child("block").insert("w", INT)
+    chained.insert("h", STR)
+
+    flat = ScopedSymbolTable()
+    flat.insert("g", INT, line=1, col=0)
+    flat.enter_scope("fn f")
+    flat.insert("p", STR, is_param=True)
+    flat.insert("v", INT, is_const=True)
+    flat.enter_scope("block")
+    flat.insert("w", INT)
+    flat.exit_scope()
+    flat.exit_scope()
+    flat.insert("h", STR)
+    assert flat.to_dict() == chained.to_dict()
+    print("✅ Misma forma que SymbolTable.to_dict()")
+
+
+if __name__ == "__main__":
+    test_shadowing_and_exit()
+    test_same_shape_as_symbol_table()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+test_tac_output.py
+Forma del TAC que emite el generador sobre el AST tipado: código de nivel
+superior dentro del main sintético, métodos con 'this' en LoadParam 0,
+constructores, orden de los 'param', do/while, print, arreglos, '&&',
+switch y funciones anidadas.
+"""
+
+import sys
+import os
+import re
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from program.Driver import parse_code_from_string
+
+SRC = """
+class C {
+  var n: integer;
+  function constructor(n: integer) { this.n = n; }
+  function add(k: integer): integer { return this.n + k; }
+}
+function s2(a: integer, b: integer): integer { return a - b; }
+function usa(a: integer, b: integer): integer { return s2(a, b); }
+function cuenta(n: integer): integer {
+  let i: integer = 0;
+  do { i = i + 1; } while (i < n);
+  return i;
+}
+function lista(a: integer, b: integer): integer[] {
+  let arr: integer[] = [a, b];
+  return arr;
+}
+function ambos(a: integer, b: integer): boolean {
+  let ok: boolean = a < 1 && b > 2;
+  return ok;
+}
+function saluda(s: string) { print(s); }
+function elige(n: integer) {
+  switch (n) {
+    case 1: print("uno");
+    default: print("otro");
+  }
+}
+function outer(n: integer): integer {
+  let k: integer = n;
+  function inner(): integer { return k; }
+  return inner();
+}
+let c: C = new C(2);
+let m: integer = outer(2);
+print(c.add(m));
+"""
+
+_IR = None
+
+
+def _ir():
+    global _IR
+    if _IR is None:
+        out = parse_code_from_string(SRC)
+        assert not out["errors"], out["errors"]
+        _IR = out["ir"].splitlines()
+    return _IR
+
+
+def _func(name):
+    """Líneas de una función, de BeginFunc a EndFunc."""
+    ir = _ir()
+    start = ir.index(next(l for l in ir if l.startswith(f"BeginFunc {name} ")))
+    return ir[start:ir.index(f"EndFunc {name}", start) + 1]
+
+
+def _text(name):
+    return "\n".join(_func(name)) + "\n"
+
+
+def test_top_level_code_in_main():
+    """Todo el código suelto va en el main sintético, en orden, con sus 'let'"""
+    inside = False
+    for line in _ir():
+        if line.startswith("BeginFunc "):
+            inside = True
+        elif line.startswith("EndFunc "):
+            inside = False
+        elif not inside:
+            assert line.endswith(":"), line     # fuera de funciones, solo marcadores
+    main = _func("main")
+    assert main[-3:] == ["return", "FUNC main_END:", "EndFunc main"]
+    c = main.index(next(l for l in main if l.startswith("c = ")))
+    m = main.index(next(l for l in main if l.startswith("m = ")))
+    assert c < m < main.index("call printInteger, 1")
+    # las locales con inicializador también se asignan
+    assert re.search(r"^k = p_n$", _text("outer"), re.M)
+    print("✅ Nivel superior dentro de main")
+
+
+def test_methods_and_constructors():
+    """'this' en LoadParam 0, parámetros desde 1, campos con setprop y 'new' llama al constructor"""
+    assert "FUNC C.add_START:" in _ir() and "FUNC C.constructor_START:" in _ir()
+    add = _text("add")
+    assert add.startswith("BeginFunc add 2\n")
+    assert "this = LoadParam 0\np_k = LoadParam 1\n" in add
+    assert "getprop this, n" in add
+    assert "setprop this, n, p_n\n" in _text("constructor")
+    main = _text("main")
+    assert re.search(r"(t\d+) = new C\nparam \w+\nparam \1\ncall method constructor, 2\nc = \1\n", main)
+    assert "param m\nparam c\n" in main and "call method add, 2" in main
+    print("✅ Métodos y constructores")
+
+
+def test_call_arguments_in_source_order():
+    """Los 'param' salen en el orden de los argumentos"""
+    assert "param p_a\nparam p_b\n" in _text("usa")
+    print("✅ Argumentos en orden")
+
+
+def test_do_while():
+    """do/while: el cuerpo primero y la condición al final, con IfZ hacia la salida"""
+    body = _text("cuenta")
+    m = re.search(r"^(L\d+):\n(?:.*\n)*?t\d+ = i < p_n\nif t\d+ == 0 goto (L\d+)\ngoto \1\n\2:\nreturn i\n",
+                  body, re.M)
+    assert m, body
+    assert "!= 0" not in "\n".join(_ir())
+    print("✅ do/while")
+
+
+def test_print_arrays_and_short_circuit():
+    """print elige printInteger/printString; [a, b] y '&&' dan valores"""
+    assert "param p_s\ncall printString, 1\n" in _text("saluda")
+    assert "call printInteger, 1" in _text("main")
+    assert re.search(r"(t\d+) = newarray 2\nsetelem \1, 0, p_a\nsetelem \1, 1, p_b\narr = \1\n",
+                     _text("lista"))
+    ambos = _text("ambos")
+    assert re.search(r"if (t\d+) == 0 goto (L\d+)\n(?:.*\n)*?\1 = t\d+\n\2:\nok = \1\n", ambos), ambos
+    print("✅ print, arreglos y cortocircuito")
+
+
+def test_switch_and_nested_functions():
+    """switch compara con cada case; una función anidada va después de la que la contiene"""
+    elige = _text("elige")
+    assert re.search(r"t\d+ = p_n == ", elige)
+    assert elige.count("call printString, 1") == 2
+    ir = _ir()
+    assert ir.index("EndFunc outer") < ir.index("BeginFunc inner 0")
+    assert "call inner, 0" in _text("outer")
+    print("✅ switch y funciones anidadas")
+
+
+if __name__ == "__main__":
+    test_top_level_code_in_main()
+    test_methods_and_constructors()
+    test_call_arguments_in_source_order()
+    test_do_while()
+    test_print_arrays_and_short_circuit()
+    test_switch_and_nested_functions()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+test_typed_ast.py
+Bajada del parse tree al AST tipado (program/typed_ast.py): forma de los
+nodos, posiciones y que ambos front ends bajen al mismo AST.
+"""
+
+import sys
+import os
+import glob
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from antlr4 import InputStream, CommonTokenStream
+
+from scripts.CompiscriptLexer import CompiscriptLexer
+from program.Driver import _parse_program, PARSE_MODE_LL
+from program.rd_parser import parse
+from program.typed_ast import lower, walk
+
+CORPUS = sorted(
+    glob.glob(os.path.join(ROOT, "archivos_test", "**", "*.cps"), recursive=True)
+    + [os.path.join(ROOT, "program.cps")]
+)
+
+
+def _antlr(src):
+    return _parse_program(CommonTokenStream(CompiscriptLexer(InputStream(src))), PARSE_MODE_LL)[1]
+
+
+def test_shape():
+    """Precedencia, asociatividad a izquierda, paréntesis y posiciones"""
+    ast = lower(_antlr("let x: integer[] = [1];\nx[0] = (a - b) - c * -d;\nif (p && !q) { o.f(1, \"s\"); }"))
+    assert ast.dump() == (
+        "(Program [(VarDecl 'x' (TypeRef 'integer' 1) (ArrayLit [(Literal 'int' 1 '1')])) "
+        "(ExprStmt (AssignExpr (Index (Name 'x') (Literal 'int' 0 '0')) "
+        "(Binary '-' (Binary '-' (Name 'a') (Name 'b')) "
+        "(Binary '*' (Name 'c') (Unary '-' (Name 'd')))))) "
+        "(If (Logical '&&' (Name 'p') (Unary '!' (Name 'q'))) "
+        "(Block [(ExprStmt (Call (Prop (Name 'o') 'f') "
+        "[(Literal 'int' 1 '1') (Literal 'string' 's' '\"s\"')]))]) _)])"
+    ), ast.dump()
+    sub = ast.body[1].expr.value
+    assert (sub.line, sub.col) == (2, 7)          # empieza en el '(' como el parse tree
+    assert (sub.left.line, sub.left.col) == (2, 8)
+    assert (sub.right.line, sub.right.col) == (2, 17)
+    print("✅ Forma y posiciones del AST")
+
+
+def test_top_level_index():
+    """La partición del nivel superior es por tipo de nodo, no por texto"""
+    src = (
+        'let s: string = "function f() class C";\n'
+        "function f(): void { function g(): void { } }\n"
+        "print(s);\n"
+        "class C { function m(): void { } }\n"
+        "{ function h(): void { } }\n"
+    )
+    ast = lower(_antlr(src))
+    index = ast.index
+    assert [d.name for d in index.decls] == ["f", "C"]
+    assert [f.name for f in index.functions] == ["f"]
+    assert [c.name for c in index.classes] == ["C"]
+    assert [st.kind for st in index.statements] == ["VarDecl", "Print", "Block"]
+    assert ast.index is index
+    print("✅ Índice del nivel superior")
+
+
+def test_frontends_agree():
+    """ANTLR y el descenso recursivo bajan al mismo AST en todo el corpus"""
+    for path in CORPUS:
+        with open(path, encoding="utf-8") as f:
+            src = f.read()
+        a, b = lower(_antlr(src)), lower(parse(src))
+        assert a.dump() == b.dump(), path
+        assert [n.span for n in walk(a)] == [n.span for n in walk(b)], path
+    print(f"✅ {len(CORPUS)} archivos con el mismo AST en ambos front ends")
+
+
+if __name__ == "__main__":
+    test_shape()
+    test_top_level_index()
+    test_frontends_agree()
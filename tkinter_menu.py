@@ -1,23 +1,23 @@
 # archivo Nuevo
 # tkinter_menu.py — IDE tipo VS Code con Problemas, AST, Símbolos y squiggles
 import os
-import re
-import io
+import queue
 import tkinter as tk
 from tkinter import filedialog, ttk, Menu, messagebox
 from pathlib import Path
 from typing import Optional, List, Dict, Any
-from contextlib import redirect_stdout, redirect_stderr
 
-# IMPORTA la API del Driver dentro de /program
-from program.Driver import parse_code_from_string
+# IMPORTA el front end incremental (misma salida que parse_code_from_string
+# del Driver, pero solo re-parsea las declaraciones que cambiaron)
+from program.incremental import IncrementalFrontEnd
+from program.compile_worker import CompileWorker
+from program.symbol_export import SymbolExporter
+from program.diagnostics import Diagnostic
 
-# Para genera
-# r TAC
-from program.TACGeneratorVisitor import TACGeneratorVisitor
-from scripts.CompiscriptLexer import CompiscriptLexer
-from scripts.CompiscriptParser import CompiscriptParser
-from antlr4 import InputStream, CommonTokenStream
+# cada cuánto el hilo de Tk recoge lo que entregó el worker de compilación
+UI_POLL_MS = 30
+# diagnósticos en vivo: espera sin teclear antes de re-chequear
+LIVE_DEBOUNCE_MS = 250
 
 
 # ===== Paleta estilo VSCode =====
@@ -67,6 +67,7 @@ class CodeEditor(ttk.Frame):
         self.text.bind("<ButtonRelease>", self._after_key)
 
         self._status_cb = None
+        self._change_cb = None
 
     # API
     def get(self) -> str:
@@ -94,6 +95,10 @@ class CodeEditor(ttk.Frame):
     def on_status(self, cb):
         self._status_cb = cb
 
+    def on_change(self, cb):
+        # se llama en cada modificación del texto (teclas, pegar, set)
+        self._change_cb = cb
+
     # Internos
     def _on_modified(self, *_):
         if self.text.edit_modified():
@@ -101,6 +106,8 @@ class CodeEditor(ttk.Frame):
             self._recalc_linenums()
             self._highlight_line()
             self._report_pos()
+            if self._change_cb:
+                self._change_cb()
 
     def _after_key(self, *_):
         self._recalc_linenums()
@@ -194,6 +201,17 @@ class CompiscriptIDE(tk.Tk):
         self.minsize(900, 560)
 
         self.archivo_actual: Optional[Path] = None
+        self._incremental = IncrementalFrontEnd()
+        # diagnósticos en vivo: front end propio (el otro vive en el hilo del worker)
+        self._live = IncrementalFrontEnd()
+        self._live_enabled = tk.BooleanVar(value=True)
+        self._live_after_id = None
+        # exportación de la tabla de símbolos: opcional (Compilar > Exportar tabla de símbolos…)
+        self._symbols_out: Optional[str] = None
+        self._symbol_exporter = SymbolExporter()
+        self._ui_queue: "queue.Queue" = queue.Queue()
+        self._compile_worker = CompileWorker(self._compile_in_worker, post=self._ui_queue.put)
+        self.after(UI_POLL_MS, self._drain_ui_queue)
 
         self._setup_theme()
         self._setup_menu()
@@ -215,6 +233,7 @@ class CompiscriptIDE(tk.Tk):
         self.editor = CodeEditor(top)
         top.add(self.editor, minsize=400)
         self.editor.on_status(self._update_status_bar)
+        self.editor.on_change(self._schedule_live_check)
 
         # Panel derecho: Notebook con AST y Símbolos
         right = ttk.Frame(top, style="Panel.TFrame")
@@ -327,6 +346,11 @@ class CompiscriptIDE(tk.Tk):
 
         m_build = Menu(mb, tearoff=0)
         m_build.add_command(label="Compilar (F5)", command=self.compilar, accelerator="F5")
+        m_build.add_checkbutton(label="Diagnósticos en vivo", variable=self._live_enabled,
+                                command=self._schedule_live_check)
+        m_build.add_separator()
+        m_build.add_command(label="Exportar tabla de símbolos…", command=self._choose_symbols_out)
+        m_build.add_command(label="No exportar tabla de símbolos", command=self._clear_symbols_out)
         mb.add_cascade(label="Compilar", menu=m_build)
 
         self.config(menu=mb)
@@ -485,38 +509,46 @@ class CompiscriptIDE(tk.Tk):
             self._set_text(w, "")
         self._set_problems([])
         self._clear_squiggles()
+        self._msg("⏳ Compilando…\n")
+
+        # El pipeline corre en el worker; un pedido nuevo cancela al anterior
+        self._compile_worker.submit(
+            src,
+            on_stage=self._on_compile_stage,
+            on_done=self._on_compile_done,
+            on_error=self._on_compile_error,
+        )
 
-        # Ejecutar Driver y capturar stdout/stderr
-        out_buf, err_buf = io.StringIO(), io.StringIO()
-        try:
-            with redirect_stdout(out_buf), redirect_stderr(err_buf):
-                result = parse_code_from_string(src)
-        except Exception as e:
-            self._msg(f"❌ Error ejecutando Driver: {e}\n")
-            return messagebox.showerror("Compilar", str(e))
-        printed = (out_buf.getvalue() + err_buf.getvalue())
-
-        # Normalizar resultado
-        if isinstance(result, dict):
-            tree = result.get("parse_tree", "")
-            messages = (result.get("messages") or "")
-            if printed:
-                messages = (messages + "\n" + printed).strip()
-            actions = result.get("actions", "") or ""
-            ir = result.get("ir", "") or ""
-            asm = result.get("asm", "") or ""
-            errors = result.get("errors")
-            if errors is None:
-                errors = self._infer_errors(messages)
-            timings = result.get("timings") or {}
-            symbols = result.get("symbols")
-        else:
-            tree = ""
-            messages = (str(result) + ("\n" + printed if printed else ""))
-            actions = ir = asm = ""
-            errors = self._infer_errors(messages)
-            timings = {}
-            symbols = None
+    def _compile_in_worker(self, src: str, progress):
+        # hilo del worker: el front end incremental solo se usa desde aquí
+        return self._incremental.compile_session(src, symbols=True, progress=progress)
+
+    def _on_compile_stage(self, stage: str, session):
+        # resultados parciales: diagnósticos antes de que esté el MIPS
+        if stage in ("parse", "semantic"):
+            errors = session.errors
+            self._set_problems(errors)
+            self._clear_squiggles()
+            self._apply_squiggles(errors)
+            if stage == "semantic":
+                self._set_symbols(session.symbols)
+        elif stage == "ir":
+            self._set_text(self.txt_ir, session.ir or "")
+
+    def _on_compile_error(self, e: BaseException):
+        self._msg(f"❌ Error ejecutando Driver: {e}\n")
+        messagebox.showerror("Compilar", str(e))
+
+    def _on_compile_done(self, session):
+        result = session.result
+        tree = result.get("parse_tree")
+        messages = result.get("messages") or ""
+        actions = result.get("actions", "") or ""
+        ir = result.get("ir", "") or ""
+        asm = result.get("asm", "") or ""
+        errors = result.get("errors") or []
+        timings = result.get("timings") or {}
+        symbols = result.get("symbols")
 
         # Poblar UI con lo que devolvió el Driver
         self._set_ast(tree or "(sin árbol)")
@@ -528,36 +560,13 @@ class CompiscriptIDE(tk.Tk):
         self._apply_squiggles(errors)
         self._set_symbols(symbols)
 
-        # ===== Análisis semántico + generación de TAC =====
-        try:
-            from program.semantic_analyzer import SemanticAnalyzer
-            from program.symbol_table import SymbolTable
-
-            input_stream = InputStream(src)
-            lexer = CompiscriptLexer(input_stream)
-            token_stream = CommonTokenStream(lexer)
-            parser = CompiscriptParser(token_stream)
-            tree_ir = parser.program()
-
-            # 1) Analizador semántico para poblar la tabla de símbolos
-            analyzer = SemanticAnalyzer()
-            analyzer.visit(tree_ir)
-            sym_tree = analyzer.symbol_tree()
-            self._set_symbols(sym_tree)
-
-            # 2) Generador TAC
-            visitor = TACGeneratorVisitor()
-            visitor.visit(tree_ir)
-            tac_code = visitor.get_code()
-            self._set_text(self.txt_ir, tac_code)
-
-            # 3) Exportar tabla de símbolos extendida a JSON
-            SymbolTable().export_json("symbol_table.json")
-            self._msg("📦 Tabla de símbolos exportada a symbol_table.json\n")
-
+        # ===== Tabla de símbolos =====
+        # El árbol ya lo armó la sesión; solo se exporta si se eligió un
+        # archivo, en segundo plano y solo si cambió.
+        if self._symbols_out and session.export_symbols(self._symbols_out, self._symbol_exporter):
+            self._msg(f"📦 Tabla de símbolos → {self._symbols_out}\n")
+        if ir:
             self._msg("🔹 TAC generado correctamente.\n")
-        except Exception as e:
-            self._msg(f"⚠️ Error en análisis semántico o TAC: {e}\n")
 
         # Timings al final de mensajes
         if timings:
@@ -566,6 +575,10 @@ class CompiscriptIDE(tk.Tk):
             if "semantic_ms" in timings: parts.append(f"Semántica {timings['semantic_ms']} ms")
             if "ir_ms" in timings: parts.append(f"IR {timings['ir_ms']} ms")
             if "asm_ms" in timings: parts.append(f"ASM {timings['asm_ms']} ms")
+            if "chunks" in timings:
+                parts.append(f"Fragmentos {timings['chunks_reused']}/{timings['chunks']} reutilizados")
+            if "functions" in timings:
+                parts.append(f"Funciones {timings['functions_reused']}/{timings['functions']} reutilizadas")
             if parts:
                 self._msg(" | ".join(parts) + "\n")
 
@@ -574,10 +587,74 @@ class CompiscriptIDE(tk.Tk):
         else:
             self._msg("✅ Compilación sin errores.\n")
 
+    # ===== Diagnósticos en vivo =====
+    def _schedule_live_check(self):
+        # debounce: cada tecla reinicia la espera
+        if self._live_after_id is not None:
+            self.after_cancel(self._live_after_id)
+            self._live_after_id = None
+        if self._live_enabled.get():
+            self._live_after_id = self.after(LIVE_DEBOUNCE_MS, self._live_check)
+
+    def _live_check(self):
+        # solo lexer+parser de lo que cambió y semántico de esos fragmentos: sin TAC ni MIPS
+        self._live_after_id = None
+        src = self.editor.get()
+        if not src.strip():
+            self._set_problems([])
+            self._clear_squiggles()
+            return
+        try:
+            errors = self._live.check(src)["errors"]
+        except Exception:
+            return  # el chequeo en vivo nunca molesta mientras se escribe
+        self._set_problems(errors)
+        self._clear_squiggles()
+        self._apply_squiggles(errors)
+
+    # ===== Cola hacia el hilo de la interfaz =====
+    def _drain_ui_queue(self):
+        # los callbacks del worker llegan por la cola y corren aquí, en el hilo de Tk
+        try:
+            while True:
+                self._ui_queue.get_nowait()()
+        except queue.Empty:
+            pass
+        self.after(UI_POLL_MS, self._drain_ui_queue)
+
+    def destroy(self):
+        self._compile_worker.close(timeout=1.0)
+        self._symbol_exporter.close(timeout=2.0)
+        super().destroy()
+
+    # ===== Exportación de símbolos =====
+    def _choose_symbols_out(self):
+        path = filedialog.asksaveasfilename(
+            title="Exportar tabla de símbolos",
+            defaultextension=".json",
+            initialfile="symbol_table.json",
+            filetypes=[("JSON", "*.json"), ("Todos", "*.*")],
+        )
+        if path:
+            self._symbols_out = path
+            self._msg(f"📦 La tabla de símbolos se exportará a {path} en cada compilación.\n")
+
+    def _clear_symbols_out(self):
+        self._symbols_out = None
+        self._msg("📦 Exportación de la tabla de símbolos desactivada.\n")
+
 
     # ===== Helpers =====
-    def _set_ast(self, s: str):
+    def _set_ast(self, s: Any, max_depth: Optional[int] = None):
         self.tree_ast.delete(*self.tree_ast.get_children())
+        # Vista perezosa del Driver: se recorre el árbol directamente
+        if hasattr(s, "walk"):
+            parents: List[str] = [""]
+            for depth, label, _leaf in s.walk(max_depth):
+                del parents[depth + 1:]
+                node = self.tree_ast.insert(parents[depth], "end", text=label)
+                parents.append(node)
+            return
         txt = (s or "").strip()
         if not txt:
             return
@@ -663,14 +740,13 @@ class CompiscriptIDE(tk.Tk):
         except Exception:
             pass
 
-    def _set_problems(self, items: List[Dict[str, Any]]):
+    def _set_problems(self, items: List[Diagnostic]):
         self.problems.delete(*self.problems.get_children())
-        for it in items or []:
-            sev = (it.get("sev") or "ERROR").upper()
-            line = it.get("line") if it.get("line") is not None else "-"
-            col = it.get("col") if it.get("col") is not None else "-"
-            msg = it.get("msg") or ""
-            self.problems.insert("", "end", values=(sev, line, col, msg))
+        # Diagnostic (program/diagnostics.py): el texto se arma recién aquí
+        for d in items or []:
+            line = d.line if d.line is not None else "-"
+            col = d.col if d.col is not None else "-"
+            self.problems.insert("", "end", values=(d.severity.upper(), line, col, d.message))
 
     def _jump_to_problem(self, *_):
         sel = self.problems.focus()
@@ -689,61 +765,18 @@ class CompiscriptIDE(tk.Tk):
             pass
 
     def _apply_squiggles(self, errors):
-        for e in errors or []:
-            if e.get("line") is None:
-                continue
-            try:
-                line = int(e["line"])
-                col = int(e.get("col", 0))
-            except Exception:
+        for d in errors or []:
+            if d.line is None:
                 continue
+            # con span completo se subraya solo el nodo; si no, hasta el fin de línea
+            start = f"{d.line}.{d.col or 0}"
+            end = (f"{d.end_line}.{d.end_col}" if d.end_line is not None and d.end_col is not None
+                   else f"{d.line}.end")
             try:
-                self.editor.text.tag_add("squiggle", f"{line}.{col}", f"{line}.end")
+                self.editor.text.tag_add("squiggle", start, end)
             except Exception:
                 pass
 
-    def _infer_errors(self, text: str) -> List[Dict[str, Any]]:
-        if not text:
-            return []
-        out: List[Dict[str, Any]] = []
-        pats = [
-            r"^line\\s+(?P<line>\\d+)\\s*[: ,]\\s*(?P<col>\\d+)\\s*(?P<msg>.*)$",
-            r"^[Ll]í?nea\\s+(?P<line>\\d+)\\s*,?\\s*[Cc](?:ol(?:\\.|umna)?)?\\s*(?P<col>\\d+)\\s*[:\\-]?\\s*(?P<msg>.*)$",
-            r"^(?P<msg>mismatched input .+? expecting .+)$",
-            r"^(?P<msg>no viable alternative at input .+)$",
-            r"^(?P<msg>missing .+ at .+)$",
-            r"^(?P<msg>extraneous input .+ expecting .+)$",
-            r"^(?P<msg>token recognition error at: .+)$",
-            r"^(?P<msg>error .+)$",
-        ]
-        for raw in text.splitlines():
-            line = raw.strip()
-            if not line:
-                continue
-            matched = False
-            for pat in pats:
-                m = re.search(pat, line, re.IGNORECASE)
-                if m:
-                    d = {"sev": "error", "line": None, "col": None, "msg": m.groupdict().get("msg", "").strip() or line}
-                    if "line" in m.groupdict() and m.group("line"):
-                        try:
-                            d["line"] = int(m.group("line"))
-                        except Exception:
-                            pass
-                    if "col" in m.groupdict() and m.group("col"):
-                        try:
-                            d["col"] = int(m.group("col"))
-                        except Exception:
-                            pass
-                    out.append(d)
-                    matched = True
-                    break
-            lower = line.lower()
-            if (not matched and (("error" in lower) or ("missing" in lower))
-                and not re.search(r"\\b(?:sin|no)\\s+error(?:es)?\\b", lower)):
-                out.append({"sev": "error", "line": None, "col": None, "msg": line})
-        return out
-
     def _set_text(self, w: tk.Text, s: str):
         w.delete("1.0", "end")
         if s: